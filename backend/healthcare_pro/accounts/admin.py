@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User
+from .models import User, EmailOutbox
 
 
 @admin.register(User)
@@ -29,4 +29,14 @@ class UserAdmin(BaseUserAdmin):
     readonly_fields = ('date_joined', 'last_login')
     
     # Remove username from the admin
-    username = None
\ No newline at end of file
+    username = None
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """Admin configuration for the email outbox."""
+    
+    list_display = ('to_email', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('to_email', 'subject')
+    exclude = ('body',)
+    readonly_fields = ('to_email', 'subject', 'status', 'attempts', 'next_attempt_at', 'last_error', 'created_at', 'sent_at')
@@ -0,0 +1,61 @@
+"""
+Version numbers for cache invalidation.
+
+Cached entries embed the current version of whatever they were built from
+in their key. Invalidating means bumping the version, which makes every
+entry built from older data unreachable at once; the stale entries simply
+expire. Bumps are deferred until the surrounding transaction commits, so a
+reader can never cache pre-commit data under the new version.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _version_key(namespace, ident):
+    return f'version:{namespace}:{ident}'
+
+
+def _fresh_version():
+    # Time based so a version key evicted from the cache never restarts at a
+    # number that older cached entries were stored under.
+    return int(time.time() * 1000)
+
+
+def get_versions(namespace, idents):
+    """Current versions of many ``idents`` as ``{ident: version}``, in one round trip when warm."""
+    keys = {_version_key(namespace, ident): ident for ident in idents}
+    found = cache.get_many(list(keys))
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, _fresh_version(), None)
+        found.update(cache.get_many(missing))
+    return {ident: found.get(key) or _fresh_version() for key, ident in keys.items()}
+
+
+def get_version(namespace, ident=''):
+    """Current version of ``namespace``/``ident``."""
+    return get_versions(namespace, [ident])[ident]
+
+
+def versioned_key(namespace, ident='', version=None):
+    """Cache key for data derived from ``namespace``/``ident`` at ``version`` (default: current)."""
+    if version is None:
+        version = get_version(namespace, ident)
+    return f'{namespace}:{ident}:v{version}'
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Missing or evicted: any fresh version invalidates older entries
+        cache.set(key, _fresh_version(), None)
+
+
+def bump_version(namespace, ident=''):
+    """Invalidate everything cached for ``namespace``/``ident`` once the transaction commits."""
+    key = _version_key(namespace, ident)
+    transaction.on_commit(lambda: _bump(key))
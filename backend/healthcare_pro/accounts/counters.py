@@ -0,0 +1,130 @@
+"""
+Materialized counters for the admin dashboard.
+
+Totals and per-day / per-status appointment counts are kept in
+``DashboardCounter`` rows that model signal handlers adjust as rows are
+created, changed and deleted, so the dashboard reads a handful of small rows
+instead of counting whole tables. ``reconcile()`` recomputes everything from
+the source tables and is meant to run periodically to correct any drift.
+"""
+import random
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import DashboardCounter
+
+# Writers pick a random shard so busy counters do not serialize bookings
+COUNTER_SHARDS = 8
+
+PATIENTS = 'patients'
+DOCTORS = 'doctors'
+APPOINTMENTS = 'appointments'
+
+
+def appointments_on(day):
+    """Key of the number of appointments on ``day``."""
+    return f'appointments:date:{day.isoformat()}'
+
+
+def appointments_with_status(status):
+    """Key of the number of appointments in ``status``."""
+    return f'appointments:status:{status}'
+
+
+def increment(key, delta=1):
+    """Atomically add ``delta`` to counter ``key``."""
+    shard = random.randrange(COUNTER_SHARDS)
+    updated = DashboardCounter.objects.filter(key=key, shard=shard).update(
+        value=F('value') + delta
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            DashboardCounter.objects.create(key=key, shard=shard, value=delta)
+    except IntegrityError:
+        # Another writer created the shard first
+        DashboardCounter.objects.filter(key=key, shard=shard).update(
+            value=F('value') + delta
+        )
+
+
+def apply_changes(changes):
+    """Apply a ``{key: delta}`` mapping, skipping keys that net to zero."""
+    for key, delta in changes.items():
+        if delta:
+            increment(key, delta)
+
+
+def get_counts(keys):
+    """Return ``{key: value}`` for ``keys`` in one query. Missing keys are 0."""
+    counts = dict.fromkeys(keys, 0)
+    rows = DashboardCounter.objects.filter(key__in=keys).values('key').annotate(
+        total=Sum('value')
+    ).order_by()
+    for row in rows:
+        counts[row['key']] = row['total']
+    return counts
+
+
+def get_count(key):
+    return get_counts([key])[key]
+
+
+def appointment_changes(previous, current):
+    """
+    Counter deltas for an appointment going from ``previous`` to ``current``
+    ``(appointment_date, status)`` state. Either side may be None for a
+    created or deleted appointment.
+    """
+    changes = Counter()
+    for state, sign in ((previous, -1), (current, 1)):
+        if state is None:
+            continue
+        appointment_date, status = state
+        changes[APPOINTMENTS] += sign
+        if appointment_date:
+            changes[appointments_on(appointment_date)] += sign
+        if status:
+            changes[appointments_with_status(status)] += sign
+    return changes
+
+
+def compute_counts():
+    """Count every tracked value from the source tables."""
+    from appointments.models import Appointment
+    from doctors.models import Doctor
+    from patients.models import PatientProfile
+
+    counts = {
+        PATIENTS: PatientProfile.objects.count(),
+        DOCTORS: Doctor.objects.count(),
+        APPOINTMENTS: Appointment.objects.count(),
+    }
+    by_date = Appointment.objects.values('appointment_date').annotate(total=Count('id')).order_by()
+    for row in by_date:
+        counts[appointments_on(row['appointment_date'])] = row['total']
+    by_status = Appointment.objects.values('status').annotate(total=Count('id')).order_by()
+    for row in by_status:
+        counts[appointments_with_status(row['status'])] = row['total']
+    return counts
+
+
+def reconcile():
+    """
+    Replace every counter with freshly computed values.
+    Existing counter rows are locked first so concurrent increments wait
+    for the rebuild instead of being overwritten by it.
+    Returns the number of counters written.
+    """
+    with transaction.atomic():
+        list(DashboardCounter.objects.select_for_update().values_list('id', flat=True))
+        counts = compute_counts()
+        DashboardCounter.objects.all().delete()
+        DashboardCounter.objects.bulk_create(
+            DashboardCounter(key=key, shard=0, value=value)
+            for key, value in counts.items()
+        )
+    return len(counts)
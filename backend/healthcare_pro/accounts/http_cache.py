@@ -0,0 +1,61 @@
+"""
+Conditional, versioned responses for read-mostly endpoints.
+
+``versioned_response`` serves data that only changes when a
+``cache_versions`` namespace is bumped. The data is cached under the
+current version, so a warm hit costs two cache reads and no queries. The
+version is also the ETag: a client that sends it back in
+``If-None-Match`` gets ``304 Not Modified`` without the data being read at
+all.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from config.db_router import primary_reads
+from .cache_versions import get_version, versioned_key
+
+RESPONSE_CACHE_SECONDS = 24 * 60 * 60
+
+
+def _etag_matches(header, etag):
+    # If-None-Match uses the weak comparison: W/"x" matches "x"
+    candidates = parse_etags(header)
+    return '*' in candidates or any(
+        (candidate[2:] if candidate.startswith('W/') else candidate) == etag
+        for candidate in candidates
+    )
+
+
+def versioned_response(request, namespace, name, build, params=(), max_age=0):
+    """
+    Respond with ``build()``, cached while ``namespace`` keeps its version.
+
+    ``params`` are the request values the data depends on; each combination
+    is cached and tagged separately. ``max_age`` is how many seconds the
+    client may reuse the response before revalidating with its ETag.
+    """
+    version = get_version(namespace)
+    digest = hashlib.md5('\x1f'.join([name, *map(str, params)]).encode()).hexdigest()[:16]
+    etag = f'"{version}-{digest}"'
+
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if header and _etag_matches(header, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        key = f'{versioned_key(namespace, version=version)}:{digest}'
+        data = cache.get(key)
+        if data is None:
+            # A lagging replica must never be cached under the new version
+            with primary_reads():
+                data = build()
+            cache.set(key, data, RESPONSE_CACHE_SECONDS)
+        response = Response(data)
+
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=max_age)
+    return response
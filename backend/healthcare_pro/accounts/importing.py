@@ -0,0 +1,203 @@
+"""
+Shared plumbing for bulk CSV / JSON Lines imports of user accounts.
+
+``read_rows`` streams a file one row at a time, so memory depends on the
+chunk size and not on the file size. ``run_import`` groups those rows into
+chunks and hands each one to an importer, which validates it with
+``validate_rows`` (one query for existing emails), builds the users with
+``build_users`` and writes everything with ``bulk_create`` in one
+transaction per chunk.
+
+Password hashing dominates an import, so it runs on the process pool from
+``accounts.hashing``.
+"""
+import csv
+import io
+import json
+import os
+
+from rest_framework.exceptions import ValidationError
+
+from .hashing import hash_passwords, password_hash_pool
+from .models import User
+from .outbox import enqueue_emails
+from .utils import credentials_email, generate_random_password
+
+FORMATS = ('csv', 'jsonl')
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class ImportFormatError(Exception):
+    """The import file or its format is not usable at all."""
+
+
+def detect_format(filename, requested=None):
+    """The import format from an explicit choice or the file extension."""
+    if requested:
+        if requested not in FORMATS:
+            raise ImportFormatError(f"Unsupported format '{requested}'. Use one of: {', '.join(FORMATS)}.")
+        return requested
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ImportFormatError("Cannot tell the file format from its name; pass format=csv or format=jsonl.")
+
+
+def text_stream(binary_file):
+    """Decode an uploaded (binary) file lazily as UTF-8, ignoring a BOM."""
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+
+
+def read_rows(stream, file_format):
+    """
+    Yield ``(row_number, data, error)`` for every row of a text stream.
+    ``data`` is a dict, or None when the row could not be parsed, in which
+    case ``error`` is a DRF-style error dict. Empty CSV cells are left out
+    of ``data``.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row_number, row in enumerate(reader, start=1):
+            data = {
+                key.strip(): value.strip()
+                for key, value in row.items()
+                if key and isinstance(value, str) and value.strip()
+            }
+            yield row_number, data, None
+        return
+
+    for row_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, {'non_field_errors': [f"Invalid JSON: {e}"]}
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, {'non_field_errors': ["Each line must be a JSON object."]}
+            continue
+        yield row_number, data, None
+
+
+def chunked(rows, size=DEFAULT_CHUNK_SIZE):
+    """Group an iterable into lists of at most ``size`` items."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_rows(chunk, serializer, report, seen_emails):
+    """
+    Validate a chunk of ``read_rows`` output with ``serializer``, rejecting
+    emails seen earlier in the file or already registered. Returns
+    ``[(row_number, email, cleaned_data)]`` for the rows that passed.
+    """
+    valid = []
+    for row_number, data, error in chunk:
+        if error:
+            report.add_error(row_number, error)
+            continue
+        try:
+            cleaned = serializer.run_validation(data)
+        except ValidationError as e:
+            report.add_error(row_number, e.detail, data.get('email'))
+            continue
+        email = User.objects.normalize_email(cleaned.pop('email'))
+        if email in seen_emails:
+            report.add_error(row_number, {'email': ["Duplicate email in this file."]}, email)
+            continue
+        seen_emails.add(email)
+        valid.append((row_number, email, cleaned))
+
+    existing = set(User.objects.filter(
+        email__in=[email for _, email, _ in valid]
+    ).values_list('email', flat=True))
+    if existing:
+        for row_number, email, _ in valid:
+            if email in existing:
+                report.add_error(row_number, {'email': ["User with this email already exists."]}, email)
+        valid = [row for row in valid if row[1] not in existing]
+    return valid
+
+
+def build_users(valid, role, pool=None):
+    """
+    Unsaved users for validated rows, with random passwords hashed on
+    ``pool``. Takes ``first_name`` / ``last_name`` out of the cleaned data.
+    Returns ``(users, passwords)``.
+    """
+    passwords = [generate_random_password() for _ in valid]
+    users = [
+        User(
+            email=email,
+            first_name=cleaned.pop('first_name'),
+            last_name=cleaned.pop('last_name'),
+            role=role,
+            password=password_hash
+        )
+        for (_, email, cleaned), password_hash in zip(valid, hash_passwords(passwords, pool))
+    ]
+    return users, passwords
+
+
+def queue_credentials(users, passwords):
+    """Queue the credentials emails of new users with one bulk insert."""
+    enqueue_emails(
+        (user.email, *credentials_email(user.email, password, user.role))
+        for user, password in zip(users, passwords)
+    )
+
+
+def run_import(stream, file_format, import_chunk, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+               max_errors=None):
+    """
+    Stream rows into ``import_chunk(chunk, report, seen_emails, pool)`` a
+    chunk at a time. Returns the ``ImportReport``.
+    """
+    report = ImportReport(max_errors=max_errors)
+    seen_emails = set()
+    with password_hash_pool(workers) as pool:
+        for chunk in chunked(read_rows(stream, file_format), chunk_size):
+            report.total_rows += len(chunk)
+            import_chunk(chunk, report, seen_emails, pool)
+    return report
+
+
+def concurrent_change_error():
+    return {'non_field_errors': ["Could not be saved because of a concurrent change. Please retry."]}
+
+
+class ImportReport:
+    """Counts and per-row errors of one import run."""
+
+    def __init__(self, max_errors=None):
+        self.total_rows = 0
+        self.created = 0
+        self.errors = []
+        self.failed = 0
+        self.max_errors = max_errors
+
+    def add_error(self, row_number, errors, email=None):
+        self.failed += 1
+        if self.max_errors is None or len(self.errors) < self.max_errors:
+            entry = {'row': row_number, 'errors': errors}
+            if email:
+                entry['email'] = email
+            self.errors.append(entry)
+
+    def as_dict(self):
+        return {
+            'total_rows': self.total_rows,
+            'created': self.created,
+            'failed': self.failed,
+            'errors': sorted(self.errors, key=lambda entry: entry['row']),
+            'errors_truncated': self.failed > len(self.errors),
+        }
@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importing import DEFAULT_CHUNK_SIZE, ImportFormatError, detect_format
+
+
+class BaseImportCommand(BaseCommand):
+    """Shared options and reporting of the bulk account import commands."""
+
+    # Set by subclasses: importer(stream, file_format, ...) -> ImportReport
+    importer = None
+    label = 'accounts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV (.csv) or JSON Lines (.jsonl) file to import.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help="File format. Inferred from the extension by default.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Rows validated and inserted per transaction.")
+        parser.add_argument('--workers', type=int,
+                            help="Password hashing processes. Defaults to IMPORT_HASH_WORKERS.")
+        parser.add_argument('--no-email', action='store_true',
+                            help="Do not queue credential emails.")
+        parser.add_argument('--report', help="Write the full error report to this JSON file.")
+
+    def handle(self, *args, **options):
+        try:
+            file_format = detect_format(options['path'], options['format'])
+        except ImportFormatError as e:
+            raise CommandError(str(e))
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                report = self.importer(
+                    stream,
+                    file_format,
+                    chunk_size=options['chunk_size'],
+                    workers=options['workers'],
+                    send_emails=not options['no_email']
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+
+        if options['report']:
+            with open(options['report'], 'w') as report_file:
+                json.dump(report.as_dict(), report_file, indent=2, default=str)
+        else:
+            for error in report.as_dict()['errors'][:20]:
+                self.stderr.write(f"Row {error['row']}: {error['errors']}")
+            if report.failed > 20:
+                self.stderr.write(f"... {report.failed - 20} more. Use --report to see them all.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {report.total_rows} rows: {report.created} {self.label} created, {report.failed} failed."
+        ))
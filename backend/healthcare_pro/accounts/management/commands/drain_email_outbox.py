@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import DEFAULT_BATCH_SIZE, drain_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued outbox emails, one SMTP connection per batch. Runs until interrupted "
+        "unless --once is given. Several instances can run side by side."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Emails claimed and sent per connection.")
+        parser.add_argument('--poll-interval', type=float, default=5.0,
+                            help="Seconds to wait when the outbox is empty.")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit as soon as nothing is due.")
+
+    def handle(self, *args, **options):
+        totals = {'sent': 0, 'failed': 0}
+        try:
+            while True:
+                claimed, sent, failed = drain_outbox(options['batch_size'])
+                totals['sent'] += sent
+                totals['failed'] += failed
+                if claimed:
+                    self.stdout.write(f"Claimed {claimed} emails: {sent} sent, {failed} failed.")
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['sent']} emails, {totals['failed']} failed."
+        ))
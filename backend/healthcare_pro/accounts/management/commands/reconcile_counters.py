@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recompute the admin dashboard counters from the source tables. Safe to run from cron."
+
+    def handle(self, *args, **options):
+        written = reconcile()
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {written} dashboard counters."))
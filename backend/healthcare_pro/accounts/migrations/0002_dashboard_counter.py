@@ -0,0 +1,51 @@
+# Generated by Django 4.2.9 on 2026-10-17 19:29
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    PatientProfile = apps.get_model('patients', 'PatientProfile')
+    Doctor = apps.get_model('doctors', 'Doctor')
+    Appointment = apps.get_model('appointments', 'Appointment')
+    DashboardCounter = apps.get_model('accounts', 'DashboardCounter')
+
+    counts = {
+        'patients': PatientProfile.objects.count(),
+        'doctors': Doctor.objects.count(),
+        'appointments': Appointment.objects.count(),
+    }
+    for row in Appointment.objects.values('appointment_date').annotate(total=models.Count('id')).order_by():
+        counts[f"appointments:date:{row['appointment_date'].isoformat()}"] = row['total']
+    for row in Appointment.objects.values('status').annotate(total=models.Count('id')).order_by():
+        counts[f"appointments:status:{row['status']}"] = row['total']
+
+    DashboardCounter.objects.bulk_create(
+        DashboardCounter(key=key, shard=0, value=value)
+        for key, value in counts.items()
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('patients', '0004_remove_prescription_model'),
+        ('doctors', '0002_rename_qualifications_doctor_qualification_and_more'),
+        ('appointments', '0004_doctor_daily_load'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100)),
+                ('shard', models.PositiveSmallIntegerField(default=0)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'dashboard_counters',
+                'unique_together': {('key', 'shard')},
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
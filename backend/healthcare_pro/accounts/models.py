@@ -50,4 +50,57 @@ class User(AbstractBaseUser, PermissionsMixin):
         return f"{self.email} - {self.role}"
     
     def get_full_name(self):
-        return f"{self.first_name} {self.last_name}"
\ No newline at end of file
+        return f"{self.first_name} {self.last_name}"
+
+class DashboardCounter(models.Model):
+    """
+    Materialized row counts read by the admin dashboard.
+    
+    A counter is spread over several shard rows so concurrent writers rarely
+    contend on the same row; its value is the sum of its shards.
+    """
+    
+    key = models.CharField(max_length=100)
+    shard = models.PositiveSmallIntegerField(default=0)
+    value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'dashboard_counters'
+        unique_together = ['key', 'shard']
+    
+    def __str__(self):
+        return f"{self.key}[{self.shard}] = {self.value}"
+
+
+class EmailOutbox(models.Model):
+    """
+    Outgoing email written in the same transaction as the change that
+    triggers it and delivered later by the ``drain_email_outbox`` worker.
+    """
+    
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    
+    to_email = models.EmailField(max_length=255)
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, help_text="Not picked up by a worker before this time")
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        db_table = 'email_outbox'
+        verbose_name = 'Outgoing Email'
+        verbose_name_plural = 'Email Outbox'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='email_outbox_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.to_email} - {self.subject} ({self.status})"
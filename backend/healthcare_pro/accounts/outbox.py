@@ -0,0 +1,145 @@
+"""
+Transactional email outbox.
+
+``enqueue_email`` only inserts an ``EmailOutbox`` row, so it commits or
+rolls back together with the registration that triggered it and never
+waits on SMTP. ``drain_outbox`` claims due rows with ``SELECT ... FOR
+UPDATE SKIP LOCKED``, pushes a claim lease into ``next_attempt_at`` and
+sends the whole batch over a single SMTP connection. Outcomes are only
+written to rows still pending under that lease, so a worker that overran
+it cannot overwrite the result of the worker that took over. Failed
+messages are retried with exponential backoff; the body, which may hold
+credentials, is cleared once a message is sent or finally given up on.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 6
+RETRY_BACKOFF_SECONDS = 30
+
+
+def enqueue_email(to_email, subject, body):
+    """Queue an email for delivery. Call inside the transaction that triggers it."""
+    return EmailOutbox.objects.create(to_email=to_email, subject=subject, body=body)
+
+
+def enqueue_emails(messages, batch_size=500):
+    """Queue many ``(to_email, subject, body)`` emails with one bulk insert."""
+    return EmailOutbox.objects.bulk_create([
+        EmailOutbox(to_email=to_email, subject=subject, body=body)
+        for to_email, subject, body in messages
+    ], batch_size=batch_size)
+
+
+def claim_batch(batch_size=DEFAULT_BATCH_SIZE, lease_seconds=LEASE_SECONDS):
+    """Lease up to ``batch_size`` due messages to this worker."""
+    now = timezone.now()
+    with transaction.atomic():
+        claimed_ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                status='pending',
+                next_attempt_at__lte=now
+            ).order_by('next_attempt_at').values_list('id', flat=True)[:batch_size]
+        )
+        if not claimed_ids:
+            return []
+        EmailOutbox.objects.filter(id__in=claimed_ids).update(
+            next_attempt_at=now + timedelta(seconds=lease_seconds)
+        )
+    return list(EmailOutbox.objects.filter(id__in=claimed_ids))
+
+
+def send_batch(messages):
+    """Send ``messages`` over one connection; returns ``{id: error or None}``."""
+    results = {}
+    connection = get_connection()
+    try:
+        connection.open()
+        for outgoing in messages:
+            message = EmailMessage(
+                outgoing.subject,
+                outgoing.body,
+                settings.DEFAULT_FROM_EMAIL,
+                [outgoing.to_email],
+                connection=connection
+            )
+            try:
+                connection.send_messages([message])
+                results[outgoing.id] = None
+            except Exception as e:
+                results[outgoing.id] = str(e) or e.__class__.__name__
+    except Exception as e:
+        # Could not connect: fail everything not attempted yet
+        for outgoing in messages:
+            results.setdefault(outgoing.id, str(e) or e.__class__.__name__)
+    finally:
+        connection.close()
+    return results
+
+
+def record_results(messages, results):
+    """
+    Write outcomes back in bulk, skipping messages whose lease has since
+    passed to another worker. Returns ``(sent, failed)`` counts of the rows
+    written.
+    """
+    now = timezone.now()
+    sent = defaultdict(list)
+    retries = defaultdict(list)
+    given_up = defaultdict(list)
+    for outgoing in messages:
+        error = results.get(outgoing.id, "Not attempted")
+        # next_attempt_at is the lease claim_batch stamped for this worker
+        lease = outgoing.next_attempt_at
+        if error is None:
+            sent[lease].append(outgoing.id)
+        elif outgoing.attempts + 1 >= MAX_ATTEMPTS:
+            given_up[(lease, error[:1000])].append(outgoing.id)
+        else:
+            retries[(lease, outgoing.attempts, error[:1000])].append(outgoing.id)
+
+    def leased(ids, lease):
+        return EmailOutbox.objects.filter(id__in=ids, status='pending', next_attempt_at=lease)
+
+    sent_count = failed_count = 0
+    for lease, ids in sent.items():
+        sent_count += leased(ids, lease).update(status='sent', sent_at=now, body='', last_error=None)
+    for (lease, attempts, error), ids in retries.items():
+        failed_count += leased(ids, lease).update(
+            attempts=attempts + 1,
+            last_error=error,
+            next_attempt_at=now + timedelta(seconds=RETRY_BACKOFF_SECONDS * 2 ** attempts)
+        )
+    for (lease, error), ids in given_up.items():
+        given_up_count = leased(ids, lease).update(
+            status='failed', attempts=MAX_ATTEMPTS, last_error=error, body=''
+        )
+        if given_up_count:
+            logger.error("Giving up on %d outbox emails: %s", given_up_count, error)
+        failed_count += given_up_count
+
+    lost = len(messages) - sent_count - failed_count
+    if lost:
+        logger.warning("%d outbox results dropped: their lease expired and another worker claimed them", lost)
+    return sent_count, failed_count
+
+
+def drain_outbox(batch_size=DEFAULT_BATCH_SIZE):
+    """Claim, send and record one batch. Returns ``(claimed, sent, failed)``."""
+    messages = claim_batch(batch_size)
+    if not messages:
+        return 0, 0, 0
+    sent, failed = record_results(messages, send_batch(messages))
+    return len(messages), sent, failed
@@ -21,9 +21,12 @@ urlpatterns = [
     # Admin endpoints - Complete Registration
     path('admin/register/patient/', admin_views.admin_register_patient, name='admin_register_patient'),
     path('admin/register/doctor/', admin_views.admin_register_doctor, name='admin_register_doctor'),
+    path('admin/import/patients/', admin_views.admin_import_patients, name='admin_import_patients'),
+    path('admin/import/doctors/', admin_views.admin_import_doctors, name='admin_import_doctors'),
     
     # Admin endpoints - Dashboard & Management
     path('admin/dashboard/stats/', admin_views.admin_dashboard_stats, name='admin_dashboard_stats'),
+    path('admin/dashboard/counters/', admin_views.admin_dashboard_counters, name='admin_dashboard_counters'),
     path('admin/doctors/list/', admin_views.admin_doctors_list, name='admin_doctors_list'),
     path('admin/patients/list/', admin_views.admin_patients_list, name='admin_patients_list'),
 ]
\ No newline at end of file
@@ -1,7 +1,9 @@
+import base64
 import secrets
 import string
-from django.core.mail import send_mail
-from django.conf import settings
+from datetime import datetime
+
+from .outbox import enqueue_email
 
 def generate_random_password(length=12):
     """Generate a secure random password"""
@@ -9,8 +11,8 @@ def generate_random_password(length=12):
     password = ''.join(secrets.choice(characters) for _ in range(length))
     return password
 
-def send_credentials_email(email, password, role):
-    """Send email with login credentials"""
+def credentials_email(email, password, role):
+    """Subject and body of the login credentials email"""
     subject = 'HealthCare Pro - Your Account Credentials'
     
     message = f"""
@@ -30,16 +32,29 @@ def send_credentials_email(email, password, role):
     Best regards,
     HealthCare Pro Team
     """
-    
+    return subject, message
+
+def send_credentials_email(email, password, role):
+    """
+    Queue an email with login credentials in the outbox.
+    Delivery happens in the drain_email_outbox worker, and the message is
+    only sent if the surrounding transaction commits.
+    """
+    enqueue_email(email, *credentials_email(email, password, role))
+    return True
+
+def encode_cursor(created_at, pk):
+    """Encode a (created_at, pk) keyset position as an opaque URL-safe token"""
+    raw = f"{created_at.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(token):
+    """Inverse of encode_cursor; raises ValueError on malformed tokens"""
+    if not token:
+        return None
     try:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [email],
-            fail_silently=False,
-        )
-        return True
-    except Exception as e:
-        print(f"Error sending email: {str(e)}")
-        return False
\ No newline at end of file
+        raw = base64.urlsafe_b64decode(token.encode()).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (TypeError, UnicodeDecodeError, base64.binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
@@ -4,17 +4,30 @@ from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.db.models import Max, OuterRef, Q, Subquery
+from datetime import date
 
 from ..models import User
 from ..serializers import (
     UserSerializer,
     RegisterUserSerializer
 )
+from .. import counters
 from ..permissions import IsAdmin
+from ..importing import ImportFormatError, detect_format, text_stream
+from ..utils import encode_cursor, decode_cursor
+from doctors.importer import import_doctors
 from doctors.models import Doctor
 from doctors.serializers import DoctorCreateSerializer
+from patients.importer import import_patients
 from patients.models import PatientProfile
 from patients.serializers import PatientProfileCreateSerializer
+from config.db_router import ReplicaReadMixin, use_read_replica
+
+MAX_PATIENTS_PAGE_SIZE = 200
+MAX_SCHEDULE_PAGE_SIZE = 200
+MAX_COUNTER_DATES = 31
+MAX_IMPORT_ERRORS_REPORTED = 1000
 
 
 class AdminCreateUserView(generics.CreateAPIView):
@@ -26,7 +39,9 @@ class AdminCreateUserView(generics.CreateAPIView):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        result = serializer.save()
+        # The credentials email is queued in the same transaction as the user
+        with transaction.atomic():
+            result = serializer.save()
         
         user = result['user']
         password = result['password']
@@ -175,30 +190,96 @@ def admin_register_doctor(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _import_upload(request, importer):
+    """Run ``importer`` on the uploaded ``file`` and return its report."""
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'Upload the import file as "file".'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        file_format = detect_format(upload.name, request.data.get('format'))
+    except ImportFormatError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    send_emails = str(request.data.get('send_emails', 'true')).lower() not in ('false', '0', 'no')
+    report = importer(
+        text_stream(upload.file),
+        file_format,
+        send_emails=send_emails,
+        max_errors=MAX_IMPORT_ERRORS_REPORTED
+    )
+    
+    return Response({
+        'success': report.failed == 0,
+        **report.as_dict()
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdmin])
+def admin_import_patients(request):
+    """
+    Bulk-register patients from an uploaded CSV or JSON Lines file.
+    Each row takes the same fields as ``admin/register/patient/``. Valid
+    rows are created and emailed their credentials; invalid ones are listed
+    in the returned report with their row number.
+    """
+    return _import_upload(request, import_patients)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdmin])
+def admin_import_doctors(request):
+    """
+    Bulk-register doctors from an uploaded CSV or JSON Lines file.
+    Each row takes the same fields as ``admin/register/doctor/``; doctor
+    ids are allocated in blocks, so concurrent imports never collide.
+    """
+    return _import_upload(request, import_doctors)
+
+
 @api_view(['GET'])
 @permission_classes([IsAdmin])
+@use_read_replica
 def admin_dashboard_stats(request):
     """
     Get admin dashboard statistics.
+    Totals come from the materialized dashboard counters, and today's
+    schedule is paginated with ``schedule_page`` / ``schedule_page_size``.
     """
     from appointments.models import Appointment
     from django.utils import timezone
     
-    today = timezone.now().date()
+    try:
+        page = max(int(request.GET.get('schedule_page', 1)), 1)
+        page_size = min(int(request.GET.get('schedule_page_size', 50)), MAX_SCHEDULE_PAGE_SIZE)
+        if page_size < 1:
+            raise ValueError
+    except ValueError:
+        return Response({
+            'error': 'Invalid schedule_page or schedule_page_size.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    today = timezone.localdate()
     
     # Count statistics
-    total_patients = PatientProfile.objects.count()
-    total_doctors = Doctor.objects.count()
-    today_appointments = Appointment.objects.filter(appointment_date=today).count()
-    total_appointments = Appointment.objects.count()
+    today_key = counters.appointments_on(today)
+    status_keys = {
+        value: counters.appointments_with_status(value) for value, _ in Appointment.STATUS_CHOICES
+    }
+    counts = counters.get_counts(
+        [counters.PATIENTS, counters.DOCTORS, counters.APPOINTMENTS, today_key] + list(status_keys.values())
+    )
     
-    # Get today's appointments with details
-    todays_schedule = Appointment.objects.filter(
+    # Get today's appointments with details, one extra row tells whether another page exists
+    offset = (page - 1) * page_size
+    todays_schedule = list(Appointment.objects.filter(
         appointment_date=today
-    ).select_related('patient__user', 'doctor__user').order_by('appointment_time')
+    ).select_related('patient__user', 'doctor__user').order_by('appointment_time', 'id')[offset:offset + page_size + 1])
+    has_more = len(todays_schedule) > page_size
     
     schedule_data = []
-    for appointment in todays_schedule:
+    for appointment in todays_schedule[:page_size]:
         schedule_data.append({
             'id': str(appointment.id),
             'time': appointment.appointment_time.strftime('%I:%M %p'),
@@ -211,17 +292,67 @@ def admin_dashboard_stats(request):
     
     return Response({
         'stats': {
-            'total_patients': total_patients,
-            'total_doctors': total_doctors,
-            'today_appointments': today_appointments,
-            'total_appointments': total_appointments
+            'total_patients': counts[counters.PATIENTS],
+            'total_doctors': counts[counters.DOCTORS],
+            'today_appointments': counts[today_key],
+            'total_appointments': counts[counters.APPOINTMENTS],
+            'appointments_by_status': {
+                value: counts[key] for value, key in status_keys.items()
+            }
         },
-        'todays_schedule': schedule_data
+        'todays_schedule': schedule_data,
+        'schedule_page': page,
+        'schedule_page_size': page_size,
+        'schedule_has_more': has_more
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAdmin])
+@use_read_replica
+def admin_dashboard_counters(request):
+    """
+    Read the materialized dashboard counters only, for widgets that poll.
+    Optional ``dates`` is a comma separated list of YYYY-MM-DD dates
+    (default today) to return per-day appointment counts for.
+    """
+    from appointments.models import Appointment
+    from django.utils import timezone
+    
+    raw_dates = request.GET.get('dates')
+    try:
+        days = [date.fromisoformat(value.strip()) for value in raw_dates.split(',')] if raw_dates else [timezone.localdate()]
+    except ValueError:
+        return Response({
+            'error': 'Invalid dates. Use comma separated YYYY-MM-DD values.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if len(days) > MAX_COUNTER_DATES:
+        return Response({
+            'error': f'At most {MAX_COUNTER_DATES} dates can be requested at once.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    date_keys = {day.isoformat(): counters.appointments_on(day) for day in days}
+    status_keys = {
+        value: counters.appointments_with_status(value) for value, _ in Appointment.STATUS_CHOICES
+    }
+    counts = counters.get_counts(
+        [counters.PATIENTS, counters.DOCTORS, counters.APPOINTMENTS]
+        + list(date_keys.values()) + list(status_keys.values())
+    )
+    
+    return Response({
+        'total_patients': counts[counters.PATIENTS],
+        'total_doctors': counts[counters.DOCTORS],
+        'total_appointments': counts[counters.APPOINTMENTS],
+        'appointments_by_date': {day: counts[key] for day, key in date_keys.items()},
+        'appointments_by_status': {value: counts[key] for value, key in status_keys.items()}
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+@use_read_replica
 def admin_doctors_list(request):
     """
     Get list of all doctors for admin management.
@@ -251,44 +382,78 @@ def admin_doctors_list(request):
 
 @api_view(['GET'])
 @permission_classes([IsAdmin])
+@use_read_replica
 def admin_patients_list(request):
     """
     Get list of all patients for admin management.
+    Uses keyset (cursor) pagination ordered by newest first, so each page
+    costs the same no matter how deep into the list it is.
     """
-    patients = PatientProfile.objects.select_related('user').all().order_by('-created_at')
+    from appointments.models import Appointment
+    
+    try:
+        page_size = min(int(request.GET.get('page_size', 50)), MAX_PATIENTS_PAGE_SIZE)
+        if page_size < 1:
+            raise ValueError
+        cursor = decode_cursor(request.GET.get('cursor'))
+    except ValueError:
+        return Response({
+            'error': 'Invalid cursor or page_size.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    last_visit = Appointment.objects.filter(
+        patient=OuterRef('pk')
+    ).values('patient').annotate(last=Max('appointment_date')).values('last')
+    
+    patients = PatientProfile.objects.annotate(
+        last_visit=Subquery(last_visit)
+    ).order_by('-created_at', '-id').values(
+        'id', 'created_at', 'phone_number', 'date_of_birth', 'gender', 'blood_group', 'last_visit',
+        'user__first_name', 'user__last_name', 'user__email'
+    )
+    
+    if cursor:
+        created_at, patient_id = cursor
+        patients = patients.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=patient_id)
+        )
+    
+    # One extra row tells whether another page exists
+    rows = list(patients[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    
+    today = date.today()
+    genders = dict(PatientProfile.GENDER_CHOICES)
     
     patients_data = []
-    for patient in patients:
+    for row in rows:
         # Calculate age from date_of_birth
-        age = None
-        if patient.date_of_birth:
-            from datetime import date
-            today = date.today()
-            age = today.year - patient.date_of_birth.year - ((today.month, today.day) < (patient.date_of_birth.month, patient.date_of_birth.day))
-        
-        # Get last appointment date
-        last_appointment = None
-        from appointments.models import Appointment
-        last_appt = Appointment.objects.filter(patient=patient).order_by('-appointment_date').first()
-        if last_appt:
-            last_appointment = last_appt.appointment_date.strftime('%m/%d/%Y')
+        born = row['date_of_birth']
+        age = today.year - born.year - ((today.month, today.day) < (born.month, born.day)) if born else None
         
         patients_data.append({
-            'id': str(patient.id),
-            'patient_id': str(patient.id)[:8].upper(),  # Short ID for display
-            'name': patient.user.get_full_name(),
-            'email': patient.user.email,
-            'phone': patient.phone_number or "N/A",
+            'id': str(row['id']),
+            'patient_id': str(row['id'])[:8].upper(),  # Short ID for display
+            'name': f"{row['user__first_name']} {row['user__last_name']}",
+            'email': row['user__email'],
+            'phone': row['phone_number'] or "N/A",
             'age': f"{age} years" if age else "N/A",
-            'gender': patient.get_gender_display() if patient.gender else "N/A",
-            'blood_group': patient.blood_group or "N/A",
-            'last_visit': last_appointment or "N/A",
-            'created_at': patient.created_at.strftime('%Y-%m-%d')
+            'gender': genders.get(row['gender'], "N/A"),
+            'blood_group': row['blood_group'] or "N/A",
+            'last_visit': row['last_visit'].strftime('%m/%d/%Y') if row['last_visit'] else "N/A",
+            'created_at': row['created_at'].strftime('%Y-%m-%d')
         })
     
+    next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id']) if has_more else None
+    
     return Response({
         'patients': patients_data,
-        'total': len(patients_data)
+        'count': len(patients_data),
+        'total': counters.get_count(counters.PATIENTS),
+        'page_size': page_size,
+        'has_more': has_more,
+        'next_cursor': next_cursor
     })
 
 
@@ -323,7 +488,7 @@ class AdminResetPasswordView(generics.UpdateAPIView):
         return get_object_or_404(User, pk=self.kwargs['pk'])
 
 
-class UserListView(generics.ListAPIView):
+class UserListView(ReplicaReadMixin, generics.ListAPIView):
     """Admin can list all users with filtering."""
     
     queryset = User.objects.all()
@@ -0,0 +1,110 @@
+"""
+Load-aware doctor assignment for department bookings.
+
+``DoctorDailyLoad`` keeps a running count of active appointments per doctor
+and day, so ranking a department's doctors by how busy they are is a single
+indexed subquery instead of counting appointments at request time.
+Whether a ranked doctor is actually free for the whole appointment is then
+checked against the ``SlotEngine`` bitmaps, which account for overlapping
+bookings of any length.
+"""
+from datetime import datetime, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from doctors.models import Doctor, Availability
+from .models import Appointment, DoctorDailyLoad
+from .slot_engine import DEFAULT_SLOT_MINUTES, MINUTES_PER_DAY, SlotEngine, load_range, to_minutes, weekday_name
+
+# How many ranked candidates a booking tries before giving up
+MAX_ASSIGNMENT_CANDIDATES = 5
+
+
+def adjust_daily_load(doctor_id, day, delta):
+    """Atomically add ``delta`` to a doctor's booking count for ``day``."""
+    updated = DoctorDailyLoad.objects.filter(doctor_id=doctor_id, date=day).update(
+        booked_count=F('booked_count') + delta
+    )
+    if updated or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            DoctorDailyLoad.objects.create(doctor_id=doctor_id, date=day, booked_count=delta)
+    except IntegrityError:
+        # Another booking created the row first
+        DoctorDailyLoad.objects.filter(doctor_id=doctor_id, date=day).update(
+            booked_count=F('booked_count') + delta
+        )
+
+
+def rebuild_daily_loads():
+    """Recompute every ``DoctorDailyLoad`` row from the appointments table."""
+    rows = Appointment.objects.filter(
+        status__in=Appointment.ACTIVE_STATUSES
+    ).values('doctor_id', 'appointment_date').annotate(total=Count('id')).order_by()
+
+    with transaction.atomic():
+        DoctorDailyLoad.objects.all().delete()
+        DoctorDailyLoad.objects.bulk_create(
+            DoctorDailyLoad(doctor_id=row['doctor_id'], date=row['appointment_date'], booked_count=row['total'])
+            for row in rows
+        )
+
+
+def rank_available_doctors(department, day, at_time, duration=DEFAULT_SLOT_MINUTES,
+                           limit=MAX_ASSIGNMENT_CANDIDATES):
+    """
+    Up to ``limit`` doctors of ``department`` who are on shift and free for
+    ``duration`` minutes from ``at_time`` on ``day``, least loaded first.
+
+    Runs the ranking query plus one bookings query. Slots that would run
+    past midnight are never free.
+    """
+    if to_minutes(at_time) + duration > MINUTES_PER_DAY:
+        return []
+    ends_at = (datetime.combine(day, at_time) + timedelta(minutes=duration)).time()
+
+    on_shift = Availability.objects.filter(
+        doctor=OuterRef('pk'),
+        day_of_week=weekday_name(day),
+        is_available=True,
+        start_time__lte=at_time,
+        end_time__gte=ends_at
+    )
+    # Cheap pre-filter; overlaps with other start times are checked below
+    booked = Appointment.objects.filter(
+        doctor=OuterRef('pk'),
+        appointment_date=day,
+        appointment_time=at_time,
+        status__in=Appointment.ACTIVE_STATUSES
+    )
+    daily_load = DoctorDailyLoad.objects.filter(
+        doctor=OuterRef('pk'),
+        date=day
+    ).values('booked_count')
+
+    ranked = list(Doctor.objects.filter(
+        department=department,
+        is_available=True
+    ).filter(
+        Exists(on_shift)
+    ).exclude(
+        Exists(booked)
+    ).annotate(
+        daily_load=Coalesce(Subquery(daily_load), 0)
+    ).select_related('user').order_by('daily_load', 'doctor_id'))
+    if not ranked:
+        return []
+
+    windows, bookings = load_range([doctor.id for doctor in ranked], day, day)
+    engine = SlotEngine()
+    day_name = weekday_name(day)
+    free = [
+        doctor for doctor in ranked
+        if engine.is_free(
+            windows.get((doctor.id, day_name), []), bookings.get((doctor.id, day), []), at_time, duration
+        )
+    ]
+    return free[:limit]
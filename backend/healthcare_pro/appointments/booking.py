@@ -0,0 +1,164 @@
+"""
+Concurrency-safe appointment booking.
+
+Each booking runs in a short transaction that first locks the
+``BookingLock`` row of the doctor and day, so bookings for the same doctor
+and day queue up while bookings for other doctors or days proceed in
+parallel. The partial unique constraint on active appointments is the
+backstop: a lost race surfaces as an ``IntegrityError``, which is retried
+with jittered backoff and then reported as an unavailable slot. Lock
+timeouts and deadlocks are retried the same way. Rescheduling takes the
+same lock on the new day and runs the same checks.
+
+Lock rows of past days are never needed again; ``manage.py
+rebuild_daily_loads`` deletes them (``prune_booking_locks``).
+"""
+import random
+import time as time_module
+import uuid
+from datetime import datetime
+
+from django.db import IntegrityError, OperationalError, transaction
+from django.utils import timezone
+
+from .models import Appointment, BookingLock
+from .slot_engine import SlotEngine, load_day
+
+BOOKING_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.05
+
+
+class SlotUnavailable(Exception):
+    """The requested doctor/date/time cannot be booked."""
+
+
+def lock_doctor_day(doctor, day):
+    """
+    Take the row lock for ``doctor`` on ``day`` until the surrounding
+    transaction ends. Must be called inside ``transaction.atomic()``.
+    """
+    BookingLock.objects.select_for_update().get_or_create(doctor=doctor, date=day)
+
+
+def prune_booking_locks(before=None):
+    """
+    Delete the lock rows of days before ``before`` (default: today), which
+    can no longer be booked. Returns the number of rows deleted.
+    """
+    before = before or timezone.localdate()
+    deleted, _ = BookingLock.objects.filter(date__lt=before).delete()
+    return deleted
+
+
+def confirmation_code_for(appointment_id, appointment_date):
+    return f"APT-{appointment_date.year}-{str(appointment_id)[-6:].zfill(6)}"
+
+
+def book_appointment(patient, doctor, appointment_date, appointment_time,
+                     idempotency_key=None, **fields):
+    """
+    Book ``doctor`` for ``patient`` at the given date and time.
+
+    Returns ``(appointment, created)``. ``created`` is False when an earlier
+    request from the same patient with the same ``idempotency_key`` already
+    booked an appointment, in which case that appointment is returned as is.
+    Raises ``SlotUnavailable`` when the slot is outside the doctor's schedule,
+    in the past, or taken.
+    """
+    starts_at = timezone.make_aware(datetime.combine(appointment_date, appointment_time))
+    if starts_at <= timezone.now():
+        raise SlotUnavailable("Appointment must be scheduled for a future date and time.")
+
+    duration = fields.get('duration') or Appointment._meta.get_field('duration').default
+
+    for attempt in range(BOOKING_RETRIES):
+        try:
+            with transaction.atomic():
+                lock_doctor_day(doctor, appointment_date)
+
+                if idempotency_key:
+                    existing = Appointment.objects.filter(
+                        patient=patient,
+                        idempotency_key=idempotency_key
+                    ).select_related('doctor__user').first()
+                    if existing:
+                        return existing, False
+
+                windows, bookings = load_day(doctor.id, appointment_date)
+                if not windows:
+                    raise SlotUnavailable("Doctor is not available at this time.")
+                if not SlotEngine().is_free(windows, bookings, appointment_time, duration):
+                    raise SlotUnavailable("The selected time slot is not available")
+
+                appointment_id = uuid.uuid4()
+                appointment = Appointment(
+                    id=appointment_id,
+                    patient=patient,
+                    doctor=doctor,
+                    appointment_date=appointment_date,
+                    appointment_time=appointment_time,
+                    confirmation_code=confirmation_code_for(appointment_id, appointment_date),
+                    idempotency_key=idempotency_key,
+                    **fields
+                )
+                # Everything full_clean() would check was checked above
+                appointment.save(validate=False, force_insert=True)
+                return appointment, True
+        except OperationalError:
+            # Lock timeouts and deadlocks are transient under load
+            if attempt == BOOKING_RETRIES - 1:
+                raise
+        except IntegrityError:
+            if attempt == BOOKING_RETRIES - 1:
+                break
+        time_module.sleep(RETRY_BACKOFF_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    # Retries exhausted: either a concurrent retry of the same request won,
+    # or someone else took the slot.
+    if idempotency_key:
+        existing = Appointment.objects.filter(
+            patient=patient,
+            idempotency_key=idempotency_key
+        ).select_related('doctor__user').first()
+        if existing:
+            return existing, False
+    raise SlotUnavailable("The selected time slot is not available")
+
+
+def move_appointment(appointment, new_date, new_time, **fields):
+    """
+    Move ``appointment`` to ``new_date`` at ``new_time`` with the doctor's
+    day locked, setting ``fields`` as well. The appointment's current slot
+    does not count against the new one. Raises ``SlotUnavailable`` like
+    ``book_appointment``.
+    """
+    starts_at = timezone.make_aware(datetime.combine(new_date, new_time))
+    if starts_at <= timezone.now():
+        raise SlotUnavailable("Appointment must be scheduled for a future date and time.")
+
+    for attempt in range(BOOKING_RETRIES):
+        try:
+            with transaction.atomic():
+                lock_doctor_day(appointment.doctor, new_date)
+
+                windows, bookings = load_day(appointment.doctor_id, new_date, exclude_id=appointment.id)
+                if not windows:
+                    raise SlotUnavailable("Doctor is not available at this time.")
+                if not SlotEngine().is_free(windows, bookings, new_time, appointment.duration):
+                    raise SlotUnavailable("The selected time slot is not available")
+
+                appointment.appointment_date = new_date
+                appointment.appointment_time = new_time
+                for name, value in fields.items():
+                    setattr(appointment, name, value)
+                appointment.save(validate=False)
+                return appointment
+        except OperationalError:
+            if attempt == BOOKING_RETRIES - 1:
+                raise
+        except IntegrityError:
+            if attempt == BOOKING_RETRIES - 1:
+                break
+        time_module.sleep(RETRY_BACKOFF_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    raise SlotUnavailable("The selected time slot is not available")
@@ -0,0 +1,27 @@
+from django.core.checks import Error, register
+
+
+@register()
+def check_fast_serializers(app_configs, **kwargs):
+    """Each fast serializer's field plan lists the same fields as its DRF serializer."""
+    from .fast_serializers import (
+        fast_appointment, fast_appointment_list, fast_doctor_appointment, plan_differences
+    )
+    from .serializers import (
+        AppointmentSerializer, AppointmentListSerializer, DoctorAppointmentSerializer
+    )
+
+    errors = []
+    for fast_serializer, serializer_class in [
+        (fast_appointment, AppointmentSerializer),
+        (fast_appointment_list, AppointmentListSerializer),
+        (fast_doctor_appointment, DoctorAppointmentSerializer),
+    ]:
+        for difference in plan_differences(fast_serializer.fields, serializer_class()):
+            errors.append(Error(
+                f"Fast serializer for {serializer_class.__name__} is out of step: {difference}.",
+                hint="Update the field plan in appointments/fast_serializers.py to match the serializer.",
+                obj=serializer_class,
+                id='appointments.E001',
+            ))
+    return errors
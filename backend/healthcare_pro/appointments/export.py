@@ -0,0 +1,160 @@
+"""
+Streaming appointment export for reporting.
+
+Rows are read with ``values_list()`` over the appointment, patient, doctor
+and user joins and ``iterator(chunk_size=...)``, which uses a server-side
+cursor on PostgreSQL, so no model instances are built and only one chunk is
+held in memory at a time. The rows are rendered as CSV or NDJSON lines and
+grouped into blocks of about ``STREAM_BLOCK_SIZE`` characters for the HTTP
+response or the output file. Memory use is the same for ten rows or ten
+million.
+
+CSV text cells that a spreadsheet would run as a formula are prefixed with
+a single quote. NDJSON values are written unchanged.
+"""
+import csv
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from .models import Appointment
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_CHUNK_SIZE = 2000
+STREAM_BLOCK_SIZE = 64 * 1024
+# Text cells starting with one of these get a leading ' in CSV output
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# (column, lookup) pairs, in output order
+EXPORT_COLUMNS = [
+    ('appointment_id', 'id'),
+    ('confirmation_code', 'confirmation_code'),
+    ('appointment_date', 'appointment_date'),
+    ('appointment_time', 'appointment_time'),
+    ('duration', 'duration'),
+    ('appointment_type', 'appointment_type'),
+    ('status', 'status'),
+    ('patient_id', 'patient_id'),
+    ('patient_first_name', 'patient__user__first_name'),
+    ('patient_last_name', 'patient__user__last_name'),
+    ('patient_email', 'patient__user__email'),
+    ('doctor_id', 'doctor__doctor_id'),
+    ('doctor_first_name', 'doctor__user__first_name'),
+    ('doctor_last_name', 'doctor__user__last_name'),
+    ('doctor_email', 'doctor__user__email'),
+    ('specialization', 'doctor__specialization'),
+    ('department', 'doctor__department'),
+    ('consultation_fee', 'consultation_fee'),
+    ('is_paid', 'is_paid'),
+    ('cancelled_at', 'cancelled_at'),
+    ('rescheduled_at', 'rescheduled_at'),
+    ('created_at', 'created_at'),
+]
+COLUMN_NAMES = [column for column, _ in EXPORT_COLUMNS]
+
+
+def parse_filters(params):
+    """
+    Read ``date_from``, ``date_to``, ``status`` (comma separated) and
+    ``doctor`` (UUID or ``DOCnnn`` id) from a mapping of strings. Raises
+    ``ValueError`` with a user-facing message on bad input.
+    """
+    filters = {}
+    try:
+        if params.get('date_from'):
+            filters['appointment_date__gte'] = date.fromisoformat(params['date_from'])
+        if params.get('date_to'):
+            filters['appointment_date__lte'] = date.fromisoformat(params['date_to'])
+    except ValueError:
+        raise ValueError("Dates must be in YYYY-MM-DD format.")
+
+    if params.get('status'):
+        statuses = [value.strip() for value in params['status'].split(',') if value.strip()]
+        valid_statuses = {choice for choice, _ in Appointment.STATUS_CHOICES}
+        unknown = [value for value in statuses if value not in valid_statuses]
+        if unknown:
+            raise ValueError(f"Unknown status: {', '.join(unknown)}.")
+        filters['status__in'] = statuses
+
+    doctor = params.get('doctor')
+    if doctor:
+        try:
+            filters['doctor_id'] = uuid.UUID(doctor)
+        except ValueError:
+            filters['doctor__doctor_id'] = doctor
+    return filters
+
+
+def export_rows(filters, chunk_size=EXPORT_CHUNK_SIZE, using=None):
+    """Stream matching appointments as tuples in ``COLUMN_NAMES`` order."""
+    return Appointment.objects.db_manager(using).filter(**filters).order_by(
+        'appointment_date', 'appointment_time', 'id'
+    ).values_list(*(lookup for _, lookup in EXPORT_COLUMNS)).iterator(chunk_size=chunk_size)
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+class _LineBuffer:
+    """File-like object whose ``write`` just returns the line (for csv.writer)."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        # Spreadsheets run text starting with these as a formula (CSV injection)
+        if value.startswith(FORMULA_PREFIXES):
+            return "'" + value
+        return value
+    return _plain(value)
+
+
+def csv_lines(rows):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(COLUMN_NAMES)
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def _json_line(record):
+    # Values are already plain; both encoders give the same compact UTF-8 line
+    if orjson is not None:
+        return orjson.dumps(record).decode() + '\n'
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield _json_line(dict(zip(COLUMN_NAMES, map(_plain, row))))
+
+
+def render(rows, export_format, block_size=STREAM_BLOCK_SIZE):
+    """
+    Render ``rows`` in ``export_format``, yielding blocks of about
+    ``block_size`` characters rather than one tiny string per row.
+    """
+    lines = csv_lines(rows) if export_format == 'csv' else ndjson_lines(rows)
+    block, size = [], 0
+    for line in lines:
+        block.append(line)
+        size += len(line)
+        if size >= block_size:
+            yield ''.join(block)
+            block, size = [], 0
+    if block:
+        yield ''.join(block)
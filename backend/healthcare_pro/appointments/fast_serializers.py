@@ -0,0 +1,436 @@
+"""
+Read-only fast path for the appointment list serializers.
+
+DRF serializes each object by walking every field through
+``get_attribute`` and ``to_representation``, and the nested patient and
+doctor serializers do the same again per row. On lists of a few hundred
+appointments that per-field overhead dominates the response time.
+
+A ``FastSerializer`` is compiled once from a field plan that mirrors one
+of the serializers in ``appointments.serializers``. The plan knows which
+columns to fetch with ``.values()`` (related columns included, so no model
+instances are built and no per-row queries run). It is turned into a
+single generated function that builds each output dict in one expression:
+model fields are converted the way the matching DRF fields convert them
+(UUIDs, dates, times and datetimes in the current timezone, decimals as
+strings), and the method and property fields are computed from their
+columns.
+
+The output equals ``Serializer(queryset, many=True).data`` for the same
+queryset; ``manage.py benchmark_serializers`` checks that and times both.
+Keep a plan in step with its serializer when either one changes: the
+``appointments.E001`` system check (``appointments/checks.py``) fails
+``manage.py check`` and ``runserver`` when their field names differ.
+"""
+import decimal
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .models import Appointment
+
+
+class Context:
+    """Per-call state handed to computed fields and converters."""
+
+    __slots__ = ('timezone', 'field_timezone', 'now', 'today')
+
+    def __init__(self):
+        self.timezone = timezone.get_current_timezone()
+        # DRF's DateTimeField outputs in the current timezone, or naive UTC without USE_TZ
+        self.field_timezone = self.timezone if settings.USE_TZ else None
+        self.now = timezone.now()
+        self.today = date.today()
+
+
+# Converter factories, matching ``to_representation`` of the DRF field that
+# ``ModelSerializer`` maps each model field to. Converters never see None.
+
+def _formatter(output_format, iso_format):
+    if output_format is None:
+        return lambda value: value
+    if output_format.lower() == ISO_8601:
+        return iso_format
+    return lambda value: value.strftime(output_format)
+
+
+def _uuid_converter(field, ctx):
+    return str
+
+
+def _date_converter(field, ctx):
+    return _formatter(api_settings.DATE_FORMAT, date.isoformat)
+
+
+def _time_converter(field, ctx):
+    return _formatter(api_settings.TIME_FORMAT, time.isoformat)
+
+
+def _datetime_converter(field, ctx):
+    output_format = api_settings.DATETIME_FORMAT
+    if output_format is None:
+        return lambda value: value
+    field_timezone = ctx.field_timezone
+    iso = output_format.lower() == ISO_8601
+
+    def convert(value):
+        if field_timezone is not None:
+            if timezone.is_aware(value):
+                value = value.astimezone(field_timezone)
+            else:
+                value = timezone.make_aware(value, field_timezone)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, dt_timezone.utc)
+        if not iso:
+            return value.strftime(output_format)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def _decimal_converter(field, ctx):
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    context.prec = field.max_digits
+    coerce_to_string = api_settings.COERCE_DECIMAL_TO_STRING
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        value = value.quantize(exponent, context=context)
+        return '{:f}'.format(value) if coerce_to_string else value
+    return convert
+
+
+def _converter_factory(field):
+    """Converter factory for a model field, or None when the value is output as is."""
+    if isinstance(field, models.UUIDField):
+        return _uuid_converter
+    # DateTimeField subclasses DateField
+    if isinstance(field, models.DateTimeField):
+        return _datetime_converter
+    if isinstance(field, models.DateField):
+        return _date_converter
+    if isinstance(field, models.TimeField):
+        return _time_converter
+    if isinstance(field, models.DecimalField):
+        return _decimal_converter
+    return None
+
+
+def _model_field(model, lookup):
+    """The field ``lookup`` ends at, and whether its value can be None."""
+    *relations, name = lookup.split('__')
+    nullable = False
+    for relation in relations:
+        relation_field = model._meta.get_field(relation)
+        nullable = nullable or relation_field.null
+        model = relation_field.related_model
+    field = model._meta.get_field(name)
+    return field, nullable or field.null
+
+
+class _Plan:
+    """Columns, converters and helper functions collected while compiling."""
+
+    def __init__(self):
+        self.columns = []
+        self.converters = []
+        self.namespace = {}
+
+    def add_column(self, key):
+        self.columns.append(key)
+        return f'row[{key!r}]'
+
+    def add_converter(self, factory, field):
+        self.converters.append((factory, field))
+        return f'convert_{len(self.converters) - 1}'
+
+    def add_function(self, func):
+        name = f'func_{len(self.namespace)}'
+        self.namespace[name] = func
+        return name
+
+
+class Column:
+    """A model field, output like the DRF field ``ModelSerializer`` maps it to."""
+
+    def __init__(self, lookup=None):
+        self.lookup = lookup
+
+    def compile(self, model, name, prefix, plan):
+        lookup = self.lookup or name
+        field, nullable = _model_field(model, lookup)
+        value = plan.add_column(prefix + lookup)
+        factory = _converter_factory(field)
+        if factory is None:
+            return value
+        converter = plan.add_converter(factory, field)
+        if nullable:
+            return f'(None if {value} is None else {converter}({value}))'
+        return f'{converter}({value})'
+
+
+class Computed:
+    """A method or property field: ``func(ctx, *values of lookups)``."""
+
+    def __init__(self, func, *lookups):
+        self.func = func
+        self.lookups = lookups
+
+    def compile(self, model, name, prefix, plan):
+        values = [plan.add_column(prefix + lookup) for lookup in self.lookups]
+        return f"{plan.add_function(self.func)}(ctx, {', '.join(values)})"
+
+
+class Nested:
+    """A nested serializer over a foreign key, from its own field plan."""
+
+    def __init__(self, fields, lookup=None):
+        self.fields = fields
+        self.lookup = lookup
+
+    def compile(self, model, name, prefix, plan):
+        lookup = self.lookup or name
+        relation_field, nullable = _model_field(model, lookup)
+        related_model = relation_field.related_model
+        nested_prefix = f'{prefix}{lookup}__'
+        output = _compile(related_model, self.fields, nested_prefix, plan)
+        if not nullable:
+            return output
+        pk = plan.add_column(nested_prefix + related_model._meta.pk.name)
+        return f'(None if {pk} is None else {output})'
+
+
+def _compile(model, fields, prefix, plan):
+    """Source of a dict display building the output of one row."""
+    items = [f'{name!r}: {spec.compile(model, name, prefix, plan)}' for name, spec in fields]
+    return '{' + ', '.join(items) + '}'
+
+
+class FastSerializer:
+    """Read-only serializer compiled from a field plan of ``(name, spec)`` pairs."""
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        plan = _Plan()
+        output = _compile(model, fields, '', plan)
+        self.columns = list(dict.fromkeys(plan.columns))
+        self._converters = plan.converters
+
+        # One comprehension over all rows, with every field inlined
+        arguments = ''.join(f', convert_{i}' for i in range(len(plan.converters)))
+        source = f'def serialize(rows, ctx{arguments}):\n    return [{output} for row in rows]\n'
+        namespace = dict(plan.namespace)
+        exec(compile(source, f'<fast serializer for {model.__name__}>', 'exec'), namespace)
+        self._serialize = namespace['serialize']
+        self.source = source
+
+    def rows(self, queryset):
+        """``queryset`` (filters and ordering kept) as the rows the plan reads."""
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def serialize(self, rows):
+        """Output dicts for ``rows`` from ``rows()``."""
+        ctx = Context()
+        converters = [factory(field, ctx) for factory, field in self._converters]
+        return self._serialize(rows, ctx, *converters)
+
+    def data(self, queryset):
+        """Same as ``Serializer(queryset, many=True).data``."""
+        return self.serialize(self.rows(queryset))
+
+
+def plan_differences(fields, serializer, path=''):
+    """
+    How a field plan differs from ``serializer``'s fields, as messages;
+    empty when the names, their order and the nesting all match.
+    """
+    differences = []
+    planned = [name for name, _ in fields]
+    declared = list(serializer.fields)
+    if planned != declared:
+        differences.append(f"{path.rstrip('.') or 'fields'}: plan has {planned}, serializer has {declared}")
+    specs = dict(fields)
+    for name, field in serializer.fields.items():
+        spec = specs.get(name)
+        if spec is None:
+            continue
+        is_nested = hasattr(field, 'fields')
+        if isinstance(spec, Nested) != is_nested:
+            nests, flat = ('serializer', 'plan') if is_nested else ('plan', 'serializer')
+            differences.append(f"{path}{name}: nested in the {nests}, not in the {flat}")
+        elif is_nested:
+            differences += plan_differences(spec.fields, field, f'{path}{name}.')
+    return differences
+
+
+class FastListMixin:
+    """Serve the ``list`` action of a generic view with ``fast_serializer``."""
+
+    fast_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        rows = self.fast_serializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.fast_serializer.serialize(page))
+        return Response(self.fast_serializer.serialize(rows))
+
+
+# Model properties and serializer methods, computed from row values
+
+def _full_name(ctx, first_name, last_name):
+    return f"{first_name} {last_name}"
+
+
+def _doctor_name(ctx, first_name, last_name):
+    return f"Dr. {first_name} {last_name}"
+
+
+def _age(ctx, date_of_birth):
+    if date_of_birth:
+        today = ctx.today
+        return today.year - date_of_birth.year - (
+            (today.month, today.day) < (date_of_birth.month, date_of_birth.day)
+        )
+    return None
+
+
+def _appointment_datetime(ctx, appointment_date, appointment_time):
+    return datetime.combine(appointment_date, appointment_time)
+
+
+def _end_time(ctx, appointment_date, appointment_time, duration):
+    start_datetime = datetime.combine(appointment_date, appointment_time)
+    return (start_datetime + timedelta(minutes=duration)).time()
+
+
+def _is_past(ctx, appointment_date, appointment_time):
+    start = timezone.make_aware(datetime.combine(appointment_date, appointment_time), ctx.timezone)
+    return start <= ctx.now
+
+
+def _can_be_cancelled(ctx, status, appointment_date, appointment_time):
+    if status in ['completed', 'cancelled', 'no_show']:
+        return False
+    start = timezone.make_aware(datetime.combine(appointment_date, appointment_time), ctx.timezone)
+    return start - ctx.now > timedelta(hours=24)
+
+
+# Field plans, in the order of the serializers' Meta.fields
+
+APPOINTMENT_DATETIME = Computed(_appointment_datetime, 'appointment_date', 'appointment_time')
+END_TIME = Computed(_end_time, 'appointment_date', 'appointment_time', 'duration')
+
+# accounts.serializers.UserSerializer
+USER_FIELDS = [
+    ('id', Column()),
+    ('email', Column()),
+    ('first_name', Column()),
+    ('last_name', Column()),
+    ('full_name', Computed(_full_name, 'first_name', 'last_name')),
+    ('role', Column()),
+    ('is_active', Column()),
+    ('date_joined', Column()),
+]
+
+# patients.serializers.PatientProfileListSerializer
+PATIENT_LIST_FIELDS = [
+    ('id', Column()),
+    ('user', Nested(USER_FIELDS)),
+    ('full_name', Computed(_full_name, 'user__first_name', 'user__last_name')),
+    ('phone_number', Column()),
+    ('age', Computed(_age, 'date_of_birth')),
+    ('gender', Column()),
+    ('blood_group', Column()),
+    ('created_at', Column()),
+]
+
+# doctors.serializers.DoctorListSerializer
+DOCTOR_LIST_FIELDS = [
+    ('id', Column()),
+    ('doctor_id', Column()),
+    ('full_name', Computed(_doctor_name, 'user__first_name', 'user__last_name')),
+    ('user', Nested(USER_FIELDS)),
+    ('specialization', Column()),
+    ('years_of_experience', Column()),
+    ('department', Column()),
+    ('consultation_fee', Column()),
+    ('is_available', Column()),
+]
+
+# appointments.serializers.AppointmentSerializer
+APPOINTMENT_FIELDS = [
+    ('id', Column()),
+    ('patient', Nested(PATIENT_LIST_FIELDS)),
+    ('doctor', Nested(DOCTOR_LIST_FIELDS)),
+    ('patient_name', Computed(_full_name, 'patient__user__first_name', 'patient__user__last_name')),
+    ('doctor_name', Computed(_doctor_name, 'doctor__user__first_name', 'doctor__user__last_name')),
+    ('appointment_date', Column()),
+    ('appointment_time', Column()),
+    ('appointment_datetime', APPOINTMENT_DATETIME),
+    ('end_time', END_TIME),
+    ('duration', Column()),
+    ('appointment_type', Column()),
+    ('status', Column()),
+    ('chief_complaint', Column()),
+    ('notes', Column()),
+    ('doctor_notes', Column()),
+    ('consultation_fee', Column()),
+    ('is_paid', Column()),
+    ('is_past', Computed(_is_past, 'appointment_date', 'appointment_time')),
+    ('can_be_cancelled', Computed(_can_be_cancelled, 'status', 'appointment_date', 'appointment_time')),
+    ('created_at', Column()),
+    ('updated_at', Column()),
+]
+
+# appointments.serializers.AppointmentListSerializer
+APPOINTMENT_LIST_FIELDS = [
+    ('id', Column()),
+    ('patient_name', Computed(_full_name, 'patient__user__first_name', 'patient__user__last_name')),
+    ('doctor_name', Computed(_doctor_name, 'doctor__user__first_name', 'doctor__user__last_name')),
+    ('appointment_date', Column()),
+    ('appointment_time', Column()),
+    ('appointment_datetime', APPOINTMENT_DATETIME),
+    ('duration', Column()),
+    ('appointment_type', Column()),
+    ('status', Column()),
+    ('chief_complaint', Column()),
+    ('consultation_fee', Column()),
+    ('is_paid', Column()),
+    ('created_at', Column()),
+]
+
+# appointments.serializers.DoctorAppointmentSerializer
+DOCTOR_APPOINTMENT_FIELDS = [
+    ('id', Column()),
+    ('patient_name', Computed(_full_name, 'patient__user__first_name', 'patient__user__last_name')),
+    ('patient_phone', Column('patient__phone_number')),
+    ('patient_email', Column('patient__user__email')),
+    ('appointment_date', Column()),
+    ('appointment_time', Column()),
+    ('appointment_datetime', APPOINTMENT_DATETIME),
+    ('end_time', END_TIME),
+    ('duration', Column()),
+    ('appointment_type', Column()),
+    ('status', Column()),
+    ('chief_complaint', Column()),
+    ('notes', Column()),
+    ('doctor_notes', Column()),
+    ('consultation_fee', Column()),
+    ('is_paid', Column()),
+    ('created_at', Column()),
+]
+
+fast_appointment = FastSerializer(Appointment, APPOINTMENT_FIELDS)
+fast_appointment_list = FastSerializer(Appointment, APPOINTMENT_LIST_FIELDS)
+fast_doctor_appointment = FastSerializer(Appointment, DOCTOR_APPOINTMENT_FIELDS)
@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from appointments.fast_serializers import (
+    fast_appointment, fast_appointment_list, fast_doctor_appointment
+)
+from appointments.models import Appointment
+from appointments.serializers import (
+    AppointmentSerializer, AppointmentListSerializer, DoctorAppointmentSerializer
+)
+
+BENCHMARKS = [
+    ('AppointmentSerializer', AppointmentSerializer, fast_appointment),
+    ('AppointmentListSerializer', AppointmentListSerializer, fast_appointment_list),
+    ('DoctorAppointmentSerializer', DoctorAppointmentSerializer, fast_doctor_appointment),
+]
+
+
+def best_time(func, repeat):
+    """Fastest of ``repeat`` runs, in seconds."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that the fast appointment serializers return exactly what the DRF "
+        "serializers return, and time both on the latest appointments."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help="Appointments to serialize (default 500).")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per serializer; the fastest counts.")
+        parser.add_argument(
+            '--min-speedup', type=float, default=None,
+            help="Fail if any fast serializer is less than this many times faster."
+        )
+
+    def handle(self, *args, **options):
+        queryset = Appointment.objects.select_related(
+            'patient__user', 'doctor__user'
+        ).order_by('-appointment_date', '-appointment_time', 'id')[:options['rows']]
+        # Both sides serialize rows already in memory, so only serialization is timed
+        instances = list(queryset)
+        if not instances:
+            raise CommandError("No appointments to benchmark.")
+        renderer = JSONRenderer()
+
+        slowest = None
+        for name, serializer_class, fast_serializer in BENCHMARKS:
+            rows = list(fast_serializer.rows(queryset))
+            expected = serializer_class(instances, many=True).data
+            actual = fast_serializer.serialize(rows)
+            if renderer.render(actual) != renderer.render(expected):
+                raise CommandError(f"{name}: fast output differs from the DRF serializer.")
+
+            drf_seconds = best_time(lambda: serializer_class(instances, many=True).data, options['repeat'])
+            fast_seconds = best_time(lambda: fast_serializer.serialize(rows), options['repeat'])
+            speedup = drf_seconds / fast_seconds
+            slowest = speedup if slowest is None else min(slowest, speedup)
+            self.stdout.write(
+                f"{name}: {len(instances)} rows, DRF {drf_seconds * 1000:.1f} ms, "
+                f"fast {fast_seconds * 1000:.1f} ms, {speedup:.1f}x"
+            )
+
+        if options['min_speedup'] is not None and slowest < options['min_speedup']:
+            raise CommandError(f"Slowest speedup {slowest:.1f}x is below {options['min_speedup']}x.")
+        self.stdout.write(self.style.SUCCESS("Fast serializers match the DRF output."))
@@ -0,0 +1,45 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from appointments.reminders import DEFAULT_BATCH_SIZE, DEFAULT_WORKERS, dispatch_due_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        "Send due appointment reminders. Runs until interrupted unless --once is given. "
+        "Several instances can run side by side without sending a reminder twice."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Reminders claimed per batch.")
+        parser.add_argument('--workers', type=int,
+                            default=getattr(settings, 'REMINDER_DISPATCH_WORKERS', DEFAULT_WORKERS),
+                            help="Threads delivering reminders concurrently.")
+        parser.add_argument('--poll-interval', type=float, default=10.0,
+                            help="Seconds to wait when nothing is due.")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit as soon as no reminders are due.")
+
+    def handle(self, *args, **options):
+        totals = {'sent': 0, 'failed': 0}
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            try:
+                while True:
+                    claimed, sent, failed = dispatch_due_reminders(options['batch_size'], executor=executor)
+                    totals['sent'] += sent
+                    totals['failed'] += failed
+                    if claimed:
+                        self.stdout.write(f"Claimed {claimed} reminders: {sent} sent, {failed} failed.")
+                        continue
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                pass
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['sent']} reminders, {totals['failed']} failed."
+        ))
@@ -0,0 +1,128 @@
+import re
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import EmailOutbox
+from appointments.models import Appointment, AppointmentReminder
+from appointments.reminders import due_reminders
+from doctors.models import Doctor
+from patients.models import PatientProfile
+
+# Large tables that must never be read with a full scan
+WATCHED_TABLES = {
+    Appointment._meta.db_table,
+    AppointmentReminder._meta.db_table,
+    EmailOutbox._meta.db_table,
+}
+
+
+def hot_queries(doctor_id, patient_id):
+    """``(name, queryset)`` pairs mirroring the filters of the busiest views."""
+    today = timezone.localdate()
+    now = timezone.now()
+    appointments = Appointment.objects.all()
+    return [
+        # doctors.views.dashboard_views.doctor_dashboard
+        ('doctor_today', appointments.filter(
+            doctor_id=doctor_id, appointment_date=today
+        ).order_by('appointment_time')),
+        ('doctor_today_by_status', appointments.filter(
+            doctor_id=doctor_id, appointment_date=today, status='scheduled'
+        )),
+        # appointments.slot_engine.load_range
+        ('doctor_week_bookings', appointments.filter(
+            doctor_id__in=[doctor_id],
+            appointment_date__range=[today, today + timedelta(days=6)],
+            status__in=Appointment.ACTIVE_STATUSES
+        ).values_list('doctor_id', 'appointment_date', 'appointment_time', 'duration')),
+        # patients.views.appointment_views / AppointmentListCreateView
+        ('patient_appointments', appointments.filter(
+            patient_id=patient_id
+        ).order_by('-appointment_date', '-appointment_time')),
+        ('patient_by_status', appointments.filter(patient_id=patient_id, status='completed')),
+        # patients.dashboard.build_dashboard
+        ('patient_upcoming', appointments.filter(
+            patient_id=patient_id,
+            appointment_date__gte=today,
+            status__in=['scheduled', 'confirmed']
+        ).order_by('appointment_date', 'appointment_time')),
+        # accounts.views.admin_views.admin_dashboard_stats
+        ('admin_today_schedule', appointments.filter(
+            appointment_date=today
+        ).order_by('appointment_time', 'id')[:50]),
+        # appointments.reminders.generate_missing_reminders
+        ('reminder_backfill', appointments.filter(
+            appointment_date__gte=today, status__in=Appointment.ACTIVE_STATUSES
+        ).values_list('id', 'appointment_date', 'appointment_time')),
+        # appointments.reminders.claim_due_reminders
+        ('due_reminders', due_reminders(now).order_by('reminder_time').values_list('id', flat=True)[:500]),
+        # accounts.outbox.claim_batch
+        ('outbox_due', EmailOutbox.objects.filter(
+            status='pending', next_attempt_at__lte=now
+        ).order_by('next_attempt_at').values_list('id', flat=True)[:100]),
+    ]
+
+
+def full_scans(plan, vendor):
+    """Watched tables the plan reads with a full table scan."""
+    if vendor == 'postgresql':
+        tables = re.findall(r'Seq Scan on (\w+)', plan)
+    elif vendor == 'sqlite':
+        # SCAN reads every row (even "USING INDEX" just walks the whole index);
+        # SEARCH is an index lookup
+        tables = re.findall(r'\bSCAN (?:TABLE )?(\w+)', plan)
+    else:
+        tables = []
+    return sorted(set(tables) & WATCHED_TABLES)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the hot appointment, reminder and outbox queries and flag full "
+        "table scans of those tables. Best run against a production-sized copy: on tiny "
+        "tables PostgreSQL rightly prefers sequential scans (see --disable-seqscan)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help="Print every plan, not only the flagged ones.")
+        parser.add_argument('--disable-seqscan', action='store_true',
+                            help="PostgreSQL only: SET enable_seqscan = off, to check an index "
+                                 "can serve each query even when the tables are small.")
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help="Exit with an error when a scan is flagged (for CI).")
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in ('postgresql', 'sqlite'):
+            self.stderr.write(f"Scan detection is not implemented for {vendor}; plans are printed only.")
+            options['verbose_plans'] = True
+
+        doctor_id = Doctor.objects.values_list('id', flat=True).first() or uuid.uuid4()
+        patient_id = PatientProfile.objects.values_list('id', flat=True).first() or 0
+
+        flagged = []
+        with transaction.atomic():
+            if options['disable_seqscan'] and vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for name, queryset in hot_queries(doctor_id, patient_id):
+                plan = queryset.explain()
+                scans = full_scans(plan, vendor)
+                if scans:
+                    flagged.append(name)
+                    self.stdout.write(self.style.WARNING(f"{name}: full scan of {', '.join(scans)}"))
+                else:
+                    self.stdout.write(f"{name}: ok")
+                if scans or options['verbose_plans']:
+                    self.stdout.write(f"    {plan}".replace('\n', '\n    '))
+
+        if not flagged:
+            self.stdout.write(self.style.SUCCESS("No full scans of the watched tables."))
+        elif options['fail_on_scan']:
+            raise CommandError(f"Full table scans in: {', '.join(flagged)}")
@@ -0,0 +1,43 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from appointments.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_rows, parse_filters, render
+
+
+class Command(BaseCommand):
+    help = (
+        "Export appointments with patient and doctor details as CSV or NDJSON. "
+        "Rows are streamed from the database, so memory stays flat for any size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv', dest='export_format',
+                            help="Output format.")
+        parser.add_argument('--from-date', help="First appointment date (YYYY-MM-DD).")
+        parser.add_argument('--to-date', help="Last appointment date (YYYY-MM-DD).")
+        parser.add_argument('--status', help="Comma separated statuses to include.")
+        parser.add_argument('--doctor', help="Doctor UUID or doctor id (DOCnnn).")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+                            help="Rows fetched from the database cursor at a time.")
+        parser.add_argument('--output', help="File to write. Defaults to standard output.")
+
+    def handle(self, *args, **options):
+        try:
+            filters = parse_filters({
+                'date_from': options['from_date'],
+                'date_to': options['to_date'],
+                'status': options['status'],
+                'doctor': options['doctor'],
+            })
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        rows = export_rows(filters, options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                for block in render(rows, options['export_format']):
+                    output.write(block)
+        else:
+            for block in render(rows, options['export_format']):
+                sys.stdout.write(block)
@@ -0,0 +1,30 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from appointments.reminders import BACKFILL_CHUNK_SIZE, generate_missing_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill policy reminders for existing active appointments. "
+        "Safe to re-run: reminders that already exist are not duplicated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from-date', help="First appointment date (YYYY-MM-DD). Defaults to today.")
+        parser.add_argument('--to-date', help="Last appointment date (YYYY-MM-DD).")
+        parser.add_argument('--chunk-size', type=int, default=BACKFILL_CHUNK_SIZE,
+                            help="Appointments processed per chunk.")
+
+    def handle(self, *args, **options):
+        try:
+            start_date = date.fromisoformat(options['from_date']) if options['from_date'] else None
+            end_date = date.fromisoformat(options['to_date']) if options['to_date'] else None
+        except ValueError:
+            raise CommandError("Dates must be in YYYY-MM-DD format.")
+
+        seen, created = generate_missing_reminders(start_date, end_date, options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {seen} appointments, created {created} reminders."
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from appointments.assignment import rebuild_daily_loads
+from appointments.booking import prune_booking_locks
+from appointments.models import DoctorDailyLoad
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute per-doctor daily booking counts from the appointments table "
+        "and delete the booking lock rows of past days."
+    )
+
+    def handle(self, *args, **options):
+        rebuild_daily_loads()
+        pruned = prune_booking_locks()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {DoctorDailyLoad.objects.count()} doctor daily load rows; "
+            f"deleted {pruned} past booking lock rows."
+        ))
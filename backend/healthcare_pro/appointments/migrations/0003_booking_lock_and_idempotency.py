@@ -0,0 +1,51 @@
+# Generated by Django 4.2.9 on 2026-10-17 19:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0002_rename_qualifications_doctor_qualification_and_more'),
+        ('appointments', '0002_appointment_cancellation_reason_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+            ],
+            options={
+                'db_table': 'appointment_booking_locks',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='appointment',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='idempotency_key',
+            field=models.CharField(blank=True, help_text='Client supplied key used to deduplicate booking retries', max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['scheduled', 'confirmed', 'in_progress', 'rescheduled'])), fields=('doctor', 'appointment_date', 'appointment_time'), name='unique_active_appointment_slot'),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(fields=('patient', 'idempotency_key'), name='unique_patient_idempotency_key'),
+        ),
+        migrations.AddField(
+            model_name='bookinglock',
+            name='doctor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_locks', to='doctors.doctor'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='bookinglock',
+            unique_together={('doctor', 'date')},
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.9 on 2026-10-17 19:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_daily_loads(apps, schema_editor):
+    Appointment = apps.get_model('appointments', 'Appointment')
+    DoctorDailyLoad = apps.get_model('appointments', 'DoctorDailyLoad')
+    rows = Appointment.objects.filter(
+        status__in=['scheduled', 'confirmed', 'in_progress', 'rescheduled']
+    ).values('doctor_id', 'appointment_date').annotate(total=models.Count('id')).order_by()
+    DoctorDailyLoad.objects.bulk_create(
+        DoctorDailyLoad(doctor_id=row['doctor_id'], date=row['appointment_date'], booked_count=row['total'])
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0002_rename_qualifications_doctor_qualification_and_more'),
+        ('appointments', '0003_booking_lock_and_idempotency'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoctorDailyLoad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('booked_count', models.PositiveIntegerField(default=0)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_loads', to='doctors.doctor')),
+            ],
+            options={
+                'db_table': 'doctor_daily_loads',
+                'unique_together': {('doctor', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_loads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.9 on 2026-10-17 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0004_doctor_daily_load'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointmentreminder',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='appointmentreminder',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, help_text='A dispatcher owns this reminder until then', null=True),
+        ),
+        migrations.AddField(
+            model_name='appointmentreminder',
+            name='last_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
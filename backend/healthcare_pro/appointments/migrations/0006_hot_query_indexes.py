@@ -0,0 +1,46 @@
+# Generated by Django 4.2.9 on 2026-10-17 19:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0004_remove_prescription_model'),
+        ('doctors', '0003_doctor_id_sequence'),
+        ('appointments', '0005_reminder_dispatch_state'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='appointment',
+            name='doctor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='doctors.doctor'),
+        ),
+        migrations.AlterField(
+            model_name='appointment',
+            name='patient',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='patients.patientprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', 'appointment_date', 'status'], name='appt_doctor_date_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', 'status'], name='appt_patient_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', 'appointment_date'], name='appt_patient_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['appointment_date', 'appointment_time'], name='appt_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointmentreminder',
+            index=models.Index(condition=models.Q(('is_sent', False)), fields=['reminder_time'], name='reminder_due_idx'),
+        ),
+    ]
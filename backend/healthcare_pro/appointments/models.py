@@ -4,6 +4,9 @@ from django.utils import timezone
 from datetime import datetime, timedelta
 import uuid
 
+# Statuses that still occupy the doctor's time slot
+ACTIVE_STATUSES = ['scheduled', 'confirmed', 'in_progress', 'rescheduled']
+
 
 class Appointment(models.Model):
     """Appointment model for patient-doctor bookings."""
@@ -17,7 +20,9 @@ class Appointment(models.Model):
         ('no_show', 'No Show'),
         ('rescheduled', 'Rescheduled'),
     ]
-    
+
+    ACTIVE_STATUSES = ACTIVE_STATUSES
+
     APPOINTMENT_TYPE_CHOICES = [
         ('consultation', 'Consultation'),
         ('follow_up', 'Follow-up'),
@@ -28,8 +33,10 @@ class Appointment(models.Model):
     ]
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    patient = models.ForeignKey('patients.PatientProfile', on_delete=models.CASCADE, related_name='appointments')
-    doctor = models.ForeignKey('doctors.Doctor', on_delete=models.CASCADE, related_name='appointments')
+    # The composite indexes in Meta lead with these columns, so the
+    # single-column foreign key indexes would only slow down writes
+    patient = models.ForeignKey('patients.PatientProfile', on_delete=models.CASCADE, related_name='appointments', db_index=False)
+    doctor = models.ForeignKey('doctors.Doctor', on_delete=models.CASCADE, related_name='appointments', db_index=False)
     
     # Appointment details
     appointment_date = models.DateField()
@@ -46,6 +53,7 @@ class Appointment(models.Model):
     
     # Booking details
     confirmation_code = models.CharField(max_length=20, blank=True, null=True, unique=True)
+    idempotency_key = models.CharField(max_length=64, blank=True, null=True, help_text="Client supplied key used to deduplicate booking retries")
     
     # Cancellation/Rescheduling
     cancellation_reason = models.TextField(blank=True, null=True)
@@ -66,7 +74,29 @@ class Appointment(models.Model):
         verbose_name = 'Appointment'
         verbose_name_plural = 'Appointments'
         ordering = ['appointment_date', 'appointment_time']
-        unique_together = ['doctor', 'appointment_date', 'appointment_time']
+        constraints = [
+            # Cancelled and completed appointments must not block the slot
+            models.UniqueConstraint(
+                fields=['doctor', 'appointment_date', 'appointment_time'],
+                condition=models.Q(status__in=ACTIVE_STATUSES),
+                name='unique_active_appointment_slot'
+            ),
+            models.UniqueConstraint(
+                fields=['patient', 'idempotency_key'],
+                name='unique_patient_idempotency_key'
+            ),
+        ]
+        # Index plan for the hot queries; `manage.py explain_hot_queries` checks them
+        indexes = [
+            # Doctor dashboards and slot lookups: one doctor, one day, by status
+            models.Index(fields=['doctor', 'appointment_date', 'status'], name='appt_doctor_date_status_idx'),
+            # Patient dashboard counts and status filtered lists
+            models.Index(fields=['patient', 'status'], name='appt_patient_status_idx'),
+            # Patient appointment lists ordered by date
+            models.Index(fields=['patient', 'appointment_date'], name='appt_patient_date_idx'),
+            # Admin daily schedule, reminder backfill and exports by date
+            models.Index(fields=['appointment_date', 'appointment_time'], name='appt_date_time_idx'),
+        ]
     
     def __str__(self):
         return f"{self.patient.user.get_full_name()} - Dr. {self.doctor.user.get_full_name()} ({self.appointment_date} {self.appointment_time})"
@@ -74,26 +104,21 @@ class Appointment(models.Model):
     def clean(self):
         """Validate appointment data."""
         # Check if appointment is in the future
-        appointment_datetime = datetime.combine(self.appointment_date, self.appointment_time)
+        appointment_datetime = timezone.make_aware(datetime.combine(self.appointment_date, self.appointment_time))
         if appointment_datetime <= timezone.now():
             raise ValidationError("Appointment must be scheduled for a future date and time.")
         
         # Check if doctor is available at this time
-        if hasattr(self, 'doctor') and self.doctor:
-            day_of_week = self.appointment_date.weekday()
-            from doctors.models import Availability
-            doctor_schedule = Availability.objects.filter(
-                doctor=self.doctor,
-                day=day_of_week,
-                start_time__lte=self.appointment_time,
-                end_time__gte=self.appointment_time,
-                is_available=True
-            )
-            if not doctor_schedule.exists():
+        if self.doctor_id:
+            from doctors.schedule_cache import is_on_shift
+            if not is_on_shift(self.doctor_id, self.appointment_date, self.appointment_time):
                 raise ValidationError("Doctor is not available at this time.")
     
-    def save(self, *args, **kwargs):
-        self.full_clean()
+    def save(self, *args, validate=True, **kwargs):
+        # Callers that already validated under a booking lock can skip the
+        # extra queries full_clean() would run.
+        if validate:
+            self.full_clean()
         
         # Set consultation fee from doctor's profile if not set
         if not self.consultation_fee and hasattr(self, 'doctor'):
@@ -116,7 +141,7 @@ class Appointment(models.Model):
     @property
     def is_past(self):
         """Check if appointment is in the past."""
-        return self.appointment_datetime <= timezone.now()
+        return timezone.make_aware(self.appointment_datetime) <= timezone.now()
     
     @property
     def can_be_cancelled(self):
@@ -124,10 +149,46 @@ class Appointment(models.Model):
         if self.status in ['completed', 'cancelled', 'no_show']:
             return False
         
-        time_until_appointment = self.appointment_datetime - timezone.now()
+        time_until_appointment = timezone.make_aware(self.appointment_datetime) - timezone.now()
         return time_until_appointment > timedelta(hours=24)
 
 
+class BookingLock(models.Model):
+    """
+    One row per doctor and day, locked with SELECT ... FOR UPDATE while a
+    booking for that day is checked and inserted.
+    """
+    
+    doctor = models.ForeignKey('doctors.Doctor', on_delete=models.CASCADE, related_name='booking_locks')
+    date = models.DateField()
+    
+    class Meta:
+        db_table = 'appointment_booking_locks'
+        unique_together = ['doctor', 'date']
+    
+    def __str__(self):
+        return f"Booking lock {self.doctor_id} {self.date}"
+
+
+class DoctorDailyLoad(models.Model):
+    """
+    Number of active appointments a doctor has on a given day.
+    Kept up to date by the Appointment signal handlers and used to spread
+    department bookings across doctors without counting appointments.
+    """
+    
+    doctor = models.ForeignKey('doctors.Doctor', on_delete=models.CASCADE, related_name='daily_loads')
+    date = models.DateField()
+    booked_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'doctor_daily_loads'
+        unique_together = ['doctor', 'date']
+    
+    def __str__(self):
+        return f"{self.doctor_id} {self.date}: {self.booked_count}"
+
+
 class AppointmentSlot(models.Model):
     """Available time slots for appointments."""
     
@@ -185,6 +246,11 @@ class AppointmentReminder(models.Model):
     is_sent = models.BooleanField(default=False)
     sent_at = models.DateTimeField(blank=True, null=True)
     
+    # Delivery bookkeeping for the reminder dispatcher
+    claimed_until = models.DateTimeField(blank=True, null=True, help_text="A dispatcher owns this reminder until then")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -194,6 +260,10 @@ class AppointmentReminder(models.Model):
         verbose_name = 'Appointment Reminder'
         verbose_name_plural = 'Appointment Reminders'
         ordering = ['reminder_time']
+        indexes = [
+            # Dispatcher scan for due reminders; sent rows are never looked at again
+            models.Index(fields=['reminder_time'], condition=models.Q(is_sent=False), name='reminder_due_idx'),
+        ]
     
     def __str__(self):
         return f"Reminder for {self.appointment} - {self.get_reminder_type_display()}"
\ No newline at end of file
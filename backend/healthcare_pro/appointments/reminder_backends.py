@@ -0,0 +1,92 @@
+"""
+Delivery backends for appointment reminders.
+
+The dispatcher picks a backend per ``reminder_type`` from the
+``APPOINTMENT_REMINDER_BACKENDS`` setting (dotted paths). A backend gets a
+list of reminders, with appointment, patient and doctor already loaded, and
+returns ``{reminder_id: error}`` where ``error`` is None for reminders that
+were delivered. Backends run in worker threads and must not touch the
+database.
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKENDS = {
+    'email': 'appointments.reminder_backends.EmailReminderBackend',
+    'sms': 'appointments.reminder_backends.LoggingReminderBackend',
+    'push': 'appointments.reminder_backends.LoggingReminderBackend',
+}
+
+
+def reminder_text(reminder):
+    appointment = reminder.appointment
+    return (
+        f"Reminder: you have an appointment with Dr. {appointment.doctor.user.get_full_name()} "
+        f"on {appointment.appointment_date.strftime('%b %d, %Y')} at "
+        f"{appointment.appointment_time.strftime('%I:%M %p')}."
+    )
+
+
+class BaseReminderBackend:
+    """Sends a batch of reminders of one type."""
+
+    def send_many(self, reminders):
+        raise NotImplementedError
+
+
+class EmailReminderBackend(BaseReminderBackend):
+    """Emails the patient, reusing one connection for the whole batch."""
+
+    subject = 'HealthCare Pro - Appointment Reminder'
+
+    def send_many(self, reminders):
+        results = {}
+        connection = get_connection()
+        try:
+            connection.open()
+            for reminder in reminders:
+                message = EmailMessage(
+                    self.subject,
+                    reminder_text(reminder),
+                    settings.DEFAULT_FROM_EMAIL,
+                    [reminder.appointment.patient.user.email],
+                    connection=connection
+                )
+                try:
+                    message.send()
+                    results[reminder.id] = None
+                except Exception as e:
+                    results[reminder.id] = str(e) or e.__class__.__name__
+        except Exception as e:
+            # Could not connect at all: fail whatever was not attempted
+            for reminder in reminders:
+                results.setdefault(reminder.id, str(e) or e.__class__.__name__)
+        finally:
+            connection.close()
+        return results
+
+
+class LoggingReminderBackend(BaseReminderBackend):
+    """
+    Writes reminders to the log instead of delivering them. Default for SMS
+    and push until a provider backend is configured.
+    """
+
+    def send_many(self, reminders):
+        for reminder in reminders:
+            logger.info(
+                "%s reminder for appointment %s: %s",
+                reminder.reminder_type, reminder.appointment_id, reminder_text(reminder)
+            )
+        return {reminder.id: None for reminder in reminders}
+
+
+def get_backend(reminder_type):
+    """Instantiate the configured backend for ``reminder_type``."""
+    paths = {**DEFAULT_BACKENDS, **getattr(settings, 'APPOINTMENT_REMINDER_BACKENDS', {})}
+    return import_string(paths[reminder_type])()
@@ -0,0 +1,250 @@
+"""
+Reminder generation and dispatch.
+
+Reminder rows are generated from ``APPOINTMENT_REMINDER_POLICY`` when an
+appointment is booked or moved, and pending ones are dropped when it stops
+being active (see ``appointments.signals``). ``generate_missing_reminders``
+backfills existing appointments in chunks.
+
+Workers claim due reminders in batches: a short transaction selects them
+with ``SELECT ... FOR UPDATE SKIP LOCKED`` and stamps a lease
+(``claimed_until``) on them, so concurrent workers never pick the same
+rows. Delivery then happens outside the transaction on a bounded thread
+pool, and the outcome is written back with one bulk ``UPDATE`` for the
+delivered reminders plus one per distinct failure. Failed reminders are
+retried with exponential backoff until ``MAX_ATTEMPTS``; a worker that dies
+mid-batch simply lets its lease expire. The write-back only touches rows
+still carrying the lease this worker stamped: when a slow batch outlives
+its lease and another worker re-claims a reminder, the first worker's
+outcome for that reminder is dropped.
+"""
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Appointment, AppointmentReminder
+from .reminder_backends import get_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REMINDER_POLICY = [
+    {'reminder_type': 'email', 'minutes_before': 24 * 60},
+    {'reminder_type': 'email', 'minutes_before': 2 * 60},
+]
+BACKFILL_CHUNK_SIZE = 2000
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_WORKERS = 4
+SEND_CHUNK_SIZE = 50
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF_SECONDS = 60
+
+
+def reminder_policy():
+    return getattr(settings, 'APPOINTMENT_REMINDER_POLICY', DEFAULT_REMINDER_POLICY)
+
+
+def build_reminders(appointments, now=None):
+    """
+    Unsaved reminders for ``(appointment_id, date, time)`` tuples according
+    to the policy. Reminders whose time has already passed are skipped.
+    """
+    now = now or timezone.now()
+    policy = reminder_policy()
+    reminders = []
+    for appointment_id, appointment_date, appointment_time in appointments:
+        starts_at = timezone.make_aware(datetime.combine(appointment_date, appointment_time))
+        for rule in policy:
+            reminder_time = starts_at - timedelta(minutes=rule['minutes_before'])
+            if reminder_time > now:
+                reminders.append(AppointmentReminder(
+                    appointment_id=appointment_id,
+                    reminder_type=rule['reminder_type'],
+                    reminder_time=reminder_time
+                ))
+    return reminders
+
+
+def create_reminders(appointments):
+    """Create the policy reminders of ``(appointment_id, date, time)`` tuples in bulk."""
+    return AppointmentReminder.objects.bulk_create(build_reminders(appointments))
+
+
+def clear_pending_reminders(appointment_ids):
+    """Delete the unsent reminders of ``appointment_ids`` in one statement."""
+    deleted, _ = AppointmentReminder.objects.filter(
+        appointment_id__in=appointment_ids,
+        is_sent=False
+    ).delete()
+    return deleted
+
+
+def generate_missing_reminders(start_date=None, end_date=None, chunk_size=BACKFILL_CHUNK_SIZE):
+    """
+    Create policy reminders that do not exist yet for active appointments
+    between ``start_date`` (default today) and ``end_date``. Appointments are
+    streamed in chunks so memory stays flat however many are covered.
+    Returns ``(appointments_seen, reminders_created)``.
+    """
+    appointments = Appointment.objects.filter(
+        appointment_date__gte=start_date or timezone.localdate(),
+        status__in=Appointment.ACTIVE_STATUSES
+    )
+    if end_date:
+        appointments = appointments.filter(appointment_date__lte=end_date)
+    rows = appointments.order_by().values_list(
+        'id', 'appointment_date', 'appointment_time'
+    ).iterator(chunk_size=chunk_size)
+
+    seen = created = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            created += _create_missing(chunk)
+            seen += len(chunk)
+            chunk = []
+    if chunk:
+        created += _create_missing(chunk)
+        seen += len(chunk)
+    return seen, created
+
+
+def _create_missing(chunk):
+    existing = set(AppointmentReminder.objects.filter(
+        appointment_id__in=[appointment_id for appointment_id, _, _ in chunk]
+    ).values_list('appointment_id', 'reminder_type', 'reminder_time'))
+    missing = [
+        reminder for reminder in build_reminders(chunk)
+        if (reminder.appointment_id, reminder.reminder_type, reminder.reminder_time) not in existing
+    ]
+    AppointmentReminder.objects.bulk_create(missing, batch_size=500)
+    return len(missing)
+
+
+def due_reminders(now):
+    """Unsent reminders that are due, not leased, and still worth sending."""
+    return AppointmentReminder.objects.filter(
+        Q(claimed_until__isnull=True) | Q(claimed_until__lt=now),
+        is_sent=False,
+        reminder_time__lte=now,
+        attempts__lt=MAX_ATTEMPTS,
+        appointment__status__in=Appointment.ACTIVE_STATUSES
+    )
+
+
+def claim_due_reminders(batch_size=DEFAULT_BATCH_SIZE, lease_seconds=LEASE_SECONDS):
+    """
+    Lease up to ``batch_size`` due reminders to this worker and return them
+    with appointment, patient and doctor loaded.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        claimed_ids = list(
+            due_reminders(now).select_for_update(skip_locked=True, of=('self',)).order_by(
+                'reminder_time'
+            ).values_list('id', flat=True)[:batch_size]
+        )
+        if not claimed_ids:
+            return []
+        AppointmentReminder.objects.filter(id__in=claimed_ids).update(
+            claimed_until=now + timedelta(seconds=lease_seconds)
+        )
+
+    return list(AppointmentReminder.objects.filter(id__in=claimed_ids).select_related(
+        'appointment__patient__user', 'appointment__doctor__user'
+    ))
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _send_chunk(reminder_type, reminders):
+    try:
+        return get_backend(reminder_type).send_many(reminders)
+    except Exception as e:
+        logger.exception("Reminder backend %s failed", reminder_type)
+        return {reminder.id: str(e) or e.__class__.__name__ for reminder in reminders}
+
+
+def send_reminders(reminders, executor):
+    """Deliver ``reminders`` on ``executor``; returns ``{reminder_id: error or None}``."""
+    by_type = defaultdict(list)
+    for reminder in reminders:
+        by_type[reminder.reminder_type].append(reminder)
+
+    futures = [
+        executor.submit(_send_chunk, reminder_type, chunk)
+        for reminder_type, typed in by_type.items()
+        for chunk in _chunks(typed, SEND_CHUNK_SIZE)
+    ]
+    results = {}
+    for future in futures:
+        results.update(future.result())
+    return results
+
+
+def record_results(reminders, results):
+    """
+    Write delivery outcomes of ``reminders`` back in bulk, skipping those
+    whose lease has since passed to another worker.
+    Returns ``(sent, failed)`` counts of the rows written.
+    """
+    now = timezone.now()
+    sent = defaultdict(list)
+    failures = defaultdict(list)
+    for reminder in reminders:
+        error = results.get(reminder.id, "No result from reminder backend")
+        # claimed_until is the lease claim_due_reminders stamped for this worker
+        if error is None:
+            sent[reminder.claimed_until].append(reminder.id)
+        else:
+            failures[(reminder.claimed_until, reminder.attempts, error[:1000])].append(reminder.id)
+
+    sent_count = failed_count = 0
+    for lease, reminder_ids in sent.items():
+        sent_count += AppointmentReminder.objects.filter(id__in=reminder_ids, claimed_until=lease).update(
+            is_sent=True, sent_at=now, claimed_until=None, last_error=None, updated_at=now
+        )
+    for (lease, attempts, error), reminder_ids in failures.items():
+        failed_count += AppointmentReminder.objects.filter(id__in=reminder_ids, claimed_until=lease).update(
+            attempts=attempts + 1,
+            last_error=error,
+            # Keep the lease until the backoff has passed, so the retry waits that long
+            claimed_until=now + timedelta(seconds=RETRY_BACKOFF_SECONDS * 2 ** attempts),
+            updated_at=now
+        )
+
+    lost = len(reminders) - sent_count - failed_count
+    if lost:
+        logger.warning("%d reminder results dropped: their lease expired and another worker claimed them", lost)
+    return sent_count, failed_count
+
+
+def dispatch_due_reminders(batch_size=DEFAULT_BATCH_SIZE, workers=None, executor=None):
+    """
+    Claim, send and record one batch of due reminders.
+    Returns ``(claimed, sent, failed)`` counts.
+    """
+    reminders = claim_due_reminders(batch_size)
+    if not reminders:
+        return 0, 0, 0
+
+    if executor is None:
+        workers = workers or getattr(settings, 'REMINDER_DISPATCH_WORKERS', DEFAULT_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = send_reminders(reminders, pool)
+    else:
+        results = send_reminders(reminders, executor)
+
+    sent, failed = record_results(reminders, results)
+    return len(reminders), sent, failed
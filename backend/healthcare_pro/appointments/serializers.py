@@ -55,22 +55,14 @@ class AppointmentCreateSerializer(serializers.ModelSerializer):
         doctor = data.get('doctor')
         
         # Check if appointment is in the future
-        appointment_datetime = datetime.combine(appointment_date, appointment_time)
+        appointment_datetime = timezone.make_aware(datetime.combine(appointment_date, appointment_time))
         if appointment_datetime <= timezone.now():
             raise serializers.ValidationError("Appointment must be scheduled for a future date and time.")
         
         # Check if doctor is available
         if doctor:
-            day_of_week = appointment_date.weekday()
-            from doctors.models import Availability
-            doctor_schedule = Availability.objects.filter(
-                doctor=doctor,
-                day=day_of_week,
-                start_time__lte=appointment_time,
-                end_time__gte=appointment_time,
-                is_available=True
-            )
-            if not doctor_schedule.exists():
+            from doctors.schedule_cache import is_on_shift
+            if not is_on_shift(doctor.id, appointment_date, appointment_time):
                 raise serializers.ValidationError("Doctor is not available at this time.")
             
             # Check for conflicting appointments
@@ -78,7 +70,7 @@ class AppointmentCreateSerializer(serializers.ModelSerializer):
                 doctor=doctor,
                 appointment_date=appointment_date,
                 appointment_time=appointment_time,
-                status__in=['scheduled', 'confirmed', 'in_progress']
+                status__in=Appointment.ACTIVE_STATUSES
             )
             if conflicting_appointments.exists():
                 raise serializers.ValidationError("Doctor already has an appointment at this time.")
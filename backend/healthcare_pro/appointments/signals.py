@@ -0,0 +1,89 @@
+from collections import namedtuple
+
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from accounts import counters
+from .models import Appointment
+from .assignment import adjust_daily_load
+from .reminders import clear_pending_reminders, create_reminders
+
+TrackedState = namedtuple('TrackedState', 'doctor_id appointment_date appointment_time status')
+
+
+def _tracked_state(instance):
+    """
+    The fields of an appointment that derived data depends on.
+    Reads ``__dict__`` directly so deferred fields are never fetched.
+    """
+    values = instance.__dict__
+    return TrackedState(*(values.get(field) for field in TrackedState._fields))
+
+
+def _is_active(state):
+    return (
+        state is not None
+        and state.status in Appointment.ACTIVE_STATUSES
+        and state.doctor_id is not None
+        and state.appointment_date is not None
+    )
+
+
+def _slot(state):
+    """``(doctor_id, date)`` when the state occupies a slot, else None."""
+    return (state.doctor_id, state.appointment_date) if _is_active(state) else None
+
+
+def _counted(state):
+    """``(date, status)`` part of the state the dashboard counters track."""
+    return None if state is None else (state.appointment_date, state.status)
+
+
+def _when(state):
+    """``(date, time)`` reminders are scheduled against, when active."""
+    return (state.appointment_date, state.appointment_time) if _is_active(state) else None
+
+
+def _apply(previous, current):
+    previous_slot, current_slot = _slot(previous), _slot(current)
+    if previous_slot != current_slot:
+        if previous_slot:
+            adjust_daily_load(*previous_slot, -1)
+        if current_slot:
+            adjust_daily_load(*current_slot, 1)
+
+    counters.apply_changes(counters.appointment_changes(_counted(previous), _counted(current)))
+
+
+def _reschedule_reminders(instance, previous, current):
+    previous_when, current_when = _when(previous), _when(current)
+    if previous_when == current_when:
+        return
+    if previous_when:
+        clear_pending_reminders([instance.pk])
+    if current_when:
+        create_reminders([(instance.pk, *current_when)])
+
+
+@receiver(post_init, sender=Appointment)
+def remember_loaded_state(sender, instance, **kwargs):
+    """
+    Snapshot the state as loaded so later saves can tell what changed.
+    For brand new instances the snapshot is ignored on their first save.
+    """
+    instance._loaded_state = _tracked_state(instance)
+
+
+@receiver(post_save, sender=Appointment)
+def update_derived_data_on_save(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_state', None)
+    current = _tracked_state(instance)
+    if previous != current:
+        _apply(previous, current)
+        _reschedule_reminders(instance, previous, current)
+    instance._loaded_state = current
+
+
+@receiver(post_delete, sender=Appointment)
+def update_derived_data_on_delete(sender, instance, **kwargs):
+    _apply(getattr(instance, '_loaded_state', None), None)
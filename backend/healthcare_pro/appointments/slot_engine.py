@@ -0,0 +1,158 @@
+"""
+Bitmap based slot availability engine.
+
+A doctor's day is represented as a plain integer in which bit ``n`` stands
+for the ``n``-th ``unit``-minute block after midnight. Weekly ``Availability``
+windows are OR-ed into an "open" mask, active appointments into a "booked"
+mask, and whether a slot is free becomes a shift and an AND instead of a
+loop over ``datetime`` objects.
+"""
+from collections import defaultdict
+from datetime import time
+
+from doctors.schedule_cache import DAY_NAMES, get_schedules, get_windows, weekday_name  # noqa: F401
+from .models import Appointment
+
+SLOT_UNITS = (5, 15, 30)
+DEFAULT_UNIT = 5
+DEFAULT_SLOT_MINUTES = 30
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minutes(value):
+    """Minutes elapsed since midnight for a ``time``."""
+    return value.hour * 60 + value.minute
+
+
+def from_minutes(minutes):
+    """Inverse of ``to_minutes``."""
+    return time(minutes // 60, minutes % 60)
+
+
+class SlotEngine:
+    """Builds and queries per-day availability bitmaps."""
+
+    def __init__(self, unit=DEFAULT_UNIT):
+        if unit not in SLOT_UNITS:
+            raise ValueError(f"unit must be one of {SLOT_UNITS}")
+        self.unit = unit
+        self.units_per_day = MINUTES_PER_DAY // unit
+
+    def span(self, units):
+        """Mask with the lowest ``units`` bits set."""
+        return (1 << units) - 1
+
+    def units_for(self, minutes):
+        """Number of units needed to cover ``minutes`` (rounded up)."""
+        return max(1, -(-minutes // self.unit))
+
+    def open_mask(self, windows):
+        """
+        Mask of units fully covered by ``(start_time, end_time)`` windows.
+        Partially covered units at either edge are left closed.
+        """
+        mask = 0
+        for start, end in windows:
+            first = -(-to_minutes(start) // self.unit)
+            last = to_minutes(end) // self.unit
+            if last > first:
+                mask |= self.span(last - first) << first
+        return mask
+
+    def booked_mask(self, bookings):
+        """
+        Mask of units touched by ``(appointment_time, duration)`` bookings.
+        Partially touched units at either edge count as booked.
+        """
+        mask = 0
+        for start, duration in bookings:
+            begin = to_minutes(start)
+            first = begin // self.unit
+            last = min(-(-(begin + (duration or 0)) // self.unit), self.units_per_day)
+            mask |= self.span(max(last - first, 1)) << first
+        return mask
+
+    def slot_starts(self, open_mask, slot_units):
+        """
+        Start units of back-to-back slots laid out from the beginning of
+        every contiguous open window, as a clinic timetable would be.
+        """
+        starts = []
+        remaining = open_mask
+        while remaining:
+            first = (remaining & -remaining).bit_length() - 1
+            run = remaining >> first
+            length = (run ^ (run + 1)).bit_length() - 1
+            starts.extend(range(first, first + length - slot_units + 1, slot_units))
+            remaining &= ~(self.span(length) << first)
+        return starts
+
+    def day_slots(self, windows, bookings, slot_minutes=DEFAULT_SLOT_MINUTES):
+        """Return ``[(time, is_free), ...]`` for every slot of the day."""
+        slot_units = self.units_for(slot_minutes)
+        open_mask = self.open_mask(windows)
+        free = open_mask & ~self.booked_mask(bookings)
+        full = self.span(slot_units)
+        return [
+            (from_minutes(start * self.unit), (free >> start) & full == full)
+            for start in self.slot_starts(open_mask, slot_units)
+        ]
+
+    def free_slots(self, windows, bookings, slot_minutes=DEFAULT_SLOT_MINUTES):
+        """Return only the start times of free slots."""
+        return [
+            slot_time for slot_time, is_free in self.day_slots(windows, bookings, slot_minutes)
+            if is_free
+        ]
+
+    def is_free(self, windows, bookings, start_time, minutes=DEFAULT_SLOT_MINUTES):
+        """Check whether ``minutes`` starting at ``start_time`` are open and unbooked."""
+        requested = self.booked_mask([(start_time, minutes)])
+        free = self.open_mask(windows) & ~self.booked_mask(bookings)
+        return free & requested == requested
+
+
+def load_day(doctor_id, day, exclude_id=None):
+    """
+    Fetch the availability windows and active bookings of one doctor on one
+    date as flat tuples, ready to be fed into ``SlotEngine``. Windows come
+    from the cached weekly schedule, so only the bookings hit the database.
+    ``exclude_id`` leaves out one appointment, e.g. the one being moved.
+    """
+    windows = get_windows(doctor_id, day)
+
+    bookings = Appointment.objects.filter(
+        doctor_id=doctor_id,
+        appointment_date=day,
+        status__in=Appointment.ACTIVE_STATUSES
+    ).values_list('appointment_time', 'duration')
+    if exclude_id is not None:
+        bookings = bookings.exclude(id=exclude_id)
+
+    return list(windows), list(bookings)
+
+
+def load_range(doctor_ids, start_date, end_date):
+    """
+    Batch variant of ``load_day`` for many doctors over a date range.
+
+    Runs one bookings query plus at most one schedule query for doctors not
+    in the schedule cache, regardless of how many doctors or days are
+    requested. Returns ``(windows, bookings)`` where ``windows`` is keyed by
+    ``(doctor_id, day_of_week)`` and ``bookings`` by ``(doctor_id, date)``.
+    """
+    windows = {}
+    for doctor_id, schedule in get_schedules(list(doctor_ids)).items():
+        for day_of_week, day_windows in schedule.items():
+            windows[(doctor_id, day_of_week)] = list(day_windows)
+
+    bookings = defaultdict(list)
+    appointment_rows = Appointment.objects.filter(
+        doctor_id__in=doctor_ids,
+        appointment_date__range=[start_date, end_date],
+        status__in=Appointment.ACTIVE_STATUSES
+    ).values_list('doctor_id', 'appointment_date', 'appointment_time', 'duration')
+    for doctor_id, day, start, duration in appointment_rows:
+        bookings[(doctor_id, day)].append((start, duration))
+
+    return windows, bookings
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import appointment_views, schedule_views, reminder_views, booking_views
+from .views import appointment_views, schedule_views, reminder_views, booking_views, export_views
 
 urlpatterns = [
     # Appointment management
@@ -9,6 +9,7 @@ urlpatterns = [
     # New appointment booking system
     path('schedule/', booking_views.schedule_appointment, name='schedule-appointment'),
     path('available-slots/', booking_views.get_available_slots, name='get-available-slots'),
+    path('availability-matrix/', booking_views.get_availability_matrix, name='get-availability-matrix'),
     path('departments/', booking_views.get_departments, name='get-departments'),
     path('doctors-by-department/', booking_views.get_doctors_by_department, name='get-doctors-by-department'),
     path('<uuid:appointment_id>/cancel/', booking_views.cancel_appointment, name='cancel-appointment'),
@@ -22,6 +23,9 @@ urlpatterns = [
     path('my/', appointment_views.my_appointments, name='my-appointments'),
     path('upcoming/', schedule_views.upcoming_appointments, name='upcoming-appointments'),
     
+    # Reporting
+    path('export/', export_views.export_appointments, name='export-appointments'),
+    
     # Appointment reminders
     path('<uuid:appointment_id>/reminders/', reminder_views.AppointmentReminderListCreateView.as_view(), name='appointment-reminders'),
     path('reminders/<uuid:pk>/', reminder_views.AppointmentReminderDetailView.as_view(), name='appointment-reminder-detail'),
@@ -6,16 +6,18 @@ from rest_framework.exceptions import ValidationError
 from ..models import Appointment
 from ..serializers import (
     AppointmentSerializer, AppointmentCreateSerializer, 
-    AppointmentUpdateSerializer, AppointmentListSerializer,
-    DoctorAppointmentSerializer
+    AppointmentUpdateSerializer, AppointmentListSerializer
 )
+from ..fast_serializers import FastListMixin, fast_appointment_list, fast_doctor_appointment
+from config.db_router import ReplicaReadMixin, use_read_replica
 
 
-class AppointmentListCreateView(generics.ListCreateAPIView):
+class AppointmentListCreateView(ReplicaReadMixin, FastListMixin, generics.ListCreateAPIView):
     """
     List all appointments or create a new appointment.
     """
     permission_classes = [permissions.IsAuthenticated]
+    fast_serializer = fast_appointment_list
     
     def get_queryset(self):
         user = self.request.user
@@ -118,6 +120,7 @@ class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@use_read_replica
 def my_appointments(request):
     """
     Get current user's appointments.
@@ -132,9 +135,8 @@ def my_appointments(request):
                 patient=patient
             ).select_related('doctor__user').order_by('-appointment_date', '-appointment_time')
             
-            serializer = AppointmentListSerializer(appointments, many=True)
             return Response({
-                'appointments': serializer.data,
+                'appointments': fast_appointment_list.data(appointments),
                 'user_type': 'patient'
             })
         except PatientProfile.DoesNotExist:
@@ -151,9 +153,8 @@ def my_appointments(request):
                 doctor=doctor
             ).select_related('patient__user').order_by('-appointment_date', '-appointment_time')
             
-            serializer = DoctorAppointmentSerializer(appointments, many=True)
             return Response({
-                'appointments': serializer.data,
+                'appointments': fast_doctor_appointment.data(appointments),
                 'user_type': 'doctor'
             })
         except Doctor.DoesNotExist:
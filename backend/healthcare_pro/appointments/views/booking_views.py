@@ -5,13 +5,41 @@ from rest_framework.exceptions import ValidationError
 from django.db.models import Q
 from datetime import datetime, time, timedelta
 from django.utils import timezone
+import uuid
 
 from ..models import Appointment
 from ..serializers import AppointmentCreateSerializer, AppointmentSerializer
+from ..assignment import rank_available_doctors
+from ..booking import book_appointment, move_appointment, SlotUnavailable
+from ..slot_engine import SlotEngine, DEFAULT_SLOT_MINUTES, load_day, load_range, weekday_name
+from doctors.directory_cache import directory_response
 from doctors.models import Doctor
 from patients.models import PatientProfile
 
 
+def _booking_response(appointment, created):
+    """Response for a new booking, or for the original one when a request is replayed."""
+    doctor = appointment.doctor
+    return Response({
+        'id': appointment.id,
+        'message': 'Appointment scheduled successfully',
+        'appointment': {
+            'id': appointment.id,
+            'doctor': {
+                'name': f"Dr. {doctor.user.first_name} {doctor.user.last_name}",
+                'specialization': doctor.specialization,
+                'department': doctor.department
+            },
+            'date': appointment.appointment_date.strftime('%Y-%m-%d'),
+            'time': appointment.appointment_time.strftime('%H:%M:%S'),
+            'status': appointment.status,
+            'appointment_type': appointment.appointment_type,
+            'reason': appointment.reason
+        },
+        'confirmation_code': appointment.confirmation_code
+    }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def schedule_appointment(request):
@@ -43,6 +71,21 @@ def schedule_appointment(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
     
+    appointment_types = [choice[0] for choice in Appointment.APPOINTMENT_TYPE_CHOICES]
+    if data['appointment_type'] not in appointment_types:
+        return Response(
+            {'error': f"appointment_type must be one of {', '.join(appointment_types)}"}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Clients retrying after a timeout send the same key to avoid double booking
+    idempotency_key = request.headers.get('Idempotency-Key') or None
+    if idempotency_key and len(idempotency_key) > 64:
+        return Response(
+            {'error': 'Idempotency-Key must be at most 64 characters'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
     try:
         # Find available doctor in the department
         department = data['department']
@@ -50,79 +93,72 @@ def schedule_appointment(request):
         appointment_date = datetime.strptime(data['appointment_date'], '%Y-%m-%d').date()
         preferred_time = datetime.strptime(data['preferred_time'], '%H:%M').time()
         
+        booking_fields = {
+            'idempotency_key': idempotency_key,
+            'appointment_type': data['appointment_type'],
+            'chief_complaint': data['reason_for_visit'],
+            'reason': data['reason_for_visit'],
+            'status': 'scheduled'
+        }
+        
+        # A retry of a request that already booked gets that booking back,
+        # before its own slot (now taken) rules every doctor out
+        if idempotency_key:
+            existing = Appointment.objects.filter(
+                patient=patient,
+                idempotency_key=idempotency_key
+            ).select_related('doctor__user').first()
+            if existing:
+                return _booking_response(existing, False)
+        
         # If preferred doctor is specified, use them
         if preferred_doctor_id:
             try:
-                doctor = Doctor.objects.get(id=preferred_doctor_id, department=department)
+                doctor = Doctor.objects.select_related('user').get(id=preferred_doctor_id, department=department)
             except Doctor.DoesNotExist:
                 return Response(
                     {'error': 'Preferred doctor not found in the specified department'}, 
                     status=status.HTTP_404_NOT_FOUND
                 )
+            candidates = [doctor]
         else:
-            # Find any available doctor in the department
-            doctors = Doctor.objects.filter(department=department, is_active=True)
-            if not doctors.exists():
+            # Least loaded doctors who are free at the requested time
+            candidates = rank_available_doctors(department, appointment_date, preferred_time)
+            if not candidates:
+                if not Doctor.objects.filter(department=department, is_available=True).exists():
+                    return Response(
+                        {'error': 'No doctors available in the specified department'}, 
+                        status=status.HTTP_404_NOT_FOUND
+                    )
                 return Response(
-                    {'error': 'No doctors available in the specified department'}, 
-                    status=status.HTTP_404_NOT_FOUND
+                    {'error': 'The selected time slot is not available'}, 
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-            doctor = doctors.first()  # For now, take the first available doctor
         
-        # Check if the time slot is available
-        existing_appointment = Appointment.objects.filter(
-            doctor=doctor,
-            appointment_date=appointment_date,
-            appointment_time=preferred_time,
-            status__in=['scheduled', 'confirmed']
-        ).exists()
+        # Lock the doctor's day, re-check the slot and insert in one step;
+        # if a candidate was taken in the meantime, move on to the next one
+        appointment = None
+        for doctor in candidates:
+            try:
+                appointment, created = book_appointment(
+                    patient,
+                    doctor,
+                    appointment_date,
+                    preferred_time,
+                    **booking_fields
+                )
+                break
+            except SlotUnavailable as e:
+                error = str(e)
         
-        if existing_appointment:
+        if appointment is None:
             return Response(
-                {'error': 'The selected time slot is not available'}, 
+                {'error': error}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Create the appointment
-        appointment_data = {
-            'patient': patient.id,
-            'doctor': doctor.id,
-            'appointment_date': appointment_date,
-            'appointment_time': preferred_time,
-            'appointment_type': data['appointment_type'],
-            'reason': data['reason_for_visit'],
-            'status': 'scheduled'
-        }
-        
-        serializer = AppointmentCreateSerializer(data=appointment_data)
-        if serializer.is_valid():
-            appointment = serializer.save()
-            
-            # Generate confirmation code
-            confirmation_code = f"APT-{appointment_date.year}-{str(appointment.id)[-6:].zfill(6)}"
-            appointment.confirmation_code = confirmation_code
-            appointment.save()
-            
-            return Response({
-                'id': appointment.id,
-                'message': 'Appointment scheduled successfully',
-                'appointment': {
-                    'id': appointment.id,
-                    'doctor': {
-                        'name': f"Dr. {doctor.user.first_name} {doctor.user.last_name}",
-                        'specialization': doctor.specialization,
-                        'department': doctor.department
-                    },
-                    'date': appointment.appointment_date.strftime('%Y-%m-%d'),
-                    'time': appointment.appointment_time.strftime('%H:%M:%S'),
-                    'status': appointment.status,
-                    'appointment_type': appointment.appointment_type,
-                    'reason': appointment.reason
-                },
-                'confirmation_code': confirmation_code
-            }, status=status.HTTP_201_CREATED)
-        else:
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        # A replayed request that raced the first one gets the original booking back
+        return _booking_response(appointment, created)
             
     except ValueError as e:
         return Response(
@@ -152,35 +188,23 @@ def get_available_slots(request):
         )
     
     try:
-        doctor = Doctor.objects.get(id=doctor_id)
+        doctor = Doctor.objects.select_related('user').get(id=doctor_id)
         appointment_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        slot_minutes = int(request.GET.get('duration', DEFAULT_SLOT_MINUTES))
+        if slot_minutes <= 0:
+            raise ValueError
         
-        # Get all booked appointments for this doctor on this date
-        booked_appointments = Appointment.objects.filter(
-            doctor=doctor,
-            appointment_date=appointment_date,
-            status__in=['scheduled', 'confirmed']
-        ).values_list('appointment_time', flat=True)
-        
-        # Generate time slots (9 AM to 5 PM, 30-minute intervals)
-        start_time = time(9, 0)  # 9:00 AM
-        end_time = time(17, 0)   # 5:00 PM
-        slot_duration = timedelta(minutes=30)
+        # Build the day bitmap from the weekly schedule and active bookings
+        windows, bookings = load_day(doctor.id, appointment_date)
+        engine = SlotEngine()
         
-        slots = []
-        current_time = datetime.combine(appointment_date, start_time)
-        end_datetime = datetime.combine(appointment_date, end_time)
-        
-        while current_time < end_datetime:
-            slot_time = current_time.time()
-            is_booked = slot_time in booked_appointments
-            
-            slots.append({
+        slots = [
+            {
                 'time': slot_time.strftime('%H:%M'),
-                'status': 'booked' if is_booked else 'available'
-            })
-            
-            current_time += slot_duration
+                'status': 'available' if is_free else 'booked'
+            }
+            for slot_time, is_free in engine.day_slots(windows, bookings, slot_minutes)
+        ]
         
         return Response({
             'doctor': {
@@ -199,9 +223,93 @@ def get_available_slots(request):
         )
     except ValueError:
         return Response(
-            {'error': 'Invalid date format. Use YYYY-MM-DD'}, 
+            {'error': 'Invalid date or duration. Use YYYY-MM-DD and minutes'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+MAX_MATRIX_DAYS = 31
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def get_availability_matrix(request):
+    """
+    Get free time slots for several doctors over a date range in one call.
+    Doctors are selected by department or by a comma-separated list of ids.
+    """
+    department = request.GET.get('department')
+    doctor_ids = request.GET.get('doctor_ids')
+    
+    try:
+        start_date = request.GET.get('start_date')
+        if start_date:
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+        else:
+            start_date = timezone.localdate()
+        days = int(request.GET.get('days', 7))
+        slot_minutes = int(request.GET.get('duration', DEFAULT_SLOT_MINUTES))
+        if doctor_ids:
+            doctor_ids = [uuid.UUID(doctor_id.strip()) for doctor_id in doctor_ids.split(',') if doctor_id.strip()]
+    except ValueError:
+        return Response(
+            {'error': 'Invalid parameters. Use YYYY-MM-DD dates, numeric days/duration and doctor UUIDs'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Checked after parsing, so "doctor_ids=," does not select every doctor
+    if not department and not doctor_ids:
+        return Response(
+            {'error': 'department or doctor_ids parameter is required'}, 
             status=status.HTTP_400_BAD_REQUEST
         )
+    
+    if not 1 <= days <= MAX_MATRIX_DAYS or slot_minutes <= 0:
+        return Response(
+            {'error': f'days must be between 1 and {MAX_MATRIX_DAYS} and duration must be positive'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    dates = [start_date + timedelta(days=offset) for offset in range(days)]
+    end_date = dates[-1]
+    
+    doctors = Doctor.objects.filter(is_available=True).select_related('user')
+    if department:
+        doctors = doctors.filter(department=department)
+    if doctor_ids:
+        doctors = doctors.filter(id__in=doctor_ids)
+    doctors = list(doctors.order_by('user__last_name', 'user__first_name'))
+    
+    # Two more queries cover every doctor and day in the range
+    windows, bookings = load_range([doctor.id for doctor in doctors], start_date, end_date)
+    engine = SlotEngine()
+    
+    doctors_data = []
+    for doctor in doctors:
+        slots = {}
+        for day in dates:
+            free = engine.free_slots(
+                windows.get((doctor.id, weekday_name(day)), []),
+                bookings.get((doctor.id, day), []),
+                slot_minutes
+            )
+            slots[day.strftime('%Y-%m-%d')] = [slot_time.strftime('%H:%M') for slot_time in free]
+        
+        doctors_data.append({
+            'id': doctor.id,
+            'name': f"Dr. {doctor.user.first_name} {doctor.user.last_name}",
+            'department': doctor.department,
+            'specialization': doctor.specialization,
+            'available_slots': slots
+        })
+    
+    return Response({
+        'start_date': start_date.strftime('%Y-%m-%d'),
+        'end_date': end_date.strftime('%Y-%m-%d'),
+        'dates': [day.strftime('%Y-%m-%d') for day in dates],
+        'slot_duration': slot_minutes,
+        'doctors': doctors_data
+    })
 
 
 @api_view(['GET'])
@@ -210,9 +318,13 @@ def get_departments(request):
     """
     Get list of all departments with doctor count
     """
+    return directory_response(request, 'departments', _department_list)
+
+
+def _department_list():
     from django.db.models import Count
     
-    departments = Doctor.objects.filter(is_active=True).values('department').annotate(
+    departments = Doctor.objects.filter(is_available=True).values('department').annotate(
         doctors_count=Count('id')
     ).order_by('department')
     
@@ -224,9 +336,9 @@ def get_departments(request):
         for dept in departments
     ]
     
-    return Response({
+    return {
         'departments': department_list
-    })
+    }
 
 
 @api_view(['GET'])
@@ -245,7 +357,7 @@ def get_doctors_by_department(request):
     
     doctors = Doctor.objects.filter(
         department=department, 
-        is_active=True
+        is_available=True
     ).select_related('user')
     
     doctor_list = [
@@ -394,28 +506,22 @@ def reschedule_appointment(request, appointment_id):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Check if new time slot is available
-        existing_appointment = Appointment.objects.filter(
-            doctor=appointment.doctor,
-            appointment_date=new_date,
-            appointment_time=new_time,
-            status__in=['scheduled', 'confirmed']
-        ).exclude(id=appointment.id).exists()
-        
-        if existing_appointment:
+        # Check the new slot and move the appointment under the day lock
+        try:
+            move_appointment(
+                appointment,
+                new_date,
+                new_time,
+                status='rescheduled',
+                reschedule_reason=reschedule_reason,
+                rescheduled_at=timezone.now()
+            )
+        except SlotUnavailable as e:
             return Response(
-                {'error': 'The selected time slot is not available'}, 
+                {'error': str(e)}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Update appointment
-        appointment.appointment_date = new_date
-        appointment.appointment_time = new_time
-        appointment.status = 'rescheduled'
-        appointment.reschedule_reason = reschedule_reason
-        appointment.rescheduled_at = timezone.now()
-        appointment.save()
-        
         return Response({
             'message': 'Appointment rescheduled successfully',
             'appointment': {
@@ -0,0 +1,46 @@
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from accounts.permissions import IsAdmin
+from ..export import EXPORT_FORMATS, export_rows, parse_filters, render
+from config.db_router import read_alias, use_read_replica
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+@use_read_replica
+def export_appointments(request):
+    """
+    Stream appointments as CSV or NDJSON for reporting.
+    Filters: ``date_from``, ``date_to``, ``status`` (comma separated) and
+    ``doctor``. ``export_format`` picks the output (default csv); the
+    ``format`` parameter is reserved by DRF content negotiation.
+    """
+    export_format = request.GET.get('export_format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return Response(
+            {'error': f"export_format must be one of: {', '.join(EXPORT_FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        filters = parse_filters(request.GET)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    response = StreamingHttpResponse(
+        # Rows are read while streaming, after this view has returned
+        render(export_rows(filters, using=read_alias()), export_format),
+        content_type=CONTENT_TYPES[export_format]
+    )
+    filename = f"appointments-{timezone.localdate():%Y%m%d}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -6,10 +6,8 @@ from django.utils import timezone
 from datetime import datetime, timedelta
 
 from ..models import AppointmentSlot, Appointment
-from ..serializers import (
-    AppointmentSlotSerializer, AppointmentListSerializer,
-    DoctorAppointmentSerializer
-)
+from ..serializers import AppointmentSlotSerializer
+from ..fast_serializers import fast_appointment_list, fast_doctor_appointment
 from accounts.permissions import IsAdminOrDoctor
 
 
@@ -66,8 +64,7 @@ def upcoming_appointments(request):
                 status__in=['scheduled', 'confirmed']
             ).select_related('doctor__user').order_by('appointment_date', 'appointment_time')
             
-            serializer = AppointmentListSerializer(appointments, many=True)
-            return Response(serializer.data)
+            return Response(fast_appointment_list.data(appointments))
         except PatientProfile.DoesNotExist:
             return Response(
                 {"error": "Patient profile not found."},
@@ -84,8 +81,7 @@ def upcoming_appointments(request):
                 status__in=['scheduled', 'confirmed']
             ).select_related('patient__user').order_by('appointment_date', 'appointment_time')
             
-            serializer = DoctorAppointmentSerializer(appointments, many=True)
-            return Response(serializer.data)
+            return Response(fast_doctor_appointment.data(appointments))
         except Doctor.DoesNotExist:
             return Response(
                 {"error": "Doctor profile not found."},
@@ -0,0 +1,136 @@
+"""
+Read-replica routing.
+
+Writes always go to ``default``. Reads go to ``default`` too, except inside
+views wrapped with ``use_read_replica`` (or list views using
+``ReplicaReadMixin``), where they go to the ``replica`` alias configured by
+``DATABASE_REPLICA_URL``. Without a replica everything stays on
+``default``.
+
+Read-your-writes: ``ReplicaStickinessMiddleware`` remembers in the cache
+that a user has just written (any successful non-GET request) and, for
+``REPLICA_STICKY_SECONDS`` afterwards, that user's reads stay on the
+primary, so a patient who just booked sees the appointment even while the
+replica catches up. Use a shared cache in production so the marker is seen
+by every worker.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA_ALIAS = 'replica'
+DEFAULT_STICKY_SECONDS = 5
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def _sticky_key(user_id):
+    return f'replica_sticky:{user_id}'
+
+
+def sticky_seconds():
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS)
+
+
+def mark_recent_write(user):
+    """Keep ``user``'s reads on the primary for the sticky window."""
+    if replica_configured() and user is not None and user.is_authenticated:
+        cache.set(_sticky_key(user.pk), True, sticky_seconds())
+
+
+def has_recent_write(user):
+    return user is not None and user.is_authenticated and bool(cache.get(_sticky_key(user.pk)))
+
+
+def read_alias():
+    """Alias reads in the current context go to. Querysets evaluated after
+    the view returns (streamed responses) must be pinned with ``using()``."""
+    return _read_alias.get() or 'default'
+
+
+@contextmanager
+def replica_reads(request=None):
+    """
+    Route reads in this block to the replica, unless there is none or the
+    requesting user wrote something moments ago.
+    """
+    if not replica_configured() or has_recent_write(getattr(request, 'user', None)):
+        yield
+        return
+    token = _read_alias.set(REPLICA_ALIAS)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary in this block, even inside a replica view."""
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def use_read_replica(view):
+    """
+    Serve a read-only function view from the replica. Put it below
+    ``@api_view`` so the user is authenticated before routing is decided.
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return view(request, *args, **kwargs)
+        with replica_reads(request):
+            return view(request, *args, **kwargs)
+    return wrapped
+
+
+class ReplicaReadMixin:
+    """Serve the ``list`` action of a generic view from the replica."""
+
+    def list(self, request, *args, **kwargs):
+        with replica_reads(request):
+            return super().list(request, *args, **kwargs)
+
+
+class ReplicaRouter:
+    """Database router behind ``use_read_replica``."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica gets its schema and data from the primary
+        return db != REPLICA_ALIAS
+
+
+class ReplicaStickinessMiddleware:
+    """Mark users who just wrote so their next reads stay on the primary."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        # DRF authenticates inside the view and copies the user back onto the request
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            mark_recent_write(getattr(request, 'user', None))
+        return response
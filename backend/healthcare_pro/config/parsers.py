@@ -0,0 +1,40 @@
+"""
+JSON parser backed by orjson.
+
+UTF-8 request bodies are decoded with orjson. Anything orjson rejects is
+handed to DRF's ``JSONParser``, so invalid JSON fails with the same
+``ParseError`` message as before and ``NaN`` stays rejected. Bodies with
+integers too long for 64 bits also go to ``JSONParser``, because orjson
+would turn them into floats. Without orjson installed, or with
+``STRICT_JSON`` off, ``JSONParser`` does all the parsing.
+"""
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer, orjson
+
+# 20 digits may exceed 64 bits (orjson reads up to 2**64 - 1 exactly)
+_LONG_INTEGER_RE = re.compile(rb'\d{20}')
+
+
+class ORJSONParser(JSONParser):
+    """``JSONParser`` with orjson doing the decoding when it is installed."""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+
+        data = stream.read()
+        if not _LONG_INTEGER_RE.search(data):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(data), media_type, parser_context)
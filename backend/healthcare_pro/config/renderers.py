@@ -0,0 +1,51 @@
+"""
+JSON renderer backed by orjson.
+
+orjson encodes dicts, lists, strings, UUIDs, dates, times and datetimes in
+C, several times faster than the stdlib ``json`` module behind DRF's
+``JSONRenderer``. The output is the same: compact UTF-8, UTC datetimes
+ending in ``Z``, U+2028/U+2029 escaped, and other values (Decimal, lazy
+translation strings, querysets) converted by DRF's ``JSONEncoder``. The
+one difference: a NaN or infinite float is written as ``null`` instead of
+failing the response.
+
+DRF's renderer is used when orjson is not installed, for indented output
+(the browsable API, ``Accept: application/json; indent=4``), when
+``UNICODE_JSON`` or ``COMPACT_JSON`` is turned off, and for the rare value
+orjson cannot encode (integers beyond 64 bits).
+"""
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` with orjson doing the encoding when it is installed."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escaped like JSONRenderer does, so the output stays a strict JavaScript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
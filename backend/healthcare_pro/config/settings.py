@@ -3,6 +3,8 @@ from pathlib import Path
 from decouple import config
 from datetime import timedelta
 
+from .database import parse_database_url
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = config('SECRET_KEY')
@@ -39,6 +41,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'config.db_router.ReplicaStickinessMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -61,10 +64,39 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# Database profile from DATABASE_URL (see config/database.py). SQLite is the
+# local development default; use PostgreSQL in production.
+DATABASE_URL = config('DATABASE_URL', default='sqlite:///db.sqlite3')
+DATABASE_CONNECTION = {
+    'conn_max_age': config('DB_CONN_MAX_AGE', default=60, cast=int),
+    'conn_health_checks': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+    'pooler': config('DB_POOLER', default=False, cast=bool),
+}
 DATABASES = {
+    'default': parse_database_url(DATABASE_URL, BASE_DIR, **DATABASE_CONNECTION)
+}
+
+# Optional read replica for dashboards and listings (see config/db_router.py)
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = parse_database_url(DATABASE_REPLICA_URL, BASE_DIR, **DATABASE_CONNECTION)
+    # Tests see one database through both aliases
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['config.db_router.ReplicaRouter']
+# Seconds a user's reads stay on the primary after they write
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=5, cast=int)
+
+# Postal code / city coordinates for "doctors near me" (see doctors/geo.py);
+# empty uses the bundled doctors/data/postal_locations.csv
+GEO_LOCATIONS_FILE = config('GEO_LOCATIONS_FILE', default='')
+
+# Cache Settings
+# Use a shared backend (e.g. django.core.cache.backends.redis.RedisCache) in
+# production so cache invalidation reaches every worker process.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='healthcare-pro'),
     }
 }
 
@@ -105,6 +137,16 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # orjson encoding and decoding, falling back to DRF's JSON classes without it
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'config.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # JWT Settings
@@ -133,4 +175,21 @@ EMAIL_PORT = config('EMAIL_PORT', cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
-DEFAULT_FROM_EMAIL = config('EMAIL_HOST_USER')
\ No newline at end of file
+DEFAULT_FROM_EMAIL = config('EMAIL_HOST_USER')
+
+# Reminders created for every booked appointment, relative to its start
+APPOINTMENT_REMINDER_POLICY = [
+    {'reminder_type': 'email', 'minutes_before': 24 * 60},
+    {'reminder_type': 'email', 'minutes_before': 2 * 60},
+]
+
+# Appointment reminder delivery (see appointments/reminder_backends.py)
+APPOINTMENT_REMINDER_BACKENDS = {
+    'email': 'appointments.reminder_backends.EmailReminderBackend',
+    'sms': 'appointments.reminder_backends.LoggingReminderBackend',
+    'push': 'appointments.reminder_backends.LoggingReminderBackend',
+}
+REMINDER_DISPATCH_WORKERS = config('REMINDER_DISPATCH_WORKERS', default=4, cast=int)
+
+# Processes hashing passwords during bulk imports (0 = one per CPU)
+IMPORT_HASH_WORKERS = config('IMPORT_HASH_WORKERS', default=0, cast=int)
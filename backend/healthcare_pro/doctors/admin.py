@@ -19,7 +19,8 @@ class DoctorAdmin(admin.ModelAdmin):
             'fields': ('doctor_id', 'specialization', 'license_number', 'years_of_experience', 'qualifications', 'department')
         }),
         ('Personal Information', {
-            'fields': ('date_of_birth', 'gender', 'phone', 'address', 'city', 'state', 'zip_code')
+            'fields': ('date_of_birth', 'gender', 'phone', 'address', 'city', 'state', 'zip_code',
+                       'latitude', 'longitude')
         }),
         ('Emergency Contact', {
             'fields': ('emergency_contact_name', 'emergency_contact_phone', 'emergency_contact_relationship')
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class DoctorsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'doctors'
\ No newline at end of file
+    name = 'doctors'
+
+    def ready(self):
+        from . import signals  # noqa: F401
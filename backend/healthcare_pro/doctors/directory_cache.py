@@ -0,0 +1,27 @@
+"""
+Cached doctor reference data.
+
+Specializations, departments and the list of available doctors are polled
+by clients on every screen but only change when a doctor is added, edited
+or removed. They are served through ``accounts.http_cache`` under the
+doctor directory version, which ``invalidate_directory`` bumps from the
+``Doctor`` signals (and from bulk imports, which skip them).
+"""
+from accounts.cache_versions import bump_version
+from accounts.http_cache import versioned_response
+
+DIRECTORY_NAMESPACE = 'doctor_directory'
+# Seconds a client may reuse a response before revalidating it
+DIRECTORY_MAX_AGE = 60
+
+
+def invalidate_directory():
+    bump_version(DIRECTORY_NAMESPACE)
+
+
+def directory_response(request, name, build, params=()):
+    """Serve ``build()`` from the directory cache with ETag and Cache-Control headers."""
+    return versioned_response(
+        request, DIRECTORY_NAMESPACE, name, build,
+        params=params, max_age=DIRECTORY_MAX_AGE
+    )
@@ -0,0 +1,96 @@
+"""
+Offline geocoding of doctor addresses.
+
+Coordinates come from a bundled CSV (``doctors/data/postal_locations.csv``,
+columns ``postal_code, city, state, country, latitude, longitude``), so no
+external service is called. The bundled file covers major cities; drop in
+a full postal directory with the same columns for street-level coverage
+of a whole country. ``GEO_LOCATIONS_FILE`` points at a replacement file.
+
+An address is located by its exact postal code, then by city (and state,
+when that tells same-named cities apart), then by the first three
+characters of the postal code, which identify a sorting district in both
+Indian PIN codes and US ZIP codes.
+"""
+import csv
+import math
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_LOCATIONS_FILE = Path(__file__).resolve().parent / 'data' / 'postal_locations.csv'
+EARTH_RADIUS_KM = 6371.0088
+POSTAL_PREFIX_LENGTH = 3
+
+
+def _normalize(value):
+    return re.sub(r'\s+', ' ', value or '').strip().lower()
+
+
+def _postal(value):
+    return re.sub(r'[\s-]', '', value or '').upper()
+
+
+class LocationTable:
+    """Postal code and city lookups over one locations file."""
+
+    def __init__(self, rows):
+        self.by_postal_code = {}
+        self.by_city_state = {}
+        self.by_city = {}
+        self.by_postal_prefix = {}
+        for row in rows:
+            point = (float(row['latitude']), float(row['longitude']))
+            postal_code = _postal(row['postal_code'])
+            city = _normalize(row['city'])
+            if postal_code:
+                self.by_postal_code.setdefault(postal_code, point)
+                # Prefixes only compare like with like (6-digit PINs, 5-digit ZIPs)
+                prefix = (len(postal_code), postal_code[:POSTAL_PREFIX_LENGTH])
+                self.by_postal_prefix.setdefault(prefix, point)
+            if city:
+                self.by_city_state.setdefault((city, _normalize(row['state'])), point)
+                self.by_city.setdefault(city, point)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, newline='', encoding='utf-8') as handle:
+            return cls(csv.DictReader(handle))
+
+    def locate(self, postal_code=None, city=None, state=None):
+        """``(latitude, longitude)`` of an address, or ``None`` if it is not covered."""
+        postal_code = _postal(postal_code)
+        city = _normalize(city)
+        if postal_code in self.by_postal_code:
+            return self.by_postal_code[postal_code]
+        if city:
+            point = self.by_city_state.get((city, _normalize(state))) or self.by_city.get(city)
+            if point:
+                return point
+        if len(postal_code) > POSTAL_PREFIX_LENGTH:
+            return self.by_postal_prefix.get((len(postal_code), postal_code[:POSTAL_PREFIX_LENGTH]))
+        return None
+
+
+@lru_cache(maxsize=1)
+def location_table():
+    return LocationTable.from_file(getattr(settings, 'GEO_LOCATIONS_FILE', '') or DEFAULT_LOCATIONS_FILE)
+
+
+def locate(postal_code=None, city=None, state=None):
+    return location_table().locate(postal_code, city, state)
+
+
+def geocode(doctor):
+    """Set ``doctor.latitude`` / ``longitude`` from its address (``None`` if unknown)."""
+    doctor.latitude, doctor.longitude = locate(doctor.zip_code, doctor.city, doctor.state) or (None, None)
+
+
+def distance_km(lat1, lng1, lat2, lng2):
+    """Great-circle (haversine) distance in kilometres."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
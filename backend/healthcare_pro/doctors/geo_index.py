@@ -0,0 +1,153 @@
+"""
+Grid index for "doctors near me".
+
+Available doctors with coordinates are bucketed into a grid of
+``CELL_DEGREES`` squares. A radius query visits only the cells overlapping
+the circle's bounding box. A k-nearest query walks rings of cells outward
+from the origin and stops once no unvisited cell can hold anything closer
+than the k-th doctor found. Distances are great-circle kilometres. The
+``specialization`` (substring, as elsewhere) and ``max_fee`` filters are
+checked while the cells are scanned.
+
+Like ``doctors.search_index``, each process keeps one index tagged with
+the doctor directory version and rebuilds it with a single query, in the
+background, after a doctor changes.
+"""
+import heapq
+import math
+from array import array
+from collections import defaultdict
+
+from .geo import distance_km
+from .index_snapshot import IndexSnapshot
+from .models import Doctor
+
+# About 22 km north-south; fine enough for city-scale radii
+CELL_DEGREES = 0.2
+KM_PER_DEGREE = 111.32
+
+
+def _cell(latitude, longitude):
+    return math.floor(latitude / CELL_DEGREES), math.floor(longitude / CELL_DEGREES)
+
+
+def _km_per_degree_longitude(latitude):
+    # Never zero, so searches near the poles still terminate
+    return KM_PER_DEGREE * max(math.cos(math.radians(min(abs(latitude), 89.0))), 0.01)
+
+
+class DoctorGeoIndex:
+    """Immutable grid over one snapshot of the available doctors."""
+
+    def __init__(self, rows, version=None):
+        """
+        ``rows`` are ``(id, latitude, longitude, specialization,
+        consultation_fee)`` tuples, best default rank first.
+        """
+        self.version = version
+        self.doctor_ids = []
+        self._latitudes = array('d')
+        self._longitudes = array('d')
+        self._fees = array('d')
+        self._specializations = []
+        cells = defaultdict(list)
+        for position, (doctor_id, latitude, longitude, specialization, fee) in enumerate(rows):
+            self.doctor_ids.append(doctor_id)
+            self._latitudes.append(latitude)
+            self._longitudes.append(longitude)
+            self._fees.append(float(fee or 0))
+            self._specializations.append((specialization or '').lower())
+            cells[_cell(latitude, longitude)].append(position)
+        self._cells = {cell: array('I', positions) for cell, positions in cells.items()}
+        # Rings beyond this reach no occupied cell from anywhere inside the grid
+        cell_rows, cell_cols = zip(*self._cells) if self._cells else ((0,), (0,))
+        self._extent = (min(cell_rows), max(cell_rows), min(cell_cols), max(cell_cols))
+
+    def __len__(self):
+        return len(self.doctor_ids)
+
+    def _matches(self, position, specialization, max_fee):
+        if specialization and specialization not in self._specializations[position]:
+            return False
+        return max_fee is None or self._fees[position] <= max_fee
+
+    def _scan(self, cells, latitude, longitude, specialization, max_fee, radius_km=None):
+        """``(distance, position)`` of matching doctors in ``cells``."""
+        found = []
+        for cell in cells:
+            for position in self._cells.get(cell, ()):
+                if not self._matches(position, specialization, max_fee):
+                    continue
+                distance = distance_km(
+                    latitude, longitude, self._latitudes[position], self._longitudes[position]
+                )
+                if radius_km is None or distance <= radius_km:
+                    found.append((distance, position))
+        return found
+
+    def _results(self, found, limit):
+        best = heapq.nsmallest(limit, found)
+        return [(self.doctor_ids[position], distance) for distance, position in best]
+
+    def within(self, latitude, longitude, radius_km, specialization='', max_fee=None, limit=20):
+        """Nearest ``limit`` doctors within ``radius_km``, as ``(id, distance_km)``."""
+        specialization = specialization.lower()
+        lat_cells = math.ceil(radius_km / KM_PER_DEGREE / CELL_DEGREES)
+        widest = min(abs(latitude) + radius_km / KM_PER_DEGREE, 89.0)
+        lng_cells = math.ceil(radius_km / _km_per_degree_longitude(widest) / CELL_DEGREES)
+        row, col = _cell(latitude, longitude)
+        if (2 * lat_cells + 1) * (2 * lng_cells + 1) > len(self._cells):
+            # A huge radius: cheaper to visit the occupied cells only
+            cells = list(self._cells)
+        else:
+            cells = [
+                (r, c)
+                for r in range(row - lat_cells, row + lat_cells + 1)
+                for c in range(col - lng_cells, col + lng_cells + 1)
+            ]
+        found = self._scan(cells, latitude, longitude, specialization, max_fee, radius_km)
+        return self._results(found, limit)
+
+    def nearest(self, latitude, longitude, k, specialization='', max_fee=None, radius_km=None):
+        """``k`` nearest doctors (within ``radius_km`` if given), as ``(id, distance_km)``."""
+        specialization = specialization.lower()
+        row, col = _cell(latitude, longitude)
+        min_row, max_row, min_col, max_col = self._extent
+        last_ring = max(abs(row - min_row), abs(row - max_row), abs(col - min_col), abs(col - max_col))
+        found = []
+        for ring in range(last_ring + 1):
+            if ring == 0:
+                ring_cells = [(row, col)]
+            else:
+                ring_cells = [(r, c) for r in (row - ring, row + ring) for c in range(col - ring, col + ring + 1)]
+                ring_cells += [(r, c) for c in (col - ring, col + ring) for r in range(row - ring + 1, row + ring)]
+            found += self._scan(ring_cells, latitude, longitude, specialization, max_fee, radius_km)
+
+            # Anything outside this ring is at least this far away
+            widest = min(abs(latitude) + (ring + 1) * CELL_DEGREES, 89.0)
+            reach_km = ring * CELL_DEGREES * min(KM_PER_DEGREE, _km_per_degree_longitude(widest))
+            if radius_km is not None and reach_km > radius_km:
+                break
+            if len(found) >= k and heapq.nsmallest(k, found)[-1][0] <= reach_km:
+                break
+        return self._results(found, k)
+
+
+def load_rows():
+    return Doctor.objects.filter(
+        is_available=True, latitude__isnull=False, longitude__isnull=False
+    ).order_by('-years_of_experience', 'doctor_id').values_list(
+        'id', 'latitude', 'longitude', 'specialization', 'consultation_fee'
+    )
+
+
+def build_index(version=None):
+    return DoctorGeoIndex(load_rows().iterator(chunk_size=5000), version)
+
+
+_snapshot = IndexSnapshot('doctor geo index', build_index)
+
+
+def get_index():
+    """This process's index, rebuilt in the background after the doctor directory changes."""
+    return _snapshot.get()
@@ -0,0 +1,58 @@
+"""
+Collision-free ``doctor_id`` allocation.
+
+Ids come from the ``doctor_id`` row of ``IdSequence``. A caller reserves a
+whole block with one ``UPDATE ... SET last_value = last_value + n`` and reads
+the new value back in the same transaction. The row lock taken by the
+UPDATE makes concurrent reservations queue up instead of handing out the
+same numbers. Reserve outside long transactions: the lock is held until the
+surrounding transaction ends. Ids of rolled-back inserts are not reused, so
+the numbering can have gaps.
+"""
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Doctor, IdSequence
+
+DOCTOR_ID_SEQUENCE = 'doctor_id'
+DOCTOR_ID_PATTERN = re.compile(r'^DOC(\d+)$')
+
+
+def format_doctor_id(number):
+    return f"DOC{str(number).zfill(3)}"
+
+
+def highest_doctor_number(doctor_ids):
+    """Largest number among ``DOCnnn`` ids, 0 when there are none."""
+    numbers = [int(match.group(1)) for match in map(DOCTOR_ID_PATTERN.match, doctor_ids) if match]
+    return max(numbers, default=0)
+
+
+def reserve(name, count, start_after=None):
+    """
+    Reserve ``count`` consecutive values of sequence ``name`` and return
+    them as a range. A sequence that does not exist yet is created,
+    continuing after ``start_after()`` (or 0).
+    """
+    with transaction.atomic():
+        updated = IdSequence.objects.filter(name=name).update(last_value=F('last_value') + count)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    start = start_after() if start_after else 0
+                    IdSequence.objects.create(name=name, last_value=start + count)
+            except IntegrityError:
+                # Another process created the sequence first
+                IdSequence.objects.filter(name=name).update(last_value=F('last_value') + count)
+        last_value = IdSequence.objects.filter(name=name).values_list('last_value', flat=True).get()
+    return range(last_value - count + 1, last_value + 1)
+
+
+def allocate_doctor_ids(count):
+    """Reserve ``count`` new ``doctor_id`` values."""
+    def existing_maximum():
+        return highest_doctor_number(Doctor.objects.values_list('doctor_id', flat=True).iterator())
+
+    return [format_doctor_id(number) for number in reserve(DOCTOR_ID_SEQUENCE, count, existing_maximum)]
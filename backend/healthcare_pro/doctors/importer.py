@@ -0,0 +1,100 @@
+"""
+Bulk doctor import.
+
+Works like the patient import (see ``accounts.importing``). On top of the
+email check, license numbers are checked against the file and the
+``doctors`` table with one query per chunk. Each chunk reserves a block of
+``doctor_id`` values up front (see ``doctors.id_allocator``), so the rows
+can go through ``bulk_create`` and several imports can run side by side.
+
+``bulk_create`` skips model signals, so the doctor counter and the
+directory cache version are bumped here.
+"""
+from functools import partial
+
+from django.db import IntegrityError, transaction
+
+from accounts import counters
+from accounts.importing import (
+    DEFAULT_CHUNK_SIZE,
+    build_users,
+    concurrent_change_error,
+    queue_credentials,
+    run_import,
+    validate_rows,
+)
+from accounts.models import User
+from .directory_cache import invalidate_directory
+from .geo import geocode
+from .id_allocator import allocate_doctor_ids
+from .models import Doctor
+from .serializers import DoctorImportSerializer
+
+BULK_BATCH_SIZE = 500
+
+
+def import_doctors(stream, file_format, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+                   send_emails=True, max_errors=None):
+    """
+    Import doctors from a CSV or JSON Lines text stream.
+    Returns an ``ImportReport``.
+    """
+    seen_licenses = set()
+    return run_import(
+        stream, file_format, partial(_import_chunk, seen_licenses=seen_licenses, send_emails=send_emails),
+        chunk_size=chunk_size, workers=workers, max_errors=max_errors
+    )
+
+
+def _check_licenses(valid, report, seen_licenses):
+    existing = set(Doctor.objects.filter(
+        license_number__in=[cleaned['license_number'] for _, _, cleaned in valid]
+    ).values_list('license_number', flat=True))
+
+    checked = []
+    for row in valid:
+        row_number, email, cleaned = row
+        license_number = cleaned['license_number']
+        if license_number in existing:
+            report.add_error(row_number, {'license_number': ["Doctor with this license number already exists."]}, email)
+        elif license_number in seen_licenses:
+            report.add_error(row_number, {'license_number': ["Duplicate license number in this file."]}, email)
+        else:
+            seen_licenses.add(license_number)
+            checked.append(row)
+    return checked
+
+
+def _import_chunk(chunk, report, seen_emails, pool, seen_licenses, send_emails=True):
+    valid = validate_rows(chunk, DoctorImportSerializer(), report, seen_emails)
+    valid = _check_licenses(valid, report, seen_licenses)
+    if not valid:
+        return
+
+    users, passwords = build_users(valid, 'doctor', pool)
+    # Reserved in its own short transaction so parallel imports do not wait on this one
+    doctor_ids = allocate_doctor_ids(len(valid))
+    doctors = [
+        Doctor(user=user, doctor_id=doctor_id, **cleaned)
+        for user, doctor_id, (_, _, cleaned) in zip(users, doctor_ids, valid)
+    ]
+    # Doctor.save() is skipped, so locate the addresses here
+    for doctor in doctors:
+        if doctor.latitude is None or doctor.longitude is None:
+            geocode(doctor)
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=BULK_BATCH_SIZE)
+            Doctor.objects.bulk_create(doctors, batch_size=BULK_BATCH_SIZE)
+            if send_emails:
+                queue_credentials(users, passwords)
+            counters.increment(counters.DOCTORS, len(doctors))
+            invalidate_directory()
+    except IntegrityError:
+        # An email or license number was registered since the chunk was checked
+        for row_number, email, _ in valid:
+            report.add_error(row_number, concurrent_change_error(), email)
+        return
+
+    report.created += len(users)
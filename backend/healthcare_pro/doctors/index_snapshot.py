@@ -0,0 +1,65 @@
+"""
+Per-process snapshot of an in-memory doctor index.
+
+The typeahead (``doctors.search_index``) and "doctors near me"
+(``doctors.geo_index``) indexes are built from one query over the doctor
+directory and tagged with its version (see ``doctors.directory_cache``).
+With a few hundred thousand doctors a build takes seconds, so only the
+first one runs on the request path. Once a process has an index, a version
+change starts a single background build and requests keep using the old
+snapshot until the new one is swapped in. Changes made while a build runs
+are picked up by the next build.
+"""
+import logging
+import threading
+
+from django.db import connections
+
+from accounts.cache_versions import get_version
+from config.db_router import primary_reads
+from .directory_cache import DIRECTORY_NAMESPACE
+
+logger = logging.getLogger(__name__)
+
+
+class IndexSnapshot:
+    """The current index from ``build(version)``, rebuilt in the background when stale."""
+
+    def __init__(self, name, build):
+        self.name = name
+        self._build = build
+        self._index = None
+        self._rebuilding = False
+        self._lock = threading.Lock()
+
+    def _make(self, version):
+        # Built from the primary so a lagging replica is not kept until the next change
+        with primary_reads():
+            return self._build(version)
+
+    def _rebuild(self, version):
+        try:
+            self._index = self._make(version)
+        except Exception:
+            logger.exception("Rebuilding the %s failed; the previous one stays in use", self.name)
+        finally:
+            # This thread's connections are not closed by the request cycle
+            connections.close_all()
+            self._rebuilding = False
+
+    def get(self):
+        """The latest index; stale for a few seconds while a newer one is built."""
+        version = get_version(DIRECTORY_NAMESPACE)
+        index = self._index
+        if index is not None and (index.version == version or self._rebuilding):
+            return index
+        with self._lock:
+            index = self._index
+            if index is None:
+                index = self._index = self._make(version)
+            elif index.version != version and not self._rebuilding:
+                self._rebuilding = True
+                threading.Thread(
+                    target=self._rebuild, args=(version,), name=f'rebuild {self.name}', daemon=True
+                ).start()
+        return index
@@ -0,0 +1,11 @@
+from accounts.management.base import BaseImportCommand
+from doctors.importer import import_doctors
+
+
+class Command(BaseImportCommand):
+    help = (
+        "Bulk-register doctors from a CSV or JSON Lines file. Doctor ids are reserved in "
+        "blocks, so several imports can run in parallel. Invalid rows are reported and skipped."
+    )
+    importer = staticmethod(import_doctors)
+    label = 'doctors'
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from doctors.directory_cache import invalidate_directory
+from doctors.geo import geocode
+from doctors.models import Doctor
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill doctor coordinates from their zip code and city using the locations file "
+        "(GEO_LOCATIONS_FILE). Run after replacing the file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help="Re-locate every doctor, not only those without coordinates. "
+                                 "Overwrites coordinates that were set by hand.")
+
+    def handle(self, *args, **options):
+        doctors = Doctor.objects.only('zip_code', 'city', 'state', 'latitude', 'longitude')
+        if not options['all']:
+            doctors = doctors.filter(latitude__isnull=True)
+
+        located = missing = 0
+        batch = []
+        with transaction.atomic():
+            for doctor in doctors.iterator(chunk_size=BATCH_SIZE):
+                geocode(doctor)
+                if doctor.latitude is None:
+                    missing += 1
+                else:
+                    located += 1
+                batch.append(doctor)
+                if len(batch) >= BATCH_SIZE:
+                    Doctor.objects.bulk_update(batch, ['latitude', 'longitude'])
+                    batch = []
+            Doctor.objects.bulk_update(batch, ['latitude', 'longitude'])
+            # bulk_update() skips the signals that refresh the nearby index
+            invalidate_directory()
+
+        self.stdout.write(self.style.SUCCESS(f"Located {located} doctors; {missing} addresses not found."))
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.9 on 2026-10-17 19:42
+
+import re
+
+from django.db import migrations, models
+
+
+def seed_doctor_id_sequence(apps, schema_editor):
+    Doctor = apps.get_model('doctors', 'Doctor')
+    IdSequence = apps.get_model('doctors', 'IdSequence')
+
+    # Continue after the highest DOCnnn id handed out so far
+    doctor_ids = Doctor.objects.values_list('doctor_id', flat=True)
+    matches = (re.match(r'^DOC(\d+)$', doctor_id) for doctor_id in doctor_ids)
+    numbers = [int(match.group(1)) for match in matches if match]
+    IdSequence.objects.create(name='doctor_id', last_value=max(numbers, default=0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0002_rename_qualifications_doctor_qualification_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'id_sequences',
+            },
+        ),
+        migrations.RunPython(seed_doctor_id_sequence, migrations.RunPython.noop),
+    ]
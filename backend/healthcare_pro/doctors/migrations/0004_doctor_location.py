@@ -0,0 +1,84 @@
+# Generated by Django 4.2.9 on 2026-10-17 20:00
+
+import csv
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.db import migrations, models
+
+# The lookup of doctors/geo.py as it stood when this migration was written,
+# so later changes to that module cannot change what this migration does
+LOCATIONS_FILE = Path(__file__).resolve().parent.parent / 'data' / 'postal_locations.csv'
+POSTAL_PREFIX_LENGTH = 3
+
+
+def _normalize(value):
+    return re.sub(r'\s+', ' ', value or '').strip().lower()
+
+
+def _postal(value):
+    return re.sub(r'[\s-]', '', value or '').upper()
+
+
+def load_locations():
+    by_postal_code, by_city_state, by_city, by_postal_prefix = {}, {}, {}, {}
+    path = getattr(settings, 'GEO_LOCATIONS_FILE', '') or LOCATIONS_FILE
+    with open(path, newline='', encoding='utf-8') as handle:
+        for row in csv.DictReader(handle):
+            point = (float(row['latitude']), float(row['longitude']))
+            postal_code = _postal(row['postal_code'])
+            city = _normalize(row['city'])
+            if postal_code:
+                by_postal_code.setdefault(postal_code, point)
+                by_postal_prefix.setdefault((len(postal_code), postal_code[:POSTAL_PREFIX_LENGTH]), point)
+            if city:
+                by_city_state.setdefault((city, _normalize(row['state'])), point)
+                by_city.setdefault(city, point)
+
+    def locate(postal_code, city, state):
+        postal_code = _postal(postal_code)
+        city = _normalize(city)
+        if postal_code in by_postal_code:
+            return by_postal_code[postal_code]
+        if city:
+            point = by_city_state.get((city, _normalize(state))) or by_city.get(city)
+            if point:
+                return point
+        if len(postal_code) > POSTAL_PREFIX_LENGTH:
+            return by_postal_prefix.get((len(postal_code), postal_code[:POSTAL_PREFIX_LENGTH]))
+        return None
+    return locate
+
+
+def locate_existing_doctors(apps, schema_editor):
+    locate = load_locations()
+    Doctor = apps.get_model('doctors', 'Doctor')
+    located = []
+    for doctor in Doctor.objects.only('zip_code', 'city', 'state').iterator():
+        point = locate(doctor.zip_code, doctor.city, doctor.state)
+        if point:
+            doctor.latitude, doctor.longitude = point
+            located.append(doctor)
+    Doctor.objects.bulk_update(located, ['latitude', 'longitude'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0003_doctor_id_sequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='latitude',
+            field=models.FloatField(blank=True, help_text='Filled from zip_code/city unless set', null=True),
+        ),
+        migrations.AddField(
+            model_name='doctor',
+            name='longitude',
+            field=models.FloatField(blank=True, help_text='Filled from zip_code/city unless set', null=True),
+        ),
+        migrations.RunPython(locate_existing_doctors, migrations.RunPython.noop),
+    ]
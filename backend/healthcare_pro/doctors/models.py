@@ -53,6 +53,8 @@ class Doctor(models.Model):
     city = models.CharField(max_length=100, blank=True, null=True)
     state = models.CharField(max_length=100, blank=True, null=True)
     zip_code = models.CharField(max_length=10, blank=True, null=True)
+    latitude = models.FloatField(blank=True, null=True, help_text="Filled from zip_code/city unless set")
+    longitude = models.FloatField(blank=True, null=True, help_text="Filled from zip_code/city unless set")
     
     # Emergency Contact
     emergency_contact_name = models.CharField(max_length=200, blank=True, null=True)
@@ -78,20 +80,55 @@ class Doctor(models.Model):
         db_table = 'doctors'
         ordering = ['-created_at']
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        doctor = super().from_db(db, field_names, values)
+        # Lets save() tell whether the address or the coordinates have changed
+        doctor._saved_address = doctor._address()
+        doctor._saved_point = doctor._point()
+        return doctor
+    
+    def _address(self):
+        return tuple(self.__dict__.get(field) for field in ('zip_code', 'city', 'state'))
+    
+    def _point(self):
+        return self.__dict__.get('latitude'), self.__dict__.get('longitude')
+    
     def save(self, *args, **kwargs):
         if not self.doctor_id:
             # Generate doctor ID like "DOC001", "DOC002", etc.
-            last_doctor = Doctor.objects.all().order_by('created_at').last()
-            if last_doctor and last_doctor.doctor_id:
-                last_id = int(last_doctor.doctor_id[3:])
-                self.doctor_id = f"DOC{str(last_id + 1).zfill(3)}"
-            else:
-                self.doctor_id = "DOC001"
+            from .id_allocator import allocate_doctor_ids
+            self.doctor_id = allocate_doctor_ids(1)[0]
+        address = self._address()
+        # Read before a deferred latitude/longitude gets loaded, so only assigned values count
+        point = self._point()
+        moved = address != getattr(self, '_saved_address', address)
+        # Coordinates set in the same save as a new address are kept
+        if self.latitude is None or self.longitude is None or (moved and point == getattr(self, '_saved_point', point)):
+            from .geo import geocode
+            geocode(self)
         super().save(*args, **kwargs)
+        self._saved_address = address
+        self._saved_point = self._point()
     
     def __str__(self):
         return f"Dr. {self.user.get_full_name()} - {self.specialization}"
 
+class IdSequence(models.Model):
+    """
+    Named counter that hands out blocks of human-readable ids, such as
+    ``Doctor.doctor_id`` (see ``doctors.id_allocator``).
+    """
+    
+    name = models.CharField(max_length=50, unique=True)
+    last_value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'id_sequences'
+    
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
+
 class Availability(models.Model):
     DAY_CHOICES = (
         ('monday', 'Monday'),
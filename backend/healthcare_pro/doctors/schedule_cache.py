@@ -0,0 +1,113 @@
+"""
+Cached, compiled weekly schedules.
+
+A doctor's ``Availability`` rows are compiled into ``{day_of_week: ((start,
+end), ...)}`` with the windows of each day sorted by start time. Compiled
+schedules live in two layers: a small process-local dict in front of the
+shared Django cache. Both are keyed on the doctor's schedule version, which
+``invalidate_schedule`` bumps whenever an ``Availability`` row is written,
+so a stale schedule is never served once the write has committed.
+"""
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from accounts.cache_versions import bump_version, get_versions, versioned_key
+from .models import Availability
+
+SCHEDULE_NAMESPACE = 'doctor_schedule'
+SCHEDULE_CACHE_SECONDS = 24 * 60 * 60
+LOCAL_CACHE_MAX_DOCTORS = 5000
+
+# Index matches date.weekday(): 0 is Monday.
+DAY_NAMES = [day for day, _ in Availability.DAY_CHOICES]
+
+# doctor_id -> (version, compiled schedule)
+_local_schedules = {}
+
+
+def weekday_name(day):
+    """Return the ``Availability.day_of_week`` value for a date."""
+    return DAY_NAMES[day.weekday()]
+
+
+def compile_schedule(rows):
+    """Compile ``(day_of_week, start_time, end_time)`` rows into a weekly schedule."""
+    schedule = defaultdict(list)
+    for day_of_week, start, end in rows:
+        schedule[day_of_week].append((start, end))
+    return {day: tuple(sorted(windows)) for day, windows in schedule.items()}
+
+
+def _load_schedules(doctor_ids):
+    rows = defaultdict(list)
+    availability_rows = Availability.objects.filter(
+        doctor_id__in=doctor_ids,
+        is_available=True
+    ).values_list('doctor_id', 'day_of_week', 'start_time', 'end_time')
+    for doctor_id, day_of_week, start, end in availability_rows:
+        rows[doctor_id].append((day_of_week, start, end))
+    return {doctor_id: compile_schedule(rows[doctor_id]) for doctor_id in doctor_ids}
+
+
+def _remember_locally(doctor_id, version, schedule):
+    if len(_local_schedules) >= LOCAL_CACHE_MAX_DOCTORS:
+        _local_schedules.clear()
+    _local_schedules[doctor_id] = (version, schedule)
+
+
+def get_schedules(doctor_ids):
+    """
+    Compiled weekly schedules for ``doctor_ids`` as ``{doctor_id: schedule}``.
+    Only doctors missing from both cache layers are read from the database,
+    in a single query.
+    """
+    schedules = {}
+    shared_keys = {}
+    for doctor_id, version in get_versions(SCHEDULE_NAMESPACE, doctor_ids).items():
+        local = _local_schedules.get(doctor_id)
+        if local and local[0] == version:
+            schedules[doctor_id] = local[1]
+        else:
+            shared_keys[versioned_key(SCHEDULE_NAMESPACE, doctor_id, version)] = (doctor_id, version)
+
+    if shared_keys:
+        found = cache.get_many(list(shared_keys))
+        missing = {}
+        for key, (doctor_id, version) in shared_keys.items():
+            if key in found:
+                schedules[doctor_id] = found[key]
+                _remember_locally(doctor_id, version, found[key])
+            else:
+                missing[doctor_id] = (key, version)
+
+        if missing:
+            loaded = _load_schedules(list(missing))
+            cache.set_many(
+                {key: loaded[doctor_id] for doctor_id, (key, _) in missing.items()},
+                SCHEDULE_CACHE_SECONDS
+            )
+            for doctor_id, (_, version) in missing.items():
+                schedules[doctor_id] = loaded[doctor_id]
+                _remember_locally(doctor_id, version, loaded[doctor_id])
+
+    return schedules
+
+
+def get_schedule(doctor_id):
+    return get_schedules([doctor_id])[doctor_id]
+
+
+def get_windows(doctor_id, day):
+    """``((start_time, end_time), ...)`` the doctor works on ``day``."""
+    return get_schedule(doctor_id).get(weekday_name(day), ())
+
+
+def is_on_shift(doctor_id, day, at_time):
+    """Whether ``at_time`` on ``day`` falls inside one of the doctor's windows."""
+    return any(start <= at_time <= end for start, end in get_windows(doctor_id, day))
+
+
+def invalidate_schedule(doctor_id):
+    """Drop the cached schedule of ``doctor_id`` once the current transaction commits."""
+    bump_version(SCHEDULE_NAMESPACE, doctor_id)
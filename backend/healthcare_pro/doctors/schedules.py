@@ -0,0 +1,129 @@
+"""
+Atomic weekly schedule replacement.
+
+A new week is validated as a whole before anything is written, then each
+doctor's existing ``Availability`` rows are diffed against it and only the
+differences are applied with ``bulk_create`` / ``bulk_update`` / one
+``DELETE``, all inside a single transaction. The same operation rolls a
+template week out to many doctors at once.
+"""
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Availability
+from .schedule_cache import DAY_NAMES, invalidate_schedule
+from .serializers import AvailabilitySerializer
+
+BULK_BATCH_SIZE = 500
+
+
+class ScheduleError(Exception):
+    """The submitted schedule is invalid or could not be applied."""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def validate_week(entries):
+    """
+    Validate a full week of ``{day_of_week, start_time, end_time,
+    is_available}`` entries. Returns the cleaned entries or raises
+    ``ScheduleError`` listing every problem at once.
+    """
+    if not isinstance(entries, list):
+        raise ScheduleError(["schedule must be a list of time slots."])
+
+    serializer = AvailabilitySerializer(data=entries, many=True)
+    if not serializer.is_valid():
+        raise ScheduleError([
+            {'slot': index, 'errors': errors}
+            for index, errors in enumerate(serializer.errors) if errors
+        ])
+    week = serializer.validated_data
+
+    errors = []
+    by_day = {}
+    for index, entry in enumerate(week):
+        by_day.setdefault(entry['day_of_week'], []).append((entry['start_time'], entry['end_time'], index))
+    for day in DAY_NAMES:
+        windows = sorted(by_day.get(day, []))
+        for (start, end, _), (next_start, _, index) in zip(windows, windows[1:]):
+            if next_start < end:
+                errors.append({
+                    'slot': index,
+                    'errors': [f"Overlaps the {day} slot {start.strftime('%H:%M')}-{end.strftime('%H:%M')}."]
+                })
+    if errors:
+        raise ScheduleError(errors)
+    return week
+
+
+def replace_schedules(doctor_ids, entries):
+    """
+    Make ``entries`` the complete weekly schedule of every doctor in
+    ``doctor_ids``. Rows are matched on ``(day_of_week, start_time)``;
+    unchanged rows are left alone. Returns counts of created, updated,
+    deleted and unchanged rows.
+    """
+    week = validate_week(entries)
+    wanted = {
+        (entry['day_of_week'], entry['start_time']): (entry['end_time'], entry.get('is_available', True))
+        for entry in week
+    }
+    summary = {'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+    try:
+        with transaction.atomic():
+            # Lock the current rows so concurrent replacements apply one after another
+            existing = Availability.objects.select_for_update().filter(doctor_id__in=doctor_ids)
+
+            now = timezone.now()
+            to_update, to_delete, seen, changed_doctors = [], [], set(), set()
+            for row in existing:
+                key = (row.day_of_week, row.start_time)
+                seen.add((row.doctor_id, key))
+                if key not in wanted:
+                    to_delete.append(row.id)
+                    changed_doctors.add(row.doctor_id)
+                    continue
+                end_time, is_available = wanted[key]
+                if (row.end_time, row.is_available) == (end_time, is_available):
+                    summary['unchanged'] += 1
+                    continue
+                # bulk_update() does not apply auto_now
+                row.end_time, row.is_available, row.updated_at = end_time, is_available, now
+                to_update.append(row)
+                changed_doctors.add(row.doctor_id)
+
+            to_create = [
+                Availability(
+                    doctor_id=doctor_id,
+                    day_of_week=day_of_week,
+                    start_time=start_time,
+                    end_time=end_time,
+                    is_available=is_available
+                )
+                for doctor_id in doctor_ids
+                for (day_of_week, start_time), (end_time, is_available) in wanted.items()
+                if (doctor_id, (day_of_week, start_time)) not in seen
+            ]
+
+            changed_doctors.update(row.doctor_id for row in to_create)
+
+            if to_delete:
+                summary['deleted'], _ = Availability.objects.filter(id__in=to_delete).delete()
+            if to_update:
+                summary['updated'] = Availability.objects.bulk_update(
+                    to_update, ['end_time', 'is_available', 'updated_at'], batch_size=BULK_BATCH_SIZE
+                )
+            if to_create:
+                summary['created'] = len(Availability.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE))
+
+            # bulk_create() and bulk_update() skip model signals, so invalidate explicitly
+            for doctor_id in changed_doctors:
+                invalidate_schedule(doctor_id)
+    except IntegrityError:
+        raise ScheduleError(["The schedule was changed concurrently. Please retry."])
+
+    return summary
@@ -0,0 +1,243 @@
+"""
+In-memory search index for the doctor typeahead.
+
+Available doctors are tokenized by name, specialization, department and
+city into an inverted index (token -> doctor positions, per field), next
+to a sorted vocabulary for prefix matching and a trigram map for typo
+tolerance. A query term matches tokens exactly, by prefix, or within one
+or two edits (transpositions count as one). Every term has to match, and
+doctors are ranked by how well and in which fields the terms matched,
+then by experience.
+
+Each worker process holds one index, tagged with the doctor directory
+version (see ``doctors.directory_cache``). ``Doctor`` and doctor ``User``
+writes bump that version. The next search starts a rebuild with a single
+query in the background and keeps using the old index until the new one
+is ready (see ``doctors.index_snapshot``). Queries never touch the
+database.
+"""
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from .index_snapshot import IndexSnapshot
+from .models import Doctor
+
+DEFAULT_LIMIT = 20
+
+# Score of a match in each field, before the match quality is applied
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'specialization': 2.0,
+    'department': 2.0,
+    'city': 1.0,
+}
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.7
+FUZZY_MATCH = 0.4
+
+# A very short prefix can match much of the vocabulary; only the first
+# tokens (in alphabetical order) are expanded
+MAX_PREFIX_TOKENS = 256
+# Candidates (most shared trigrams first) checked for edit distance
+MAX_FUZZY_CANDIDATES = 200
+MIN_FUZZY_LENGTH = 3
+
+_TOKEN_RE = re.compile(r'[^\W_]+')
+_SPECIALIZATION_NAMES = dict(Doctor.SPECIALIZATION_CHOICES)
+
+
+def tokenize(text):
+    """Lower-cased alphanumeric words of ``text``."""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def trigrams(token):
+    padded = f'${token}$'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(term):
+    return 1 if len(term) < 7 else 2
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance between ``a`` and ``b``, or
+    ``limit + 1`` as soon as it is known to exceed ``limit``.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            cost = char_a != char_b
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class DoctorSearchIndex:
+    """Immutable index over one snapshot of the available doctors."""
+
+    def __init__(self, rows, version=None):
+        """
+        ``rows`` are ``(id, first_name, last_name, specialization,
+        department, city)`` tuples, best default rank first.
+        """
+        self.version = version
+        self.doctor_ids = []
+        postings = {field: defaultdict(list) for field in FIELD_WEIGHTS}
+        by_specialization = defaultdict(list)
+        by_city = defaultdict(list)
+
+        for position, (doctor_id, first_name, last_name, specialization, department, city) in enumerate(rows):
+            self.doctor_ids.append(doctor_id)
+            fields = {
+                'name': tokenize(f'{first_name} {last_name}'),
+                'specialization': tokenize(
+                    f"{specialization} {_SPECIALIZATION_NAMES.get(specialization, '')}"
+                ),
+                'department': tokenize(department),
+                'city': tokenize(city),
+            }
+            for field, tokens in fields.items():
+                for token in set(tokens):
+                    postings[field][token].append(position)
+            by_specialization[(specialization or '').lower()].append(position)
+            by_city[(city or '').lower()].append(position)
+
+        self._postings = {
+            field: {token: array('I', positions) for token, positions in tokens.items()}
+            for field, tokens in postings.items()
+        }
+        self._by_specialization = {value: array('I', positions) for value, positions in by_specialization.items()}
+        self._by_city = {value: array('I', positions) for value, positions in by_city.items()}
+
+        self._vocabulary = sorted({token for tokens in postings.values() for token in tokens})
+        self._trigrams = defaultdict(list)
+        for token in self._vocabulary:
+            for trigram in trigrams(token):
+                self._trigrams[trigram].append(token)
+
+    def __len__(self):
+        return len(self.doctor_ids)
+
+    def _matching_tokens(self, term):
+        """``{token: quality}`` for the vocabulary tokens ``term`` matches."""
+        matches = {}
+        start = bisect_left(self._vocabulary, term)
+        for token in self._vocabulary[start:start + MAX_PREFIX_TOKENS]:
+            if not token.startswith(term):
+                break
+            matches[token] = EXACT_MATCH if token == term else PREFIX_MATCH
+        if matches or len(term) < MIN_FUZZY_LENGTH:
+            return matches
+
+        # Typo tolerance: tokens sharing trigrams with the term, within a
+        # few edits of the whole token or of the part being typed
+        limit = max_edits(term)
+        shared = Counter(
+            token for trigram in trigrams(term) for token in self._trigrams.get(trigram, ())
+        )
+        for token, _ in shared.most_common(MAX_FUZZY_CANDIDATES):
+            distance = min(
+                edit_distance(term, token, limit),
+                edit_distance(term, token[:len(term)], limit),
+            )
+            if distance <= limit:
+                matches[token] = FUZZY_MATCH * (1 - distance / (len(term) + 1))
+        return matches
+
+    def _term_scores(self, matches, within=None):
+        """Best score of each doctor for one term, optionally only for doctors ``within``."""
+        scores = {}
+        for token, quality in matches.items():
+            for field, weight in FIELD_WEIGHTS.items():
+                score = weight * quality
+                for position in self._postings[field].get(token, ()):
+                    if within is not None and position not in within:
+                        continue
+                    if score > scores.get(position, 0):
+                        scores[position] = score
+        return scores
+
+    def _posting_count(self, matches):
+        return sum(
+            len(self._postings[field].get(token, ())) for token in matches for field in FIELD_WEIGHTS
+        )
+
+    @staticmethod
+    def _containing(groups, needle):
+        # Same meaning as icontains, over the few distinct values
+        needle = needle.lower()
+        return {
+            position
+            for value, positions in groups.items() if needle in value
+            for position in positions
+        }
+
+    def search(self, query='', specialization='', city='', limit=DEFAULT_LIMIT):
+        """Ids of the best ``limit`` doctors for ``query``, best first."""
+        # Most selective term first, so later terms only score its matches
+        terms = [self._matching_tokens(term) for term in dict.fromkeys(tokenize(query))]
+        terms.sort(key=self._posting_count)
+        scores = None
+        for matches in terms:
+            term_scores = self._term_scores(matches, within=scores)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {position: scores[position] + score for position, score in term_scores.items()}
+            if not scores:
+                return []
+
+        allowed = None
+        if specialization:
+            allowed = self._containing(self._by_specialization, specialization)
+        if city:
+            in_city = self._containing(self._by_city, city)
+            allowed = in_city if allowed is None else allowed & in_city
+
+        if scores is None:
+            # No search terms: default rank order
+            positions = range(len(self)) if allowed is None else sorted(allowed)
+            return [self.doctor_ids[position] for position in positions[:limit]]
+
+        if allowed is not None:
+            scores = {position: score for position, score in scores.items() if position in allowed}
+        best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [self.doctor_ids[position] for position, _ in best]
+
+
+def load_rows():
+    return Doctor.objects.filter(is_available=True).order_by(
+        '-years_of_experience', 'doctor_id'
+    ).values_list(
+        'id', 'user__first_name', 'user__last_name', 'specialization', 'department', 'city'
+    )
+
+
+def build_index(version=None):
+    return DoctorSearchIndex(load_rows().iterator(chunk_size=5000), version)
+
+
+_snapshot = IndexSnapshot('doctor search index', build_index)
+
+
+def get_index():
+    """This process's index, rebuilt in the background after the doctor directory changes."""
+    return _snapshot.get()
+
+
+def search_doctors(query='', specialization='', city='', limit=DEFAULT_LIMIT):
+    """Ids of the best matching available doctors, best first."""
+    return get_index().search(query, specialization, city, limit)
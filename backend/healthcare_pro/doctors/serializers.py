@@ -7,6 +7,13 @@ class AvailabilitySerializer(serializers.ModelSerializer):
         model = Availability
         fields = ['id', 'day_of_week', 'start_time', 'end_time', 'is_available', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def validate(self, data):
+        start_time = data.get('start_time', getattr(self.instance, 'start_time', None))
+        end_time = data.get('end_time', getattr(self.instance, 'end_time', None))
+        if start_time and end_time and end_time <= start_time:
+            raise serializers.ValidationError("end_time must be after start_time.")
+        return data
 
 class DoctorSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -39,6 +46,35 @@ class DoctorCreateSerializer(serializers.ModelSerializer):
                   'emergency_contact_name', 'emergency_contact_phone',
                   'emergency_contact_relationship', 'department', 'consultation_fee']
 
+class DoctorImportSerializer(serializers.ModelSerializer):
+    """Validates one row of a bulk doctor import."""
+    
+    email = serializers.EmailField(max_length=255)
+    first_name = serializers.CharField(max_length=100)
+    last_name = serializers.CharField(max_length=100)
+    working_days = serializers.ListField(
+        child=serializers.ChoiceField(choices=Doctor.WORKING_DAYS_CHOICES),
+        required=False
+    )
+    
+    class Meta:
+        model = Doctor
+        fields = ['email', 'first_name', 'last_name', 'specialization', 'department',
+                  'license_number', 'years_of_experience', 'qualification', 'date_of_birth',
+                  'gender', 'phone', 'address', 'city', 'state', 'zip_code',
+                  'emergency_contact_name', 'emergency_contact_phone', 'relationship',
+                  'consultation_fee', 'working_days', 'start_time', 'end_time',
+                  'latitude', 'longitude']
+        # Uniqueness is checked for a whole chunk at once by the importer
+        extra_kwargs = {'license_number': {'validators': []}}
+    
+    def to_internal_value(self, data):
+        # CSV files list working days as "monday,tuesday"
+        if isinstance(data.get('working_days'), str):
+            days = [day.strip().lower() for day in data['working_days'].split(',')]
+            data = {**data, 'working_days': [day for day in days if day]}
+        return super().to_internal_value(data)
+
 class DoctorUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Doctor
@@ -46,7 +82,7 @@ class DoctorUpdateSerializer(serializers.ModelSerializer):
                   'phone', 'address', 'city', 'state', 'zip_code',
                   'emergency_contact_name', 'emergency_contact_phone',
                   'emergency_contact_relationship', 'department',
-                  'consultation_fee', 'is_available']
+                  'consultation_fee', 'is_available', 'latitude', 'longitude']
 
 class DoctorListSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts import counters
+from accounts.models import User
+from .directory_cache import invalidate_directory
+from .models import Doctor, Availability
+from .schedule_cache import invalidate_schedule
+
+
+@receiver(post_save, sender=Doctor)
+def count_created_doctor(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(counters.DOCTORS)
+
+
+@receiver(post_delete, sender=Doctor)
+def count_deleted_doctor(sender, instance, **kwargs):
+    counters.increment(counters.DOCTORS, -1)
+
+
+@receiver(post_save, sender=Availability)
+@receiver(post_delete, sender=Availability)
+def invalidate_cached_schedule(sender, instance, **kwargs):
+    invalidate_schedule(instance.doctor_id)
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+def invalidate_doctor_directory(sender, instance, **kwargs):
+    invalidate_directory()
+
+
+@receiver(post_save, sender=User)
+def invalidate_doctor_names(sender, instance, update_fields=None, **kwargs):
+    # Doctor names are part of the directory; logins only touch last_login
+    if instance.role == 'doctor' and update_fields != frozenset({'last_login'}):
+        invalidate_directory()
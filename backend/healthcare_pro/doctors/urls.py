@@ -7,11 +7,13 @@ urlpatterns = [
     path('<uuid:pk>/', doctor_views.DoctorDetailView.as_view(), name='doctor_detail'),
     path('my-profile/', profile_views.MyDoctorProfileView.as_view(), name='my_doctor_profile'),
     path('search/', doctor_views.search_doctors, name='search_doctors'),
+    path('nearby/', doctor_views.nearby_doctors, name='nearby_doctors'),
     path('my-statistics/', profile_views.my_statistics, name='my_statistics'),
     path('specializations/', doctor_views.specializations_list, name='specializations_list'),
     
     # Doctor availability endpoints
     path('<uuid:doctor_id>/availability/', profile_views.DoctorAvailabilityView.as_view(), name='doctor_availability'),
+    path('availability/template/', profile_views.apply_schedule_template, name='apply_schedule_template'),
     path('availability/<uuid:pk>/', profile_views.AvailabilityDetailView.as_view(), name='availability_detail'),
     
     # Doctor dashboard views (function-based)
@@ -5,7 +5,8 @@ from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.utils import timezone
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Max, F
+from django.core.paginator import Paginator
 from datetime import datetime, timedelta, date
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -16,16 +17,33 @@ import json
 from doctors.models import Doctor, Availability
 from patients.models import PatientProfile
 from appointments.models import Appointment
+from appointments.slot_engine import SlotEngine, load_day
+from appointments.fast_serializers import fast_doctor_appointment
 from appointments.serializers import (
     DoctorAppointmentSerializer, AppointmentCreateSerializer,
     AppointmentUpdateSerializer, AppointmentListSerializer
 )
 from patients.serializers import PatientProfileListSerializer
 from doctors.serializers import AvailabilitySerializer
+from doctors.schedules import ScheduleError, replace_schedules
+from config.db_router import use_read_replica
+
+MAX_PATIENTS_PAGE_SIZE = 100
+
+# Allowed values of the doctor_patients "ordering" parameter
+PATIENT_ORDERINGS = {
+    'name': ['user__first_name', 'user__last_name'],
+    '-name': ['-user__first_name', '-user__last_name'],
+    'last_visit': [F('last_visit').asc(nulls_first=True)],
+    '-last_visit': [F('last_visit').desc(nulls_last=True)],
+    'created_at': ['created_at'],
+    '-created_at': ['-created_at'],
+}
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_read_replica
 def doctor_dashboard(request):
     """
     Doctor Dashboard - Main overview page
@@ -82,6 +100,7 @@ def doctor_dashboard(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_read_replica
 def doctor_appointments(request):
     """
     Doctor Appointments - View and manage all appointments
@@ -132,10 +151,8 @@ def doctor_appointments(request):
         appointments = appointments.filter(appointment_date__gte=today)
     
     # Serialize appointments
-    serializer = DoctorAppointmentSerializer(appointments, many=True)
-    
     return Response({
-        'appointments': serializer.data,
+        'appointments': fast_doctor_appointment.data(appointments),
         'total_count': appointments.count(),
         'filters': {
             'status': status_filter,
@@ -229,6 +246,7 @@ def appointment_detail(request, appointment_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@use_read_replica
 def doctor_patients(request):
     """
     Doctor Patients - View and manage assigned patients
@@ -247,30 +265,53 @@ def doctor_patients(request):
             status=status.HTTP_404_NOT_FOUND
         )
     
-    # Get patients who have appointments with this doctor
+    # Patients who have appointments with this doctor, with the date of
+    # their last completed visit aggregated in the same query
     patients = PatientProfile.objects.filter(
         appointments__doctor=doctor
-    ).distinct().select_related('user')
+    ).annotate(
+        last_visit=Max('appointments__appointment_date', filter=Q(appointments__status='completed'))
+    ).select_related('user')
+    
+    search = request.GET.get('search', '').strip()
+    if search:
+        patients = patients.filter(
+            Q(user__first_name__icontains=search) |
+            Q(user__last_name__icontains=search) |
+            Q(user__email__icontains=search) |
+            Q(phone_number__icontains=search)
+        )
     
-    # Add last visit information
-    patients_data = []
-    for patient in patients:
-        last_appointment = Appointment.objects.filter(
-            doctor=doctor,
-            patient=patient,
-            status='completed'
-        ).order_by('-appointment_date').first()
-        
-        patient_data = PatientProfileListSerializer(patient).data
-        patient_data['last_visit'] = None
-        if last_appointment:
-            patient_data['last_visit'] = last_appointment.appointment_date.strftime('%Y-%m-%d')
-        
-        patients_data.append(patient_data)
+    ordering = request.GET.get('ordering', '-last_visit')
+    if ordering not in PATIENT_ORDERINGS:
+        return Response(
+            {"error": f"Invalid ordering. Use one of: {', '.join(PATIENT_ORDERINGS)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    patients = patients.order_by(*PATIENT_ORDERINGS[ordering], 'id')
+    
+    try:
+        page_size = min(int(request.GET.get('page_size', 20)), MAX_PATIENTS_PAGE_SIZE)
+        page_number = int(request.GET.get('page', 1))
+    except ValueError:
+        return Response(
+            {"error": "page and page_size must be integers."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    paginator = Paginator(patients, max(page_size, 1))
+    page = paginator.get_page(page_number)
+    
+    patients_data = PatientProfileListSerializer(page.object_list, many=True).data
+    for patient_data, patient in zip(patients_data, page.object_list):
+        patient_data['last_visit'] = patient.last_visit.strftime('%Y-%m-%d') if patient.last_visit else None
     
     return Response({
         'patients': patients_data,
-        'total_count': len(patients_data)
+        'total_count': paginator.count,
+        'page': page.number,
+        'page_size': paginator.per_page,
+        'total_pages': paginator.num_pages
     })
 
 
@@ -333,7 +374,7 @@ def patient_detail_for_doctor(request, patient_id):
         'patient': PatientProfileListSerializer(patient).data,
         'medical_history': MedicalHistorySerializer(medical_history, many=True).data,
         'prescriptions': PrescriptionSerializer(prescriptions, many=True).data,
-        'appointments': DoctorAppointmentSerializer(appointments, many=True).data,
+        'appointments': fast_doctor_appointment.data(appointments),
         'summary': {
             'total_visits': appointments.count(),
             'last_visit': appointments.first().appointment_date if appointments.exists() else None,
@@ -365,7 +406,7 @@ def doctor_availability(request):
     
     if request.method == 'GET':
         # Get current availability schedule
-        availability = Availability.objects.filter(doctor=doctor).order_by('day')
+        availability = Availability.objects.filter(doctor=doctor).order_by('day_of_week', 'start_time')
         serializer = AvailabilitySerializer(availability, many=True)
         
         return Response({
@@ -374,25 +415,16 @@ def doctor_availability(request):
         })
     
     elif request.method == 'POST':
-        # Update availability schedule
-        schedule_data = request.data.get('schedule', [])
-        
-        # Clear existing schedule
-        Availability.objects.filter(doctor=doctor).delete()
-        
-        # Create new schedule
-        for slot_data in schedule_data:
-            slot_data['doctor'] = doctor.id
-            serializer = AvailabilitySerializer(data=slot_data)
-            if serializer.is_valid():
-                serializer.save()
-            else:
-                return Response(
-                    {"error": f"Invalid data for slot: {serializer.errors}"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        # Validate the whole week, then apply only the differences in one transaction
+        try:
+            summary = replace_schedules([doctor.id], request.data.get('schedule', []))
+        except ScheduleError as e:
+            return Response(
+                {"error": "Invalid schedule.", "details": e.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        return Response({"message": "Schedule updated successfully."})
+        return Response({"message": "Schedule updated successfully.", **summary})
 
 
 @api_view(['GET'])
@@ -430,44 +462,24 @@ def available_time_slots(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Get doctor's availability for this day
-    day_of_week = requested_date.weekday()
-    availability = Availability.objects.filter(
-        doctor=doctor,
-        day=day_of_week,
-        is_available=True
-    )
+    # Get doctor's availability windows and bookings for this day
+    windows, bookings = load_day(doctor.id, requested_date)
     
-    if not availability.exists():
+    if not windows:
         return Response({
             'available_slots': [],
             'message': 'Doctor is not available on this day.'
         })
     
-    # Get existing appointments for this date
-    existing_appointments = Appointment.objects.filter(
-        doctor=doctor,
-        appointment_date=requested_date,
-        status__in=['scheduled', 'confirmed', 'in_progress']
-    ).values_list('appointment_time', flat=True)
-    
-    # Generate available time slots
-    available_slots = []
-    for slot in availability:
-        current_time = slot.start_time
-        slot_duration = 30  # 30-minute slots
-        
-        while current_time < slot.end_time:
-            if current_time not in existing_appointments:
-                available_slots.append({
-                    'time': current_time.strftime('%H:%M'),
-                    'is_available': True
-                })
-            
-            # Add 30 minutes for next slot
-            current_datetime = datetime.combine(requested_date, current_time)
-            next_datetime = current_datetime + timedelta(minutes=slot_duration)
-            current_time = next_datetime.time()
+    # Keep only the free slots of the day bitmap
+    available_slots = [
+        {
+            'time': slot_time.strftime('%H:%M'),
+            'is_available': True
+        }
+        for slot_time, is_free in SlotEngine().day_slots(windows, bookings)
+        if is_free
+    ]
     
     return Response({
         'date': date_str,
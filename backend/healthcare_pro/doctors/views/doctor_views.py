@@ -2,8 +2,10 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.exceptions import ValidationError
-from django.db.models import Q
 
+from .. import geo_index, search_index
+from ..directory_cache import directory_response
+from ..geo import locate
 from ..models import Doctor
 from ..serializers import (
     DoctorSerializer,
@@ -13,9 +15,15 @@ from ..serializers import (
 )
 from accounts.permissions import IsDoctor, IsDoctorOrAdmin
 from accounts.models import User
+from config.db_router import ReplicaReadMixin, use_read_replica
 
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 500
+DEFAULT_NEARBY_LIMIT = 20
+MAX_NEARBY_RESULTS = 100
 
-class DoctorListCreateView(generics.ListCreateAPIView):
+
+class DoctorListCreateView(ReplicaReadMixin, generics.ListCreateAPIView):
     """List all doctors or create a new doctor."""
     
     queryset = Doctor.objects.filter(is_available=True)
@@ -95,37 +103,103 @@ class DoctorDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@use_read_replica
 def search_doctors(request):
-    """Search doctors by various criteria."""
+    """
+    Search doctors by name, specialization, department and city.
+    Matches word prefixes and tolerates typos (see ``doctors.search_index``).
+    """
     query = request.GET.get('q', '')
     specialization = request.GET.get('specialization', '')
     city = request.GET.get('city', '')
     
-    doctors = Doctor.objects.filter(is_available=True)
+    doctor_ids = search_index.search_doctors(query, specialization, city)
+    doctors = Doctor.objects.filter(id__in=doctor_ids).select_related('user').in_bulk()
+    ranked = [doctors[doctor_id] for doctor_id in doctor_ids if doctor_id in doctors]
     
-    if query:
-        doctors = doctors.filter(
-            Q(user__first_name__icontains=query) |
-            Q(user__last_name__icontains=query) |
-            Q(specialization__icontains=query) |
-            Q(department__icontains=query)
+    serializer = DoctorListSerializer(ranked, many=True)
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+@use_read_replica
+def nearby_doctors(request):
+    """
+    Available doctors near a point, nearest first.
+    The point is ``lat``/``lng``, or a ``zip_code`` or ``city`` (and
+    ``state``) from the bundled locations (see ``doctors.geo``). Either
+    ``radius_km`` (default 10) with ``limit``, or the ``k`` nearest,
+    optionally within ``radius_km``. Filters: ``specialization``, ``max_fee``.
+    """
+    params = request.GET
+    try:
+        if params.get('lat') or params.get('lng'):
+            origin = (float(params['lat']), float(params['lng']))
+            if not (-90 <= origin[0] <= 90 and -180 <= origin[1] <= 180):
+                raise ValueError
+        else:
+            origin = None
+        radius_km = float(params['radius_km']) if params.get('radius_km') else None
+        k = int(params['k']) if params.get('k') else None
+        limit = min(int(params.get('limit', DEFAULT_NEARBY_LIMIT)), MAX_NEARBY_RESULTS)
+        max_fee = float(params['max_fee']) if params.get('max_fee') else None
+    except (KeyError, ValueError):
+        return Response(
+            {'error': 'lat/lng, radius_km, k, limit and max_fee must be valid numbers.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    out_of_range = (
+        (radius_km is not None and not 0 < radius_km <= MAX_RADIUS_KM)
+        or (k is not None and not 0 < k <= MAX_NEARBY_RESULTS)
+        or limit < 1
+    )
+    if out_of_range:
+        return Response(
+            {'error': f'radius_km must be up to {MAX_RADIUS_KM:g}, k and limit up to {MAX_NEARBY_RESULTS}.'},
+            status=status.HTTP_400_BAD_REQUEST
         )
     
-    if specialization:
-        doctors = doctors.filter(specialization__icontains=specialization)
+    if origin is None:
+        if not (params.get('zip_code') or params.get('city')):
+            return Response(
+                {'error': 'Provide lat and lng, zip_code or city.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        origin = locate(params.get('zip_code'), params.get('city'), params.get('state'))
+        if origin is None:
+            return Response(
+                {'error': 'Location not found. Try a nearby city or send lat and lng.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
     
-    if city:
-        doctors = doctors.filter(city__icontains=city)
+    index = geo_index.get_index()
+    specialization = params.get('specialization', '')
+    if k is not None:
+        matches = index.nearest(*origin, k, specialization, max_fee, radius_km)
+    else:
+        matches = index.within(*origin, radius_km or DEFAULT_RADIUS_KM, specialization, max_fee, limit)
     
-    doctors = doctors.distinct().order_by('-years_of_experience')[:20]  # Limit to 20 results
+    doctors = Doctor.objects.filter(id__in=[doctor_id for doctor_id, _ in matches]).select_related('user').in_bulk()
+    results = []
+    for doctor_id, distance in matches:
+        if doctor_id in doctors:
+            data = DoctorListSerializer(doctors[doctor_id]).data
+            data['distance_km'] = round(distance, 2)
+            results.append(data)
     
-    serializer = DoctorListSerializer(doctors, many=True)
-    return Response(serializer.data)
+    return Response({
+        'origin': {'latitude': origin[0], 'longitude': origin[1]},
+        'count': len(results),
+        'results': results
+    })
 
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def specializations_list(request):
     """Get list of all specializations."""
-    specializations = [choice[0] for choice in Doctor.SPECIALIZATION_CHOICES]
-    return Response(specializations)
\ No newline at end of file
+    return directory_response(
+        request, 'specializations',
+        lambda: [choice[0] for choice in Doctor.SPECIALIZATION_CHOICES]
+    )
\ No newline at end of file
@@ -1,3 +1,5 @@
+import uuid
+
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
@@ -9,7 +11,8 @@ from ..serializers import (
     DoctorUpdateSerializer,
     AvailabilitySerializer
 )
-from accounts.permissions import IsDoctor, IsDoctorOrAdmin
+from ..schedules import ScheduleError, replace_schedules
+from accounts.permissions import IsAdmin, IsDoctor, IsDoctorOrAdmin
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions
 
@@ -90,4 +93,63 @@ class AvailabilityDetailView(generics.RetrieveUpdateDestroyAPIView):
         if self.request.user.role != 'admin' and obj.doctor.user != self.request.user:
             raise permissions.PermissionDenied("You can only manage your own availability.")
         
-        return obj
\ No newline at end of file
+        return obj
+
+
+@api_view(['POST'])
+@permission_classes([IsAdmin])
+def apply_schedule_template(request):
+    """
+    Replace the weekly schedule of many doctors with one template, e.g. when
+    a clinic changes its hours. Targets either ``doctor_ids`` or every
+    doctor of a ``department``. All doctors are updated in one transaction.
+    """
+    schedule = request.data.get('schedule')
+    doctor_ids = request.data.get('doctor_ids')
+    department = request.data.get('department')
+    
+    if schedule is None or (not doctor_ids and not department):
+        return Response({
+            'error': 'schedule and either doctor_ids or department are required.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    doctors = Doctor.objects.all()
+    if doctor_ids:
+        if not isinstance(doctor_ids, list):
+            return Response({
+                'error': 'doctor_ids must be a list.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        # Compared as UUIDs, so upper case or unhyphenated ids match too
+        try:
+            requested = {uuid.UUID(str(doctor_id)): doctor_id for doctor_id in doctor_ids}
+        except ValueError:
+            return Response({
+                'error': 'doctor_ids must be valid doctor UUIDs.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        target_ids = list(doctors.filter(id__in=requested).values_list('id', flat=True))
+        missing = {str(requested[doctor_id]) for doctor_id in requested.keys() - set(target_ids)}
+        if missing:
+            return Response({
+                'error': 'Some doctors were not found.',
+                'missing_doctor_ids': sorted(missing)
+            }, status=status.HTTP_404_NOT_FOUND)
+    else:
+        target_ids = list(doctors.filter(department=department).values_list('id', flat=True))
+        if not target_ids:
+            return Response({
+                'error': 'No doctors found in this department.'
+            }, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        summary = replace_schedules(target_ids, schedule)
+    except ScheduleError as e:
+        return Response({
+            'error': 'Invalid schedule.',
+            'details': e.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'message': f'Schedule applied to {len(target_ids)} doctors.',
+        'doctors_updated': len(target_ids),
+        **summary
+    })
@@ -0,0 +1,271 @@
+"""
+Prefix index for the patient autocomplete in the doctor and admin consoles.
+
+Every patient is indexed under a handful of keys: each word of the name,
+the email address, the phone number (digits only, with and without the
+country code) and the short patient id. The keys live in one sorted list
+as ``"key\\x00user_id"`` strings, which is a flattened prefix trie: the
+patients whose key starts with a prefix form one contiguous slice found
+with two binary searches, so a lookup costs O(log n + k) however many
+patients there are. Results come straight from memory; the database is
+not queried.
+
+Each worker process holds its own index and keeps it current through a
+change feed in the shared cache. Writes to a patient publish the user id
+under the next number of a sequence (``record_patient_changes``, from the
+model signals and the bulk import). Before answering, a process reads the
+sequence and reloads just the patients it has not seen yet. It only
+rebuilds from scratch when it has fallen too far behind or the feed was
+evicted.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.core.cache import cache
+from django.db import transaction
+
+from config.db_router import primary_reads
+from .models import PatientProfile
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+SEQUENCE_KEY = 'patient_autocomplete:sequence'
+CHANGE_CACHE_SECONDS = 60 * 60
+# Further behind than this, a full rebuild is cheaper than catching up
+MAX_INCREMENTAL_CHANGES = 1000
+# A change whose entry is still missing after this long was evicted
+MISSING_CHANGE_SECONDS = 2
+# Matches of the most selective word that are checked against the others
+MAX_SCANNED_KEYS = 20000
+
+_SEPARATOR = '\x00'
+_WORD_RE = re.compile(r'[^\s,;]+')
+_NOT_DIGIT_RE = re.compile(r'\D')
+_PHONE_LIKE_RE = re.compile(r'^\+?[\d\-() ]{3,}$')
+LOCAL_PHONE_DIGITS = 10
+
+
+def _change_key(number):
+    return f'patient_autocomplete:change:{number}'
+
+
+def _fresh_sequence():
+    # Time based, so a sequence evicted from the cache restarts far ahead
+    # of every process, which then rebuilds instead of missing changes
+    return int(time.time() * 1000)
+
+
+def short_patient_id(patient_id):
+    """The short id shown in ``admin_patients_list``."""
+    return str(patient_id)[:8].upper()
+
+
+def patient_keys(patient_id, first_name, last_name, email, phone_number):
+    """Keys a patient can be found under."""
+    keys = {word for word in _WORD_RE.findall(f'{first_name} {last_name}'.lower())}
+    if email:
+        keys.add(email.lower())
+    digits = _NOT_DIGIT_RE.sub('', phone_number or '')
+    if digits:
+        keys.add(digits)
+        keys.add(digits[-LOCAL_PHONE_DIGITS:])
+    keys.add(short_patient_id(patient_id).lower())
+    return keys
+
+
+def query_words(query):
+    """Normalized words of ``query``; a phone number counts as one word."""
+    query = query.strip().lower()
+    if _PHONE_LIKE_RE.match(query):
+        return [_NOT_DIGIT_RE.sub('', query)]
+    return list(dict.fromkeys(_WORD_RE.findall(query)))
+
+
+class PatientAutocompleteIndex:
+    """Sorted-key prefix index, updated in place as patients change."""
+
+    def __init__(self, rows, sequence=None):
+        """``rows`` are ``(user_id, patient_id, first_name, last_name, email, phone_number)``."""
+        self.sequence = sequence
+        self.missing_since = None
+        self._patients = {}
+        keys = []
+        for row in rows:
+            keys.extend(self._remember(row))
+        keys.sort()
+        self._keys = keys
+
+    def __len__(self):
+        return len(self._patients)
+
+    def _remember(self, row):
+        user_id, patient_id, first_name, last_name, email, phone_number = row
+        keys = patient_keys(patient_id, first_name, last_name, email, phone_number)
+        self._patients[user_id] = (
+            {
+                'id': str(patient_id),
+                'patient_id': short_patient_id(patient_id),
+                'name': f"{first_name} {last_name}",
+                'email': email,
+                'phone': phone_number or "N/A",
+            },
+            keys,
+        )
+        return [f'{key}{_SEPARATOR}{user_id}' for key in keys]
+
+    def _forget(self, user_id):
+        entry = self._patients.pop(user_id, None)
+        if entry is None:
+            return
+        for key in entry[1]:
+            entry_key = f'{key}{_SEPARATOR}{user_id}'
+            position = bisect_left(self._keys, entry_key)
+            if position < len(self._keys) and self._keys[position] == entry_key:
+                del self._keys[position]
+
+    def apply(self, user_ids, rows):
+        """Replace the patients of ``user_ids`` with ``rows`` (absent ones were deleted)."""
+        for user_id in user_ids:
+            self._forget(user_id)
+        for row in rows:
+            self._forget(row[0])
+            for entry_key in self._remember(row):
+                insort(self._keys, entry_key)
+
+    def _range(self, prefix):
+        start = bisect_left(self._keys, prefix)
+        # Every key with this prefix sorts before prefix + U+FFFF
+        return start, bisect_left(self._keys, prefix + '\uffff', start)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """
+        Up to ``limit`` patients with a key starting with every word of
+        ``query``, in key order: patients whose key equals the most
+        selective word come first, then the rest alphabetically by key.
+        """
+        words = query_words(query)
+        if not words:
+            return []
+        ranges = {word: self._range(word) for word in words}
+        # Walk the smallest slice and check the other words per patient
+        word = min(words, key=lambda w: ranges[w][1] - ranges[w][0])
+        others = [other for other in words if other != word]
+        start, end = ranges[word]
+
+        results, seen = [], set()
+        for entry_key in self._keys[start:min(end, start + MAX_SCANNED_KEYS)]:
+            user_id = entry_key.rsplit(_SEPARATOR, 1)[1]
+            if user_id in seen:
+                continue
+            seen.add(user_id)
+            entry = self._patients.get(user_id)
+            if entry is None or not all(
+                any(key.startswith(other) for key in entry[1]) for other in others
+            ):
+                continue
+            results.append(entry[0])
+            if len(results) >= limit:
+                break
+        return results
+
+
+def load_rows(user_ids=None):
+    patients = PatientProfile.objects.all()
+    if user_ids is not None:
+        patients = patients.filter(user_id__in=user_ids)
+    for row in patients.values_list(
+        'user_id', 'id', 'user__first_name', 'user__last_name', 'user__email', 'phone_number'
+    ).iterator(chunk_size=5000):
+        # Keys in the sorted list are strings
+        yield (str(row[0]),) + row[1:]
+
+
+def _publish_changes(user_ids):
+    cache.add(SEQUENCE_KEY, _fresh_sequence(), None)
+    try:
+        last = cache.incr(SEQUENCE_KEY, len(user_ids))
+    except ValueError:
+        # Evicted in between: the fresh sequence makes every process rebuild
+        cache.set(SEQUENCE_KEY, _fresh_sequence(), None)
+        return
+    if len(user_ids) <= MAX_INCREMENTAL_CHANGES:
+        first = last - len(user_ids) + 1
+        cache.set_many(
+            {_change_key(first + offset): user_id for offset, user_id in enumerate(user_ids)},
+            CHANGE_CACHE_SECONDS
+        )
+
+
+def record_patient_changes(user_ids):
+    """Publish that these patients changed, once the current transaction commits."""
+    user_ids = [str(user_id) for user_id in user_ids]
+    if user_ids:
+        transaction.on_commit(lambda: _publish_changes(user_ids))
+
+
+def current_sequence():
+    sequence = cache.get(SEQUENCE_KEY)
+    if sequence is None:
+        cache.add(SEQUENCE_KEY, _fresh_sequence(), None)
+        sequence = cache.get(SEQUENCE_KEY)
+    return sequence
+
+
+_current_index = None
+_index_lock = threading.Lock()
+
+
+def _catch_up(index, sequence):
+    """Apply the published changes up to ``sequence``. False if some are lost."""
+    numbers = range(index.sequence + 1, sequence + 1)
+    found = cache.get_many([_change_key(number) for number in numbers])
+    user_ids = []
+    for number in numbers:
+        user_id = found.get(_change_key(number))
+        if user_id is None:
+            break
+        user_ids.append(user_id)
+
+    if len(user_ids) < len(numbers):
+        # A change is published but not written yet, or was evicted
+        if index.missing_since is None or user_ids:
+            index.missing_since = time.monotonic()
+        elif time.monotonic() - index.missing_since > MISSING_CHANGE_SECONDS:
+            return False
+    else:
+        index.missing_since = None
+
+    if user_ids:
+        unique_ids = list(dict.fromkeys(user_ids))
+        with primary_reads():
+            rows = list(load_rows(unique_ids))
+        index.apply(unique_ids, rows)
+        index.sequence += len(user_ids)
+    return True
+
+
+def get_index():
+    """This process's index, brought up to date with the change feed."""
+    global _current_index
+    sequence = current_sequence()
+    index = _current_index
+    if index is not None and index.sequence == sequence:
+        return index
+    with _index_lock:
+        index = _current_index
+        if index is not None and index.sequence == sequence:
+            return index
+        behind = sequence - index.sequence if index is not None else None
+        if behind is None or not 0 < behind <= MAX_INCREMENTAL_CHANGES or not _catch_up(index, sequence):
+            # Read from the primary so the index starts from committed data
+            with primary_reads():
+                index = PatientAutocompleteIndex(load_rows(), sequence)
+            _current_index = index
+    return index
+
+
+def autocomplete_patients(query, limit=DEFAULT_LIMIT):
+    return get_index().search(query, limit)
@@ -0,0 +1,166 @@
+"""
+Patient dashboard assembly and caching.
+
+The dashboard is cached per patient under a versioned key. Signal handlers
+bump the version whenever that patient's profile, appointments or medical
+history change, so a cached dashboard is served until the underlying rows
+change or ``DASHBOARD_CACHE_SECONDS`` pass (which also rolls over date based
+fields such as upcoming appointments and age). Misses are built from the
+primary: a build from a lagging replica would be cached under the new
+version and served until the next change.
+"""
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from accounts.cache_versions import bump_version, versioned_key
+from config.db_router import primary_reads
+from appointments.models import Appointment
+from .models import PatientProfile, MedicalHistory
+
+DASHBOARD_CACHE_NAMESPACE = 'patient_dashboard'
+DASHBOARD_CACHE_SECONDS = 300
+DASHBOARD_LIST_LIMIT = 5
+
+
+def split_list(value):
+    """Split a comma separated profile field into stripped, non-empty items."""
+    if not value:
+        return []
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _count_subquery(queryset, **extra):
+    """Scalar subquery counting ``queryset`` rows of the outer patient."""
+    counted = queryset.filter(patient=OuterRef('pk')).values('patient').annotate(
+        total=Count('pk', **extra)
+    ).values('total')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def with_record_counts(queryset):
+    """Annotate patients with their appointment and medical record counts."""
+    return queryset.annotate(
+        total_appointments=_count_subquery(Appointment.objects.all()),
+        completed_appointments=_count_subquery(Appointment.objects.all(), filter=Q(status='completed')),
+        medical_records=_count_subquery(MedicalHistory.objects.all())
+    )
+
+
+def invalidate_dashboard(user_id):
+    bump_version(DASHBOARD_CACHE_NAMESPACE, user_id)
+
+
+def get_dashboard(user):
+    """
+    Dashboard data for the patient account ``user``, from the cache when
+    possible. Raises ``PatientProfile.DoesNotExist`` when there is no profile.
+    """
+    key = versioned_key(DASHBOARD_CACHE_NAMESPACE, user.id)
+    data = cache.get(key)
+    if data is None:
+        with primary_reads():
+            data = build_dashboard(user)
+        cache.set(key, data, DASHBOARD_CACHE_SECONDS)
+    return data
+
+
+def build_dashboard(user):
+    """Build the dashboard from three queries: profile with counts, appointments, history."""
+    patient = with_record_counts(PatientProfile.objects.select_related('user')).get(user=user)
+
+    # Get upcoming appointments
+    upcoming_appointments = Appointment.objects.filter(
+        patient=patient,
+        appointment_date__gte=timezone.localdate(),
+        status__in=['scheduled', 'confirmed']
+    ).select_related('doctor__user').order_by('appointment_date', 'appointment_time')[:DASHBOARD_LIST_LIMIT]
+
+    # Get recent medical history
+    recent_medical_history = MedicalHistory.objects.filter(
+        patient=patient
+    ).select_related('doctor__user').order_by('-date')[:DASHBOARD_LIST_LIMIT]
+
+    # Parse the comma separated profile fields once
+    allergies_list = split_list(patient.allergies)
+    medications_list = split_list(patient.current_medications)
+    conditions_list = split_list(patient.chronic_conditions)
+
+    # Serialize appointments
+    appointments_data = []
+    for appointment in upcoming_appointments:
+        appointments_data.append({
+            'id': str(appointment.id),
+            'doctor': {
+                'name': f"Dr. {appointment.doctor.user.first_name} {appointment.doctor.user.last_name}",
+                'specialization': appointment.doctor.get_specialization_display(),
+                'department': appointment.doctor.department or appointment.doctor.get_specialization_display() + " Department"
+            },
+            'date': appointment.appointment_date.strftime('%b %d, %Y'),
+            'time': appointment.appointment_time.strftime('%I:%M %p'),
+            'appointment_type': appointment.appointment_type,
+            'status': appointment.status,
+            'reason': appointment.reason or 'Consultation'
+        })
+
+    # Serialize medical history
+    medical_history_data = []
+    for history in recent_medical_history:
+        medical_history_data.append({
+            'id': str(history.id),
+            'condition': history.condition,
+            'date': history.date.strftime('%b %d, %Y'),
+            'doctor': f"Dr. {history.doctor.user.first_name} {history.doctor.user.last_name}" if history.doctor else "Unknown",
+            'treatment': history.treatment,
+            'description': history.description
+        })
+
+    return {
+        'patient_info': {
+            'id': str(patient.id),
+            'name': patient.user.get_full_name(),
+            'email': patient.user.email,
+            'phone': patient.phone_number,
+            'date_of_birth': patient.date_of_birth.strftime('%m/%d/%Y') if patient.date_of_birth else None,
+            'age': patient.age,
+            'gender': patient.get_gender_display() if patient.gender else None,
+            'blood_group': patient.blood_group,
+            'address': {
+                'street': patient.address,
+                'city': patient.city,
+                'state': patient.state,
+                'zip_code': patient.zip_code
+            },
+            'emergency_contact': {
+                'name': patient.emergency_contact_name,
+                'phone': patient.emergency_contact_phone,
+                'relationship': patient.relationship
+            },
+            'insurance': {
+                'provider': patient.insurance_provider,
+                'policy_number': patient.policy_number
+            }
+        },
+        'health_summary': {
+            'stats': {
+                'known_allergies': len(allergies_list),
+                'current_medications': len(medications_list),
+                'medical_conditions': len(conditions_list),
+            },
+            'allergies': allergies_list,
+            'current_medications': medications_list,
+            'chronic_conditions': conditions_list,
+            'height': patient.height,
+            'weight': patient.weight,
+            'bmi': patient.bmi
+        },
+        'upcoming_appointments': appointments_data,
+        'recent_medical_history': medical_history_data,
+        'quick_stats': {
+            'total_appointments': patient.total_appointments,
+            'completed_appointments': patient.completed_appointments,
+            'upcoming_appointments': len(appointments_data),
+            'medical_records': patient.medical_records
+        }
+    }
@@ -0,0 +1,71 @@
+"""
+Bulk patient import.
+
+Rows are streamed from the file and handled a chunk at a time (see
+``accounts.importing``): every row is validated, emails are checked for
+duplicates within the file and against ``users`` with one query, passwords
+are hashed on the process pool, and the ``User`` / ``PatientProfile`` rows
+plus their credential emails are written with ``bulk_create`` in one
+transaction per chunk. A bad row only fails itself; the report lists it
+with its row number.
+
+``bulk_create`` skips model signals, so the patient counter is bumped and
+the new patients are published to the autocomplete index here. New
+patients have no cached dashboard to invalidate.
+"""
+from functools import partial
+
+from django.db import IntegrityError, transaction
+
+from accounts import counters
+from accounts.importing import (
+    DEFAULT_CHUNK_SIZE,
+    build_users,
+    concurrent_change_error,
+    queue_credentials,
+    run_import,
+    validate_rows,
+)
+from accounts.models import User
+from .autocomplete import record_patient_changes
+from .models import PatientProfile
+from .serializers import PatientImportSerializer
+
+BULK_BATCH_SIZE = 500
+
+
+def import_patients(stream, file_format, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+                    send_emails=True, max_errors=None):
+    """
+    Import patients from a CSV or JSON Lines text stream.
+    Returns an ``ImportReport``.
+    """
+    return run_import(
+        stream, file_format, partial(_import_chunk, send_emails=send_emails),
+        chunk_size=chunk_size, workers=workers, max_errors=max_errors
+    )
+
+
+def _import_chunk(chunk, report, seen_emails, pool, send_emails=True):
+    valid = validate_rows(chunk, PatientImportSerializer(), report, seen_emails)
+    if not valid:
+        return
+
+    users, passwords = build_users(valid, 'patient', pool)
+    profiles = [PatientProfile(user=user, **cleaned) for user, (_, _, cleaned) in zip(users, valid)]
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=BULK_BATCH_SIZE)
+            PatientProfile.objects.bulk_create(profiles, batch_size=BULK_BATCH_SIZE)
+            if send_emails:
+                queue_credentials(users, passwords)
+            counters.increment(counters.PATIENTS, len(profiles))
+            record_patient_changes(user.id for user in users)
+    except IntegrityError:
+        # Someone registered one of these emails since the chunk was checked
+        for row_number, email, _ in valid:
+            report.add_error(row_number, concurrent_change_error(), email)
+        return
+
+    report.created += len(users)
@@ -0,0 +1,11 @@
+from accounts.management.base import BaseImportCommand
+from patients.importer import import_patients
+
+
+class Command(BaseImportCommand):
+    help = (
+        "Bulk-register patients from a CSV or JSON Lines file. Valid rows are created "
+        "and queued a credentials email; invalid rows are reported and skipped."
+    )
+    importer = staticmethod(import_patients)
+    label = 'patients'
@@ -44,6 +44,14 @@ class PatientProfileCreateSerializer(serializers.ModelSerializer):
         ]
 
 
+class PatientImportSerializer(PatientProfileCreateSerializer):
+    """Validates one row of a bulk patient import."""
+
+    first_name = serializers.CharField(max_length=100)
+    last_name = serializers.CharField(max_length=100)
+    email = serializers.EmailField(max_length=255)
+
+
 class PatientProfileUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating PatientProfile."""
     
@@ -68,7 +76,7 @@ class PatientProfileListSerializer(serializers.ModelSerializer):
         model = PatientProfile
         fields = [
             'id', 'user', 'full_name', 'phone_number', 'age', 'gender', 
-            'blood_type', 'created_at'
+            'blood_group', 'created_at'
         ]
     
     def get_full_name(self, obj):
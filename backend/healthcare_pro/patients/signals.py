@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts import counters
+from appointments.models import Appointment
+from .autocomplete import record_patient_changes
+from .dashboard import invalidate_dashboard
+from .models import PatientProfile, MedicalHistory
+
+
+def _patient_user_id(instance):
+    """User id of the patient a related row belongs to, reusing a loaded patient."""
+    patient = instance._state.fields_cache.get('patient')
+    if patient is not None:
+        return patient.user_id
+    return PatientProfile.objects.filter(pk=instance.patient_id).values_list('user_id', flat=True).first()
+
+
+@receiver(post_save, sender=PatientProfile)
+def count_created_patient(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(counters.PATIENTS)
+    invalidate_dashboard(instance.user_id)
+
+
+@receiver(post_delete, sender=PatientProfile)
+def count_deleted_patient(sender, instance, **kwargs):
+    counters.increment(counters.PATIENTS, -1)
+    invalidate_dashboard(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_dashboard_for_user(sender, instance, **kwargs):
+    # Name and email are part of the dashboard
+    if instance.role == 'patient':
+        invalidate_dashboard(instance.id)
+
+
+@receiver(post_save, sender=PatientProfile)
+@receiver(post_delete, sender=PatientProfile)
+def update_autocomplete_for_patient(sender, instance, **kwargs):
+    record_patient_changes([instance.user_id])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def update_autocomplete_for_user(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login
+    if instance.role == 'patient' and update_fields != frozenset({'last_login'}):
+        record_patient_changes([instance.id])
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+@receiver(post_save, sender=MedicalHistory)
+@receiver(post_delete, sender=MedicalHistory)
+def invalidate_dashboard_for_record(sender, instance, **kwargs):
+    user_id = _patient_user_id(instance)
+    if user_id is not None:
+        invalidate_dashboard(user_id)
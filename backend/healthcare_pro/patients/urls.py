@@ -5,6 +5,7 @@ urlpatterns = [
     # Patient profile endpoints
     path('', patient_views.PatientListCreateView.as_view(), name='patient-list-create'),
     path('<uuid:pk>/', patient_views.PatientDetailView.as_view(), name='patient-detail'),
+    path('autocomplete/', patient_views.patient_autocomplete, name='patient-autocomplete'),
     
     # Patient dashboard and self-service endpoints
     path('my/dashboard/', dashboard_views.patient_dashboard, name='patient-dashboard'),
@@ -6,10 +6,12 @@ from django.shortcuts import get_object_or_404
 from appointments.models import Appointment
 from appointments.serializers import AppointmentSerializer, AppointmentListSerializer
 from ..models import PatientProfile
+from config.db_router import use_read_replica
 
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@use_read_replica
 def my_appointments(request):
     """
     Get appointments for the current patient
@@ -7,8 +7,11 @@ from datetime import date, datetime, timedelta
 
 from ..models import PatientProfile, MedicalHistory
 from ..serializers import PatientProfileSerializer, MedicalHistorySerializer
+from ..dashboard import get_dashboard, split_list, with_record_counts
 from appointments.models import Appointment
+from doctors.directory_cache import directory_response
 from doctors.models import Doctor
+from config.db_router import use_read_replica
 
 
 @api_view(['GET'])
@@ -16,7 +19,8 @@ from doctors.models import Doctor
 def patient_dashboard(request):
     """
     Get patient dashboard overview with all necessary information.
-    Only for patients.
+    Only for patients. Served from a per-patient cache that is invalidated
+    when the patient's profile, appointments or medical history change.
     """
     if request.user.role != 'patient':
         return Response(
@@ -25,112 +29,7 @@ def patient_dashboard(request):
         )
     
     try:
-        patient = PatientProfile.objects.select_related('user').get(user=request.user)
-        
-        # Get upcoming appointments
-        upcoming_appointments = Appointment.objects.filter(
-            patient=patient,
-            date__gte=date.today(),
-            status__in=['scheduled', 'confirmed']
-        ).select_related('doctor__user').order_by('date', 'time')[:5]
-        
-        # Get recent medical history
-        recent_medical_history = MedicalHistory.objects.filter(
-            patient=patient
-        ).select_related('doctor__user').order_by('-date')[:5]
-        
-        # Health summary statistics
-        health_stats = {
-            'known_allergies': len(patient.allergies.split(',')) if patient.allergies else 0,
-            'current_medications': len(patient.current_medications.split(',')) if patient.current_medications else 0,
-            'medical_conditions': len(patient.chronic_conditions.split(',')) if patient.chronic_conditions else 0,
-        }
-        
-        # Serialize appointments
-        appointments_data = []
-        for appointment in upcoming_appointments:
-            appointments_data.append({
-                'id': str(appointment.id),
-                'doctor': {
-                    'name': f"Dr. {appointment.doctor.user.first_name} {appointment.doctor.user.last_name}",
-                    'specialization': appointment.doctor.get_specialization_display(),
-                    'department': appointment.doctor.department or appointment.doctor.get_specialization_display() + " Department"
-                },
-                'date': appointment.date.strftime('%b %d, %Y'),
-                'time': appointment.time.strftime('%I:%M %p'),
-                'appointment_type': appointment.appointment_type,
-                'status': appointment.status,
-                'reason': appointment.reason or 'Consultation'
-            })
-        
-        # Serialize medical history
-        medical_history_data = []
-        for history in recent_medical_history:
-            medical_history_data.append({
-                'id': str(history.id),
-                'condition': history.condition,
-                'date': history.date.strftime('%b %d, %Y'),
-                'doctor': f"Dr. {history.doctor.user.first_name} {history.doctor.user.last_name}" if history.doctor else "Unknown",
-                'treatment': history.treatment,
-                'description': history.description
-            })
-        
-        # Get allergies list
-        allergies_list = []
-        if patient.allergies:
-            allergies_list = [allergy.strip() for allergy in patient.allergies.split(',') if allergy.strip()]
-        
-        # Get current medications list
-        medications_list = []
-        if patient.current_medications:
-            medications_list = [medication.strip() for medication in patient.current_medications.split(',') if medication.strip()]
-        
-        dashboard_data = {
-            'patient_info': {
-                'id': str(patient.id),
-                'name': patient.user.get_full_name(),
-                'email': patient.user.email,
-                'phone': patient.phone_number,
-                'date_of_birth': patient.date_of_birth.strftime('%m/%d/%Y') if patient.date_of_birth else None,
-                'age': patient.age,
-                'gender': patient.get_gender_display() if patient.gender else None,
-                'blood_group': patient.blood_group,
-                'address': {
-                    'street': patient.address,
-                    'city': patient.city,
-                    'state': patient.state,
-                    'zip_code': patient.zip_code
-                },
-                'emergency_contact': {
-                    'name': patient.emergency_contact_name,
-                    'phone': patient.emergency_contact_phone,
-                    'relationship': patient.relationship
-                },
-                'insurance': {
-                    'provider': patient.insurance_provider,
-                    'policy_number': patient.policy_number
-                }
-            },
-            'health_summary': {
-                'stats': health_stats,
-                'allergies': allergies_list,
-                'current_medications': medications_list,
-                'chronic_conditions': patient.chronic_conditions.split(',') if patient.chronic_conditions else [],
-                'height': patient.height,
-                'weight': patient.weight,
-                'bmi': patient.bmi
-            },
-            'upcoming_appointments': appointments_data,
-            'recent_medical_history': medical_history_data,
-            'quick_stats': {
-                'total_appointments': Appointment.objects.filter(patient=patient).count(),
-                'completed_appointments': Appointment.objects.filter(patient=patient, status='completed').count(),
-                'upcoming_appointments': len(appointments_data),
-                'medical_records': MedicalHistory.objects.filter(patient=patient).count()
-            }
-        }
-        
-        return Response(dashboard_data)
+        return Response(get_dashboard(request.user))
         
     except PatientProfile.DoesNotExist:
         return Response(
@@ -204,6 +103,7 @@ def update_profile(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@use_read_replica
 def my_appointments(request):
     """
     Get all appointments for the current patient.
@@ -267,6 +167,7 @@ def my_appointments(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@use_read_replica
 def my_medical_history(request):
     """
     Get medical history for the current patient.
@@ -326,7 +227,14 @@ def available_doctors(request):
         )
     
     specialization = request.GET.get('specialization')
-    
+    return directory_response(
+        request, 'available_doctors',
+        lambda: _available_doctors(specialization),
+        params=[specialization or '']
+    )
+
+
+def _available_doctors(specialization):
     # Get available doctors
     doctors = Doctor.objects.filter(is_available=True).select_related('user')
     
@@ -347,14 +255,15 @@ def available_doctors(request):
             'end_time': doctor.end_time.strftime('%H:%M') if doctor.end_time else None
         })
     
-    return Response({
+    return {
         'doctors': doctors_data,
         'total': len(doctors_data)
-    })
+    }
 
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated]) 
+@use_read_replica
 def health_summary(request):
     """
     Get health summary statistics for the current patient.
@@ -366,16 +275,11 @@ def health_summary(request):
         )
     
     try:
-        patient = PatientProfile.objects.get(user=request.user)
-        
-        # Calculate health metrics
-        total_appointments = Appointment.objects.filter(patient=patient).count()
-        completed_appointments = Appointment.objects.filter(patient=patient, status='completed').count()
-        medical_records = MedicalHistory.objects.filter(patient=patient).count()
+        patient = with_record_counts(PatientProfile.objects.select_related('user')).get(user=request.user)
         
         # Parse allergies and medications
-        allergies_count = len(patient.allergies.split(',')) if patient.allergies else 0
-        medications_count = len(patient.current_medications.split(',')) if patient.current_medications else 0
+        allergies_count = len(split_list(patient.allergies))
+        medications_count = len(split_list(patient.current_medications))
         
         summary = {
             'patient_info': {
@@ -385,9 +289,9 @@ def health_summary(request):
                 'bmi': patient.bmi
             },
             'statistics': {
-                'total_appointments': total_appointments,
-                'completed_appointments': completed_appointments,  
-                'medical_records': medical_records,
+                'total_appointments': patient.total_appointments,
+                'completed_appointments': patient.completed_appointments,
+                'medical_records': patient.medical_records,
                 'known_allergies': allergies_count,
                 'current_medications': medications_count
             },
@@ -6,9 +6,10 @@ from ..serializers import (
     MedicalHistorySerializer, MedicalHistoryCreateSerializer
 )
 from accounts.permissions import IsAdminOrDoctor, IsPatientOrReadOnly
+from config.db_router import ReplicaReadMixin
 
 
-class MedicalHistoryListCreateView(generics.ListCreateAPIView):
+class MedicalHistoryListCreateView(ReplicaReadMixin, generics.ListCreateAPIView):
     """
     List or create medical history records.
     """
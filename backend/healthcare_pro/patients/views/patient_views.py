@@ -1,17 +1,22 @@
 from rest_framework import generics, status, permissions
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 
+from ..autocomplete import DEFAULT_LIMIT, MAX_LIMIT, autocomplete_patients
 from ..models import PatientProfile
 from ..serializers import (
     PatientProfileSerializer, PatientProfileCreateSerializer, 
     PatientProfileUpdateSerializer, PatientProfileListSerializer
 )
+from accounts.permissions import IsDoctorOrAdmin
+from config.db_router import ReplicaReadMixin
 
 User = get_user_model()
 
 
-class PatientListCreateView(generics.ListCreateAPIView):
+class PatientListCreateView(ReplicaReadMixin, generics.ListCreateAPIView):
     """
     List all patients or create a new patient.
     Admin and doctors can view all patients.
@@ -102,4 +107,22 @@ class PatientDetailView(generics.RetrieveUpdateDestroyAPIView):
         # Delete the associated user as well
         user = instance.user
         instance.delete()
-        user.delete()
\ No newline at end of file
+        user.delete()
+
+
+@api_view(['GET'])
+@permission_classes([IsDoctorOrAdmin])
+def patient_autocomplete(request):
+    """
+    Typeahead for finding a patient by name, email, phone number or short
+    patient id. Answered from memory (see ``patients.autocomplete``).
+    """
+    try:
+        limit = min(int(request.GET.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return Response({'error': 'limit must be a positive integer.'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    results = autocomplete_patients(request.GET.get('q', ''), limit)
+    return Response({'results': results})